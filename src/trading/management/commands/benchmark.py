@@ -0,0 +1,243 @@
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db import transaction as db_transaction
+from django.utils import timezone
+from trading.services.excel_reader import read_excel
+from trading.services.pnl_processor import PnLProcessor
+from trading.services.schema import (
+    PNL_SCHEMA,
+    TRADES_SCHEMA,
+    apply_schema,
+    memory_report,
+)
+from trading.services.synthetic import PNL, TRADES, generate_trades, write_excel
+from trading.services.trading_processor import TradingProcessor
+from trading.services.uploads import trades_repositories
+from trading.services.validation import validate_trades
+from trading.settings import BASE_DIR, BULK_LOADER, DAILY_NET_MODE, PNL_WORKERS
+
+SAMPLES_ROOT = BASE_DIR.parent / "samples"
+
+
+class Command(BaseCommand):
+    help = (
+        "Time every stage of the processing pipeline on sample files and on synthetic datasets, "
+        "and write the results as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="*",
+            default=[10_000, 100_000, 1_000_000],
+            help="Number of rows of every synthetic dataset.",
+        )
+        parser.add_argument(
+            "--symbols",
+            type=int,
+            default=50,
+            help="Distinct symbols of synthetic datasets.",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Seed of the generator."
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=3, help="Number of timed runs of every stage."
+        )
+        parser.add_argument(
+            "--max-excel-rows",
+            type=int,
+            default=100_000,
+            help="Larger synthetic datasets skip Excel stages, writing the file takes too long.",
+        )
+        parser.add_argument(
+            "--no-db",
+            action="store_true",
+            help="Skip repository stages. Otherwise rows are written and rolled back.",
+        )
+        parser.add_argument(
+            "--output",
+            type=Path,
+            help="Location of the JSON results, standard output if missing.",
+        )
+
+    def handle(self, *args, **options):
+        self.repeat = options["repeat"]
+        self.db = not options["no_db"]
+
+        datasets = []
+        for path in sorted((SAMPLES_ROOT / "trading-processor").glob("*.xlsx")):
+            datasets.append(self._trades_stages(path.name, read_excel(path), path))
+        pnl_sample = SAMPLES_ROOT / "pnl" / "pnl.xlsx"
+        if pnl_sample.exists():
+            datasets.append(
+                self._pnl_stages(pnl_sample.name, read_excel(pnl_sample), pnl_sample)
+            )
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for size in options["sizes"]:
+                for kind, collect in [
+                    (TRADES, self._trades_stages),
+                    (PNL, self._pnl_stages),
+                ]:
+                    df = generate_trades(
+                        size,
+                        symbols=options["symbols"],
+                        seed=options["seed"],
+                        kind=kind,
+                    )
+                    path = None
+                    if size <= options["max_excel_rows"]:
+                        path = Path(tmp) / f"{kind}-{size}.xlsx"
+                        write_excel(df, path)
+                    name = f"synthetic-{kind}-{size}x{options['symbols']}"
+                    datasets.append(collect(name, df, path))
+
+        results = {
+            "created_at": timezone.now().isoformat(),
+            "environment": {
+                "python": platform.python_version(),
+                "pandas": pd.__version__,
+                "numpy": np.__version__,
+                "cpus": os.cpu_count(),
+                "database": connection.vendor,
+                "bulk_loader": BULK_LOADER,
+                "daily_net_mode": DAILY_NET_MODE,
+                "pnl_workers": PNL_WORKERS,
+            },
+            "repeat": self.repeat,
+            "datasets": datasets,
+        }
+        output = json.dumps(results, indent=2)
+        if options["output"]:
+            options["output"].write_text(output)
+            self.stderr.write(f"Results written to {options['output']}")
+        else:
+            self.stdout.write(output)
+
+    def _trades_stages(self, name: str, df: pd.DataFrame, path: Optional[Path]) -> dict:
+        """Time stages of the trade processor on a dataset.
+        Args:
+            name: Name of the dataset
+            df: Parsed trades
+            path: Excel file of the dataset, Excel stages are skipped when missing
+
+        Returns:
+            Dataset name, size and timings of every stage.
+        """
+        stages = {}
+        if path is not None:
+            stages["parse_excel"] = self._time(
+                len(df), lambda: None, lambda _: read_excel(path)
+            )
+            # Parsed without the frame cache: every run times a first upload of the file, and
+            # the cache of the server is left untouched
+            stages["from_excel"] = self._time(
+                len(df), lambda: None, lambda _: TradingProcessor(read_excel(path))
+            )
+        stages["validate_trades"] = self._time(len(df), lambda: df, validate_trades)
+        stages["calc_daily_net"] = self._time(
+            len(df), lambda: TradingProcessor(df.copy()), lambda tp: tp.calc_daily_net()
+        )
+        if self.db:
+            transactions_repo, positions_repo = trades_repositories()
+            daily_net = TradingProcessor(df.copy()).calc_daily_net()
+            stages["save_transactions"] = self._time(
+                len(df), lambda: df, transactions_repo.save_frame, rollback=True
+            )
+            stages["save_daily_net"] = self._time(
+                len(daily_net),
+                lambda: daily_net,
+                positions_repo.save_frame,
+                rollback=True,
+            )
+        return self._dataset(name, df, stages, TRADES_SCHEMA)
+
+    def _pnl_stages(self, name: str, df: pd.DataFrame, path: Optional[Path]) -> dict:
+        """Time stages of the P&L processor on a dataset.
+        Args:
+            name: Name of the dataset
+            df: Parsed P&L book
+            path: Excel file of the dataset, Excel stages are skipped when missing
+
+        Returns:
+            Dataset name, size and timings of every stage.
+        """
+        stages = {}
+        if path is not None:
+            # Parsed without the frame cache, like trades files
+            stages["from_excel"] = self._time(
+                len(df), lambda: None, lambda _: PnLProcessor(read_excel(path))
+            )
+
+        def computed() -> PnLProcessor:
+            processor = PnLProcessor(df.copy())
+            processor.make_statistics()
+            return processor
+
+        stages["make_statistics"] = self._time(
+            len(df), lambda: PnLProcessor(df.copy()), lambda p: p.make_statistics()
+        )
+        stages["get_current_positions"] = self._time(
+            len(df), computed, lambda p: p.get_current_positions()
+        )
+        return self._dataset(name, df, stages, PNL_SCHEMA)
+
+    def _time(
+        self, rows: int, setup: Callable, stage: Callable, rollback: bool = False
+    ) -> dict:
+        """Run a stage `repeat` times, only the stage itself is timed.
+        Args:
+            rows: Number of rows handled by the stage
+            setup: Builds the argument of the stage, before every run
+            stage: Stage to time
+            rollback: Run the stage in a transaction rolled back once timed, stages not writing
+                to the database run outside of any transaction, without connecting to it
+
+        Returns:
+            Durations of every run, in seconds, with their minimum, median and rows per second.
+        """
+        runs = []
+        for _ in range(self.repeat):
+            argument = setup()
+            with db_transaction.atomic() if rollback else nullcontext():
+                started = time.perf_counter()
+                stage(argument)
+                runs.append(time.perf_counter() - started)
+                if rollback:
+                    db_transaction.set_rollback(True)
+
+        best = min(runs)
+        return {
+            "runs": runs,
+            "min": best,
+            "median": statistics.median(runs),
+            "rows_per_second": rows / best if best else None,
+        }
+
+    @staticmethod
+    def _dataset(name: str, df: pd.DataFrame, stages: dict, schema: dict) -> dict:
+        """Describe a dataset, its timings and its memory per column, as parsed and once typed."""
+        return {
+            "name": name,
+            "rows": len(df),
+            "symbols": int(df["Symbol"].nunique()),
+            "stages": stages,
+            "memory": {
+                "parsed": memory_report(df),
+                "typed": memory_report(apply_schema(df, schema)),
+            },
+        }
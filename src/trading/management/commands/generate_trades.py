@@ -0,0 +1,34 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from trading.services.synthetic import PNL, TRADES, generate_trades, write_excel
+
+
+class Command(BaseCommand):
+    help = "Generate a reproducible Excel trades file, for benchmarks and load tests."
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", type=Path, help="Location of the Excel file.")
+        parser.add_argument("--rows", type=int, default=10_000, help="Number of rows.")
+        parser.add_argument(
+            "--symbols", type=int, default=10, help="Number of distinct symbols."
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Seed of the generator."
+        )
+        parser.add_argument(
+            "--kind",
+            choices=[TRADES, PNL],
+            default=TRADES,
+            help="`trades` for the trade processor, `pnl` for the P&L processor.",
+        )
+
+    def handle(self, *args, **options):
+        df = generate_trades(
+            options["rows"],
+            symbols=options["symbols"],
+            seed=options["seed"],
+            kind=options["kind"],
+        )
+        write_excel(df, options["output"])
+        self.stdout.write(f"{options['output']}: {len(df)} rows")
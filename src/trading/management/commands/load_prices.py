@@ -0,0 +1,59 @@
+from pathlib import Path
+
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+from trading.repository.prices import DailyPriceRepo
+from trading.services.excel_reader import iter_excel_chunks
+from trading.settings import EXCEL_CHUNK_SIZE
+
+PRICE_COLUMNS = ["Symbol", "Date", "Price"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfill daily prices from CSV or Excel files with Symbol, Date and Price columns. "
+        "Prices already stored for a symbol and date are replaced."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("files", nargs="+", type=Path, help="CSV or Excel files.")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=EXCEL_CHUNK_SIZE,
+            help="Number of rows read and written at once.",
+        )
+
+    def handle(self, *args, **options):
+        repo = DailyPriceRepo()
+        for path in options["files"]:
+            total = 0
+            for chunk in self._iter_chunks(path, options["chunk_size"]):
+                missing = set(PRICE_COLUMNS) - set(chunk.columns)
+                if missing:
+                    raise CommandError(f"{path}: missing columns {sorted(missing)}")
+
+                prices = chunk[PRICE_COLUMNS].copy()
+                prices["Date"] = pd.to_datetime(prices["Date"], errors="coerce")
+                prices["Price"] = pd.to_numeric(prices["Price"], errors="coerce")
+                # A (symbol, date) may only be written once per statement
+                prices = prices.dropna().drop_duplicates(
+                    ["Symbol", "Date"], keep="last"
+                )
+                repo.save_frame(prices)
+                total += len(prices)
+            self.stdout.write(f"{path}: {total} prices loaded")
+
+    @staticmethod
+    def _iter_chunks(path: Path, chunk_size: int):
+        """Read a prices file chunk by chunk.
+        Args:
+            path: CSV or Excel file.
+            chunk_size: Maximum number of rows of every chunk.
+
+        Returns:
+            An iterator of DataFrames.
+        """
+        if path.suffix.lower() == ".csv":
+            return pd.read_csv(path, chunksize=chunk_size)
+        return iter_excel_chunks(path, chunk_size)
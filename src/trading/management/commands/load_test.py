@@ -0,0 +1,326 @@
+import json
+import secrets
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import CookieJar
+from pathlib import Path
+from urllib.error import HTTPError, URLError
+from urllib.parse import urljoin
+from urllib.request import HTTPCookieProcessor, Request, build_opener
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from trading.services.synthetic import PNL, TRADES, generate_trades, write_excel
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Endpoints driven by the load test, with the kind of file each one expects
+ENDPOINTS = {"trade-processor": TRADES, "pnl": PNL}
+
+
+class UploadClient:
+    """
+    Uploads files to the application the way a browser does.
+    A client keeps its own cookies and CSRF token, every worker thread uses its own client.
+    """
+
+    def __init__(self, base_url: str, timeout: float):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.cookies = CookieJar()
+        self.opener = build_opener(HTTPCookieProcessor(self.cookies))
+        self.csrf_token = None
+
+    def upload(self, endpoint: str, path: Path) -> tuple[int, dict[str, float]]:
+        """Post a file to an upload endpoint.
+        Args:
+            endpoint: Path of the endpoint, e.g. `pnl`
+            path: Excel file to upload
+
+        Returns:
+            HTTP status of the response and durations of server stages, in seconds, read from its
+            `Server-Timing` header (empty unless timing is enabled on the server).
+        """
+        url = urljoin(self.base_url, f"{endpoint}/")
+        if self.csrf_token is None:
+            self.opener.open(url, timeout=self.timeout).read()
+            self.csrf_token = next(
+                (c.value for c in self.cookies if c.name == "csrftoken"), ""
+            )
+
+        boundary = uuid.uuid4().hex
+        body = b"".join(
+            [
+                f"--{boundary}\r\n".encode(),
+                b'Content-Disposition: form-data; name="csrfmiddlewaretoken"\r\n\r\n',
+                f"{self.csrf_token}\r\n".encode(),
+                f"--{boundary}\r\n".encode(),
+                f'Content-Disposition: form-data; name="file"; filename="{path.name}"\r\n'.encode(),
+                f"Content-Type: {XLSX_CONTENT_TYPE}\r\n\r\n".encode(),
+                path.read_bytes(),
+                f"\r\n--{boundary}--\r\n".encode(),
+            ]
+        )
+        request = Request(
+            url,
+            data=body,
+            headers={
+                "Content-Type": f"multipart/form-data; boundary={boundary}",
+                "X-CSRFToken": self.csrf_token,
+                "Referer": url,
+            },
+        )
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                response.read()
+                return response.status, parse_server_timing(
+                    response.headers.get("Server-Timing", "")
+                )
+        except HTTPError as e:
+            return e.code, {}
+
+
+def parse_server_timing(header: str) -> dict[str, float]:
+    """Read stage durations out of a `Server-Timing` header.
+    Args:
+        header: Header value, e.g. `parse_excel;dur=12.3;desc="2000 rows", total;dur=40.1`
+
+    Returns:
+        Mapping of stage name to its duration, in seconds.
+    """
+    stages = {}
+    for metric in filter(None, (m.strip() for m in header.split(","))):
+        name, *params = metric.split(";")
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "dur":
+                stages[name.strip()] = float(value) / 1000
+    return stages
+
+
+def _percentiles(values: np.ndarray) -> tuple:
+    """p50, p95 and p99 of given values, None when there is no value."""
+    if not len(values):
+        return None, None, None
+    return tuple(float(p) for p in np.percentile(values, [50, 95, 99]))
+
+
+class Command(BaseCommand):
+    help = (
+        "Upload generated files to a running server at a given concurrency and report throughput "
+        "and latency percentiles per endpoint and file size, and per server stage when the "
+        "server runs with TIMING_ENABLED."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url", default="http://localhost:8000/", help="Base URL of the server."
+        )
+        parser.add_argument(
+            "--endpoints",
+            nargs="+",
+            choices=list(ENDPOINTS),
+            default=list(ENDPOINTS),
+            help="Endpoints to drive.",
+        )
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=[1_000, 10_000],
+            help="Number of rows of the uploaded files.",
+        )
+        parser.add_argument(
+            "--symbols",
+            type=int,
+            default=10,
+            help="Distinct symbols of the uploaded files.",
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=4, help="Number of concurrent uploads."
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=20,
+            help="Number of uploads per endpoint and file size.",
+        )
+        parser.add_argument(
+            "--same-file",
+            action="store_true",
+            help="Upload one file over and over, measuring the duplicate upload short-circuit of "
+            "trades files, P&L files are processed again. By default every upload sends a "
+            "distinct file, as uploads are stored by content.",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            help="Base seed of the generated files, to upload the same files again. Random by "
+            "default, a second run would otherwise only hit the duplicate upload short-circuit; "
+            "0 with `--same-file`.",
+        )
+        parser.add_argument(
+            "--timeout", type=float, default=300, help="Seconds to wait for a response."
+        )
+        parser.add_argument(
+            "--output", type=Path, help="Write results as JSON to this file."
+        )
+
+    def handle(self, *args, **options):
+        if options["seed"] is None:
+            options["seed"] = 0 if options["same_file"] else secrets.randbits(32)
+        clients = threading.local()
+
+        def upload(endpoint: str, path: Path) -> tuple[float, int | None, dict]:
+            if not hasattr(clients, "client"):
+                clients.client = UploadClient(options["url"], options["timeout"])
+            started = time.perf_counter()
+            try:
+                status, stages = clients.client.upload(endpoint, path)
+            except (URLError, OSError):
+                status, stages = None, {}
+            return time.perf_counter() - started, status, stages
+
+        results = []
+        with tempfile.TemporaryDirectory() as tmp:
+            for endpoint in options["endpoints"]:
+                for size in options["sizes"]:
+                    files = self._generate_files(
+                        Path(tmp), ENDPOINTS[endpoint], size, options
+                    )
+                    self.stderr.write(
+                        f"{endpoint}: {len(files)} uploads of {size} rows, "
+                        f"seed {options['seed']}"
+                    )
+
+                    started = time.perf_counter()
+                    with ThreadPoolExecutor(
+                        max_workers=options["concurrency"]
+                    ) as executor:
+                        outcomes = list(
+                            executor.map(lambda path: upload(endpoint, path), files)
+                        )
+                    elapsed = time.perf_counter() - started
+                    results.append(self._summarize(endpoint, size, outcomes, elapsed))
+
+        self._report(results)
+        if options["output"]:
+            options["output"].write_text(
+                json.dumps(
+                    {"options": self._json_options(options), "results": results},
+                    indent=2,
+                )
+            )
+
+    @staticmethod
+    def _generate_files(
+        location: Path, kind: str, size: int, options: dict
+    ) -> list[Path]:
+        """Write the files uploaded for one endpoint and file size.
+        Args:
+            location: Directory receiving the files
+            kind: Kind of file, `trades` or `pnl`
+            size: Number of rows of every file
+            options: Command options
+
+        Returns:
+            One file per upload, the same file repeated with `--same-file`.
+        """
+        count = 1 if options["same_file"] else options["requests"]
+        files = []
+        for seed in range(options["seed"], options["seed"] + count):
+            path = location / f"{kind}-{size}-{seed}.xlsx"
+            write_excel(
+                generate_trades(size, symbols=options["symbols"], seed=seed, kind=kind),
+                path,
+            )
+            files.append(path)
+        return files * (options["requests"] // count)
+
+    @staticmethod
+    def _summarize(
+        endpoint: str,
+        size: int,
+        outcomes: list[tuple[float, int | None, dict]],
+        elapsed: float,
+    ) -> dict:
+        """Compute throughput and latency percentiles of a batch of uploads.
+        Args:
+            endpoint: Endpoint driven
+            size: Number of rows of every file
+            outcomes: Latency, in seconds, HTTP status, None when no response was received, and
+                server stage durations of every upload
+            elapsed: Wall time of the whole batch, in seconds
+
+        Returns:
+            Summary of the batch, latencies of successful uploads only.
+        """
+        succeeded = [
+            (latency, stages) for latency, status, stages in outcomes if status == 200
+        ]
+        latencies = np.array([latency for latency, _ in succeeded])
+        statuses = {}
+        for _, status, _ in outcomes:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        p50, p95, p99 = _percentiles(latencies)
+
+        durations: dict[str, list[float]] = {}
+        for _, stages in succeeded:
+            for name, duration in stages.items():
+                durations.setdefault(name, []).append(duration)
+        stages = {}
+        for name, values in durations.items():
+            stage_p50, stage_p95, stage_p99 = _percentiles(np.array(values))
+            stages[name] = {"p50": stage_p50, "p95": stage_p95, "p99": stage_p99}
+
+        return {
+            "endpoint": endpoint,
+            "rows": size,
+            "requests": len(outcomes),
+            "errors": len(outcomes) - len(latencies),
+            "statuses": statuses,
+            "throughput": len(latencies) / elapsed if elapsed else None,
+            "rows_per_second": len(latencies) * size / elapsed if elapsed else None,
+            "p50": p50,
+            "p95": p95,
+            "p99": p99,
+            "stages": stages,
+        }
+
+    def _report(self, results: list[dict]) -> None:
+        """Print results as a table."""
+        header = (
+            f"{'endpoint':<16}{'rows':>10}{'requests':>10}{'errors':>8}{'req/s':>9}"
+        )
+        header += f"{'p50 (s)':>10}{'p95 (s)':>10}{'p99 (s)':>10}"
+        self.stdout.write(header)
+        for r in results:
+            line = (
+                f"{r['endpoint']:<16}{r['rows']:>10}{r['requests']:>10}{r['errors']:>8}"
+            )
+            line += f"{r['throughput'] or 0:>9.2f}"
+            for key in ["p50", "p95", "p99"]:
+                line += f"{r[key]:>10.3f}" if r[key] is not None else f"{'-':>10}"
+            self.stdout.write(line)
+            for name, stage in r["stages"].items():
+                line = f"  {name:<48}"
+                line += "".join(f"{stage[key]:>10.3f}" for key in ["p50", "p95", "p99"])
+                self.stdout.write(line)
+
+    @staticmethod
+    def _json_options(options: dict) -> dict:
+        """Options worth keeping next to the results."""
+        keys = [
+            "url",
+            "endpoints",
+            "sizes",
+            "symbols",
+            "concurrency",
+            "requests",
+            "same_file",
+            "seed",
+        ]
+        return {key: options[key] for key in keys}
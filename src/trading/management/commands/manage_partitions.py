@@ -0,0 +1,111 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from trading.repository.partitions import (
+    PARTITIONED_TABLES,
+    add_months,
+    create_partition,
+    detach_partition,
+    is_partitioned,
+    list_partitions,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Create monthly partitions of transactions and daily net positions ahead of time, "
+        "and detach partitions older than the retention period."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=3,
+            help="Number of months after the current one to create partitions for.",
+        )
+        parser.add_argument(
+            "--retain",
+            type=int,
+            default=0,
+            help="Number of months before the current one to keep attached, 0 keeps them all.",
+        )
+        parser.add_argument(
+            "--drop",
+            action="store_true",
+            help="Drop detached partitions instead of keeping them as standalone tables.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only list partitions that would be created and detached.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Table partitioning requires PostgreSQL.")
+
+        current = add_months(date.today(), 0)
+        months = [add_months(current, i) for i in range(options["ahead"] + 1)]
+        # Partitions whose every row is dated before this month are out of the retention period
+        cutoff = add_months(current, -options["retain"]) if options["retain"] else None
+
+        with connection.cursor() as cursor:
+            for table in PARTITIONED_TABLES:
+                if not is_partitioned(cursor, table):
+                    raise CommandError(
+                        f"{table} is not partitioned, run `python manage.py migrate` first."
+                    )
+                self._create(cursor, table, months, options["dry_run"])
+                if cutoff is not None:
+                    self._detach(
+                        cursor, table, cutoff, options["drop"], options["dry_run"]
+                    )
+
+    def _create(self, cursor, table: str, months: list[date], dry_run: bool) -> None:
+        """Create missing partitions of a table.
+        Args:
+            cursor: Database cursor
+            table: Name of the partitioned table
+            months: First day of every month needing a partition
+            dry_run: Only report missing partitions
+
+        Returns:
+            None
+        """
+        existing = {partition.start for partition in list_partitions(cursor, table)}
+        for month in months:
+            if month in existing:
+                continue
+            if dry_run:
+                self.stdout.write(f"Would create {table} partition for {month:%Y-%m}")
+                continue
+            name = create_partition(cursor, table, month)
+            self.stdout.write(self.style.SUCCESS(f"Created {name}"))
+
+    def _detach(
+        self, cursor, table: str, cutoff: date, drop: bool, dry_run: bool
+    ) -> None:
+        """Detach partitions of a table holding only rows dated before the cutoff.
+        Args:
+            cursor: Database cursor
+            table: Name of the partitioned table
+            cutoff: First day of the oldest month to keep
+            drop: Drop detached partitions
+            dry_run: Only report partitions to detach
+
+        Returns:
+            None
+        """
+        action = "Dropped" if drop else "Detached"
+        for partition in list_partitions(cursor, table):
+            if partition.end is None or partition.end > cutoff:
+                continue
+            if dry_run:
+                self.stdout.write(
+                    f"Would detach {partition.name}{' and drop it' if drop else ''}"
+                )
+                continue
+            detach_partition(cursor, table, partition.name, drop=drop)
+            self.stdout.write(self.style.SUCCESS(f"{action} {partition.name}"))
@@ -0,0 +1,107 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+
+import django
+from django.core.management.base import BaseCommand
+from trading.settings import JOB_WORKERS
+
+
+def _run_job(job_id: int) -> str:
+    """Process a job in a worker process.
+    Models are imported here, once `django.setup` ran in the worker, not when the module is
+    imported to unpickle this function.
+    Args:
+        job_id: Identifier of the job
+
+    Returns:
+        Final status of the job.
+    """
+    from trading.services import jobs
+
+    return jobs.run(job_id)
+
+
+class Command(BaseCommand):
+    help = "Process queued uploads with a pool of worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=JOB_WORKERS,
+            help="Number of worker processes.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait before polling an empty queue again.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the queue is empty instead of waiting for new jobs.",
+        )
+
+    def handle(self, *args, **options):
+        # A worker process dying, e.g. killed for using too much memory, breaks the whole pool:
+        # its jobs are queued again and a new pool is started
+        while not self._serve(options):
+            pass
+
+    def _serve(self, options: dict) -> bool:
+        """Process jobs with a new pool of worker processes, until the pool breaks.
+        Args:
+            options: Command options
+
+        Returns:
+            True once the queue is empty with `--once`, False when the pool broke.
+        """
+        from trading.services import jobs
+
+        workers = options["workers"]
+        # Workers are spawned, not forked, so they never share the database connection of
+        # this process
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=get_context("spawn"),
+            initializer=django.setup,
+        ) as executor:
+            pending = {}
+            while True:
+                for job_id in jobs.claim(workers - len(pending)):
+                    pending[executor.submit(_run_job, job_id)] = job_id
+
+                if not pending:
+                    if options["once"]:
+                        return True
+                    time.sleep(options["poll_interval"])
+                    continue
+
+                done, _ = wait(
+                    pending,
+                    timeout=options["poll_interval"],
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    job_id = pending.pop(future)
+                    try:
+                        self.stdout.write(f"Job {job_id}: {future.result()}")
+                    except BrokenProcessPool:
+                        # Every job of the pool is lost, not only the one that broke it
+                        jobs.retry(
+                            [job_id, *pending.values()],
+                            "Worker process died while processing the job.",
+                        )
+                        self.stderr.write(
+                            f"Worker pool broke while running job {job_id}, restarting it"
+                        )
+                        return False
+                    except Exception as e:
+                        # Job status could not be stored, e.g. database unreachable
+                        jobs.retry([job_id], str(e))
+                        self.stderr.write(f"Job {job_id} crashed: {e}")
+                # Jobs still running are kept away from other workers
+                jobs.renew(pending.values())
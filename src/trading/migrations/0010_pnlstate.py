@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trading", "0009_dailynetposition"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PnLState",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("symbol", models.CharField(max_length=10, unique=True)),
+                ("date", models.DateField()),
+                ("net_quantity", models.FloatField()),
+                ("total_cost", models.FloatField()),
+                ("unit_cost", models.FloatField()),
+                ("realised_pnl", models.FloatField()),
+                ("unrealised_pnl", models.FloatField()),
+            ],
+            options={
+                "db_table": "trading_pnl_states",
+            },
+        ),
+    ]
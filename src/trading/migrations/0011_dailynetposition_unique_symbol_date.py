@@ -0,0 +1,41 @@
+# Generated by Django 5.1.4 on 2026-10-18 11:05
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicates(apps, schema_editor):
+    """Collapse duplicated (symbol, date) rows into one holding their sum, as readers did so far."""
+    DailyNetPosition = apps.get_model("trading", "DailyNetPosition")
+    duplicates = (
+        DailyNetPosition.objects.values("symbol", "date")
+        .annotate(total=Sum("net_position"), keep=Min("id"), count=Count("id"))
+        .filter(count__gt=1)
+    )
+    for duplicate in duplicates.iterator():
+        rows = DailyNetPosition.objects.filter(
+            symbol=duplicate["symbol"], date=duplicate["date"]
+        )
+        rows.exclude(pk=duplicate["keep"]).delete()
+        rows.update(net_position=duplicate["total"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trading", "0010_pnlstate"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name="dailynetposition",
+            name="trading_dai_symbol_2c7097_idx",
+        ),
+        migrations.AddConstraint(
+            model_name="dailynetposition",
+            constraint=models.UniqueConstraint(
+                fields=("symbol", "date"), name="unique_daily_net_symbol_date"
+            ),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.4 on 2026-10-18 17:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trading", "0012_uploadjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyPrice",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("symbol", models.CharField(max_length=10)),
+                ("date", models.DateField()),
+                ("price", models.FloatField()),
+            ],
+            options={
+                "db_table": "trading_daily_prices",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("symbol", "date"), name="unique_daily_price_symbol_date"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.4 on 2026-10-18 17:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trading", "0013_dailyprice"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StoredUpload",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("sha256", models.CharField(max_length=64)),
+                ("kind", models.CharField(max_length=6)),
+                ("file_name", models.CharField(max_length=255)),
+                ("result", models.JSONField(null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("processed_at", models.DateTimeField(null=True)),
+            ],
+            options={
+                "db_table": "trading_stored_uploads",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("sha256", "kind"),
+                        name="unique_stored_upload_sha256_kind",
+                    )
+                ],
+            },
+        ),
+        migrations.AddField(
+            model_name="uploadjob",
+            name="upload",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                to="trading.storedupload",
+            ),
+        ),
+    ]
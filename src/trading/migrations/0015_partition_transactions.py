@@ -0,0 +1,31 @@
+from django.db import migrations
+from trading.migrations._partitioning import partition_table, unpartition_table
+
+TABLE = "trading_transactions"
+
+
+def partition(apps, schema_editor):
+    """Split transactions into monthly partitions, PostgreSQL only."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        partition_table(cursor, TABLE)
+
+
+def unpartition(apps, schema_editor):
+    """Merge monthly partitions of transactions back into a plain table, PostgreSQL only."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        unpartition_table(cursor, TABLE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trading", "0014_storedupload"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition, unpartition),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations
+from trading.migrations._partitioning import partition_table, unpartition_table
+
+TABLE = "trading_daily_net_positions"
+
+
+def partition(apps, schema_editor):
+    """Split daily net positions into monthly partitions, PostgreSQL only."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        partition_table(cursor, TABLE)
+
+
+def unpartition(apps, schema_editor):
+    """Merge monthly partitions of daily net positions back into a plain table, PostgreSQL only."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        unpartition_table(cursor, TABLE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trading", "0015_partition_transactions"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition, unpartition),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trading", "0016_partition_daily_net_positions"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="uploadjob",
+            name="attempts",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="uploadjob",
+            name="heartbeat_at",
+            field=models.DateTimeField(null=True),
+        ),
+    ]
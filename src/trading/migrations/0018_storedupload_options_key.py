@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trading", "0017_uploadjob_lease"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="storedupload",
+            name="unique_stored_upload_sha256_kind",
+        ),
+        migrations.AddField(
+            model_name="storedupload",
+            name="options_key",
+            field=models.CharField(default="", max_length=64),
+        ),
+        migrations.AddConstraint(
+            model_name="storedupload",
+            constraint=models.UniqueConstraint(
+                fields=("sha256", "kind", "options_key"),
+                name="unique_stored_upload_sha256_kind_options",
+            ),
+        ),
+    ]
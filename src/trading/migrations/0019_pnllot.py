@@ -0,0 +1,33 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trading", "0018_storedupload_options_key"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PnLLot",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("symbol", models.CharField(max_length=10)),
+                ("position", models.PositiveIntegerField()),
+                ("open_date", models.DateField(null=True)),
+                ("quantity", models.FloatField()),
+                ("unit_cost", models.FloatField()),
+            ],
+            options={
+                "db_table": "trading_pnl_lots",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("symbol", "position"),
+                        name="unique_pnl_lot_symbol_position",
+                    )
+                ],
+            },
+        ),
+    ]
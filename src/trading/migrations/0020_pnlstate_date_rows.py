@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trading", "0019_pnllot"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pnlstate",
+            name="date_rows",
+            field=models.PositiveIntegerField(null=True),
+        ),
+    ]
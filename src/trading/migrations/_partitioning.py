@@ -0,0 +1,282 @@
+# Monthly partitioning DDL run by migrations 0015 and 0016. Frozen copy of
+# `trading.repository.partitions` as these migrations were written, so that later changes of the
+# live module never change what an applied migration does: never edit it, write a new migration.
+import re
+from datetime import date
+from typing import NamedTuple, Optional
+
+from django.db import connection
+from django.db import transaction as db_transaction
+
+PARTITION_KEY = "date"
+PARTITION_HISTORY_MONTHS = 24
+
+_BOUNDS = re.compile(r"FROM \('([\d-]+)'\) TO \('([\d-]+)'\)")
+
+
+class Partition(NamedTuple):
+    """Partition of a table, bounds are None for the default partition."""
+
+    name: str
+    start: Optional[date] = None
+    end: Optional[date] = None
+
+
+def add_months(month: date, months: int) -> date:
+    """First day of the month `months` after the month of given date.
+    Args:
+        month: Any day of the month to start from
+        months: Number of months to add, negative to go back
+
+    Returns:
+        First day of the resulting month.
+    """
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """Name of the partition of a table holding one month of rows."""
+    return f"{table}_p{month:%Y_%m}"
+
+
+def default_partition_name(table: str) -> str:
+    """Name of the partition of a table holding rows of months without their own partition."""
+    return f"{table}_default"
+
+
+def is_partitioned(cursor, table: str) -> bool:
+    """Whether a table exists and is partitioned.
+    Args:
+        cursor: Database cursor
+        table: Name of the table
+
+    Returns:
+        True for a partitioned table.
+    """
+    cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [table])
+    row = cursor.fetchone()
+    return row is not None and row[0] == "p"
+
+
+def list_partitions(cursor, table: str) -> list[Partition]:
+    """Partitions attached to a table.
+    Args:
+        cursor: Database cursor
+        table: Name of the partitioned table
+
+    Returns:
+        Partitions ordered by name, i.e. by month, the default partition included.
+    """
+    cursor.execute(
+        """
+        SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = to_regclass(%s)
+        ORDER BY child.relname
+        """,
+        [table],
+    )
+    partitions = []
+    for name, bound in cursor.fetchall():
+        match = _BOUNDS.search(bound)
+        if match is None:
+            partitions.append(Partition(name))
+            continue
+        start, end = (date.fromisoformat(value) for value in match.groups())
+        partitions.append(Partition(name, start, end))
+    return partitions
+
+
+def create_partition(cursor, table: str, month: date) -> Optional[str]:
+    """Create the partition of a table holding one month of rows, unless it already exists.
+    Rows of that month already stored in the default partition are moved into the new one.
+    Args:
+        cursor: Database cursor
+        table: Name of the partitioned table
+        month: First day of the month
+
+    Returns:
+        Name of the created partition, None when it already existed.
+    """
+    start, end = month, add_months(month, 1)
+    if any(partition.start == start for partition in list_partitions(cursor, table)):
+        return None
+
+    quote = connection.ops.quote_name
+    name = partition_name(table, month)
+    default = default_partition_name(table)
+    # Bounds are dates formatted here, not user input
+    bounds = f"FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    with db_transaction.atomic():
+        # Attaching a table, instead of creating it with `PARTITION OF`, does not fail when the
+        # default partition already holds rows of the month: they are moved first
+        cursor.execute(
+            f"CREATE TABLE {quote(name)} "
+            f"(LIKE {quote(table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+        cursor.execute("SELECT to_regclass(%s)", [default])
+        if cursor.fetchone()[0] is not None:
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {quote(default)} "
+                f"WHERE {PARTITION_KEY} >= %s AND {PARTITION_KEY} < %s RETURNING *) "
+                f"INSERT INTO {quote(name)} SELECT * FROM moved",
+                [start, end],
+            )
+        cursor.execute(
+            f"ALTER TABLE {quote(table)} ATTACH PARTITION {quote(name)} FOR VALUES {bounds}"
+        )
+    return name
+
+
+def partition_table(
+    cursor, table: str, history: int = PARTITION_HISTORY_MONTHS
+) -> None:
+    """Convert a table into a table partitioned by month, keeping its rows, indexes and constraints.
+    Rows are copied into one partition per month from the first stored month up to the current
+    one, at most `history` months back, plus a default partition catching any other month. The
+    primary key becomes (id, date), PostgreSQL requires every unique constraint of a partitioned
+    table to hold the partition key.
+    Args:
+        cursor: Database cursor
+        table: Name of the table, having `id` and `date` columns
+        history: Maximum number of months before the current one given their own partition
+
+    Returns:
+        None
+    """
+    if is_partitioned(cursor, table):
+        return
+    quote = connection.ops.quote_name
+    previous = f"{table}_unpartitioned"
+
+    cursor.execute(f"ALTER TABLE {quote(table)} RENAME TO {quote(previous)}")
+    constraints, indexes = _constraints_and_indexes(cursor, previous)
+    cursor.execute(
+        f"CREATE TABLE {quote(table)} (LIKE {quote(previous)}) "
+        f"PARTITION BY RANGE ({PARTITION_KEY})"
+    )
+    cursor.execute(f"SELECT MIN({PARTITION_KEY}) FROM {quote(previous)}")
+    first = cursor.fetchone()[0] or date.today()
+    last = add_months(date.today(), 0)
+    month = max(add_months(first, 0), add_months(last, -history))
+    while month <= last:
+        create_partition(cursor, table, month)
+        month = add_months(month, 1)
+    cursor.execute(
+        f"CREATE TABLE {quote(default_partition_name(table))} "
+        f"PARTITION OF {quote(table)} DEFAULT"
+    )
+    cursor.execute(f"INSERT INTO {quote(table)} SELECT * FROM {quote(previous)}")
+    cursor.execute(f"DROP TABLE {quote(previous)}")
+
+    _restore_keys(cursor, table, f"(id, {PARTITION_KEY})", constraints, indexes)
+
+
+def unpartition_table(cursor, table: str) -> None:
+    """Convert a partitioned table back into a plain table, reverting `partition_table`.
+    Partitions detached before are left untouched.
+    Args:
+        cursor: Database cursor
+        table: Name of the partitioned table
+
+    Returns:
+        None
+    """
+    if not is_partitioned(cursor, table):
+        return
+    quote = connection.ops.quote_name
+    previous = f"{table}_partitioned"
+
+    cursor.execute(f"ALTER TABLE {quote(table)} RENAME TO {quote(previous)}")
+    constraints, indexes = _constraints_and_indexes(cursor, previous)
+    cursor.execute(f"CREATE TABLE {quote(table)} (LIKE {quote(previous)})")
+    cursor.execute(f"INSERT INTO {quote(table)} SELECT * FROM {quote(previous)}")
+    # Partitions are dropped along with their table
+    cursor.execute(f"DROP TABLE {quote(previous)}")
+
+    _restore_keys(cursor, table, "(id)", constraints, indexes)
+
+
+def _constraints_and_indexes(
+    cursor, table: str
+) -> tuple[list[tuple[str, str]], list[str]]:
+    """Definitions of unique constraints and plain indexes of a table, primary key excluded.
+    Args:
+        cursor: Database cursor
+        table: Name of the table
+
+    Returns:
+        Name and definition of every unique constraint, `CREATE INDEX` statement of every index
+        not backing a constraint.
+    """
+    cursor.execute(
+        """
+        SELECT conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = to_regclass(%s) AND contype = 'u'
+        ORDER BY conname
+        """,
+        [table],
+    )
+    constraints = cursor.fetchall()
+    cursor.execute(
+        """
+        SELECT pg_get_indexdef(indexrelid)
+        FROM pg_index
+        WHERE indrelid = to_regclass(%s)
+          AND indexrelid NOT IN (SELECT conindid FROM pg_constraint WHERE conrelid = indrelid)
+        ORDER BY indexrelid
+        """,
+        [table],
+    )
+    indexes = [definition for (definition,) in cursor.fetchall()]
+    return constraints, indexes
+
+
+def _restore_keys(
+    cursor,
+    table: str,
+    primary_key: str,
+    constraints: list[tuple[str, str]],
+    indexes: list[str],
+) -> None:
+    """Recreate the id sequence, primary key, unique constraints and indexes of a rebuilt table.
+    Names are kept, the table they were read from must be dropped first.
+    Args:
+        cursor: Database cursor
+        table: Name of the rebuilt table
+        primary_key: Columns of the primary key, e.g. `(id, date)`
+        constraints: Name and definition of every unique constraint
+        indexes: `CREATE INDEX` statement of every index, on any table
+
+    Returns:
+        None
+    """
+    quote = connection.ops.quote_name
+    sequence = f"{table}_id_seq"
+    cursor.execute(f"DROP SEQUENCE IF EXISTS {quote(sequence)}")
+    cursor.execute(
+        f"CREATE SEQUENCE {quote(sequence)} AS integer OWNED BY {quote(table)}.id"
+    )
+    cursor.execute(
+        f"ALTER TABLE {quote(table)} ALTER COLUMN id SET DEFAULT nextval(%s)",
+        [sequence],
+    )
+    cursor.execute(
+        f"SELECT setval(%s, COALESCE((SELECT MAX(id) FROM {quote(table)}), 0) + 1, false)",
+        [sequence],
+    )
+    cursor.execute(
+        f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(table + '_pkey')} "
+        f"PRIMARY KEY {primary_key}"
+    )
+    for name, definition in constraints:
+        cursor.execute(
+            f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} {definition}"
+        )
+    for definition in indexes:
+        cursor.execute(
+            re.sub(r" ON (ONLY )?\S+ USING ", f" ON {quote(table)} USING ", definition)
+        )
@@ -32,8 +32,138 @@ class DailyNetPosition(models.Model):
         db_table = "trading_daily_net_positions"
         indexes = [
             models.Index(fields=["symbol"]),
-            models.Index(fields=["symbol", "date"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["symbol", "date"], name="unique_daily_net_symbol_date"
+            ),
         ]
 
     def __str__(self):
         return f"{self.date} - {self.symbol}  @  {self.net_position}"
+
+
+class DailyPrice(models.Model):
+    id = models.AutoField(primary_key=True)
+    symbol = models.CharField(max_length=10)
+    date = models.DateField()
+    price = models.FloatField()
+
+    class Meta:
+        db_table = "trading_daily_prices"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["symbol", "date"], name="unique_daily_price_symbol_date"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.date} - {self.symbol}  @  {self.price}"
+
+
+class PnLState(models.Model):
+    id = models.AutoField(primary_key=True)
+    symbol = models.CharField(max_length=10, unique=True)
+    date = models.DateField()
+    net_quantity = models.FloatField()
+    total_cost = models.FloatField()
+    unit_cost = models.FloatField()
+    realised_pnl = models.FloatField()
+    unrealised_pnl = models.FloatField()
+    # Rows of the symbol processed on `date`, a later upload may add trades of the same day.
+    # Unknown for states saved before it was counted, their whole last day is then skipped.
+    date_rows = models.PositiveIntegerField(null=True)
+
+    class Meta:
+        db_table = "trading_pnl_states"
+
+    def __str__(self):
+        return f"{self.date} - {self.symbol} - {self.net_quantity} @ {self.unit_cost}"
+
+
+class PnLLot(models.Model):
+    id = models.AutoField(primary_key=True)
+    symbol = models.CharField(max_length=10)
+    # Order of the lot within the open lots of its symbol, oldest first
+    position = models.PositiveIntegerField()
+    open_date = models.DateField(null=True)
+    quantity = models.FloatField()
+    unit_cost = models.FloatField()
+
+    class Meta:
+        db_table = "trading_pnl_lots"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["symbol", "position"], name="unique_pnl_lot_symbol_position"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.open_date} - {self.symbol} - {self.quantity} @ {self.unit_cost}"
+
+
+class StoredUpload(models.Model):
+    id = models.AutoField(primary_key=True)
+    sha256 = models.CharField(max_length=64)
+    kind = models.CharField(max_length=6)
+    # Digest of the options the file is processed with, a P&L file processed with other options
+    # is another upload
+    options_key = models.CharField(max_length=64, default="")
+    file_name = models.CharField(max_length=255)
+    result = models.JSONField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True)
+
+    class Meta:
+        db_table = "trading_stored_uploads"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["sha256", "kind", "options_key"],
+                name="unique_stored_upload_sha256_kind_options",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.sha256} - {self.kind} - {self.processed_at}"
+
+
+class UploadJob(models.Model):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+    TRADES = "TRADES"
+    PNL = "PNL"
+
+    id = models.AutoField(primary_key=True)
+    kind = models.CharField(max_length=6, choices=[(TRADES, "Trades"), (PNL, "P&L")])
+    file_name = models.CharField(max_length=255)
+    options = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=7,
+        choices=[
+            (QUEUED, "Queued"),
+            (RUNNING, "Running"),
+            (DONE, "Done"),
+            (FAILED, "Failed"),
+        ],
+        default=QUEUED,
+    )
+    result = models.JSONField(null=True)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True)
+    finished_at = models.DateTimeField(null=True)
+    heartbeat_at = models.DateTimeField(null=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    upload = models.ForeignKey(StoredUpload, null=True, on_delete=models.SET_NULL)
+
+    class Meta:
+        db_table = "trading_upload_jobs"
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.id} - {self.kind} - {self.file_name} - {self.status}"
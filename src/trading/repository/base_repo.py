@@ -1,10 +1,16 @@
-from datetime import datetime
-from typing import Protocol
+from datetime import date, datetime
+from typing import Iterator, Optional, Protocol
 
 import pandas as pd
 
 DF_VALUE = datetime | int | float | str
 
+# Number of rows sent to the database per statement by bulk writes
+BULK_BATCH_SIZE = 5_000
+
+# Number of rows fetched from the database per round trip by chunked reads
+FETCH_CHUNK_SIZE = 50_000
+
 
 class Repository(Protocol):
     """
@@ -21,11 +27,53 @@ class Repository(Protocol):
         """
         ...
 
-    def fetch_all_transactions(self) -> pd.DataFrame:
+    def save_frame(self, df: pd.DataFrame) -> None:
+        """
+        Save multiple transactions held in a DataFrame.
+        By default, rows are exported as dictionaries and handed to `save_transactions`,
+        backends able to load columns directly should override it.
+
+        Args:
+            df: A DataFrame representing transaction data.
+        """
+        self.save_transactions(df.to_dict(orient="records"))
+
+    def fetch_all_transactions(
+        self,
+        symbols: Optional[list[str]] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> pd.DataFrame:
         """
         Fetch all transactions.
 
+        Args:
+            symbols: Only fetch transactions of these symbols.
+            start: Only fetch transactions dated on or after this date.
+            end: Only fetch transactions dated on or before this date.
+
         Returns:
             A DataFrame containing all transactions.
         """
         ...
+
+    def iter_transactions(
+        self,
+        symbols: Optional[list[str]] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        chunk_size: int = FETCH_CHUNK_SIZE,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Fetch transactions chunk by chunk.
+
+        Args:
+            symbols: Only fetch transactions of these symbols.
+            start: Only fetch transactions dated on or after this date.
+            end: Only fetch transactions dated on or before this date.
+            chunk_size: Maximum number of rows of every chunk.
+
+        Returns:
+            An iterator of DataFrames, ordered by symbol and date.
+        """
+        ...
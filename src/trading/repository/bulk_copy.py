@@ -0,0 +1,79 @@
+from io import StringIO
+
+import pandas as pd
+from django.db import connection
+from django.db import models
+from django.db import transaction as db_transaction
+from trading import timing
+from trading.repository.base_repo import BULK_BATCH_SIZE
+from trading.repository.data_version import bump_data_version
+
+# Number of rows serialized into one in-memory CSV buffer
+COPY_BATCH_SIZE = 100_000
+
+
+class CopyLoaderMixin:
+    """
+    Load DataFrames with PostgreSQL `COPY FROM STDIN` instead of building one model instance per row.
+    Classes using it define `model`, the Django model to write into, and `columns`, mapping every
+    model field to the DataFrame column holding its values. On any other database, rows are
+    written with batched `bulk_create` through `save_transactions`. Either way the data version
+    is bumped once rows are committed, see `trading.repository.data_version`.
+    """
+
+    model: type[models.Model]
+    columns: dict[str, str]
+
+    def save_frame(self, df: pd.DataFrame) -> None:
+        """Save DataFrame rows in a single database transaction.
+        Args:
+            df: A DataFrame holding every column listed in `columns`.
+
+        Returns:
+            None
+        """
+        if connection.vendor != "postgresql":
+            with db_transaction.atomic():
+                for start in range(0, len(df), BULK_BATCH_SIZE):
+                    batch = df.iloc[start : start + BULK_BATCH_SIZE]
+                    self.save_transactions(batch.to_dict(orient="records"))
+            return
+
+        fields = ", ".join(connection.ops.quote_name(f) for f in self.columns)
+        sql = (
+            f"COPY {connection.ops.quote_name(self.model._meta.db_table)} ({fields}) "
+            "FROM STDIN WITH (FORMAT csv)"
+        )
+        frame = self._to_db_types(df)
+        with (
+            timing.stage(f"copy_{self.model._meta.model_name}", rows=len(frame)),
+            db_transaction.atomic(),
+            connection.cursor() as cursor,
+        ):
+            for start in range(0, len(frame), COPY_BATCH_SIZE):
+                buffer = StringIO()
+                frame.iloc[start : start + COPY_BATCH_SIZE].to_csv(
+                    buffer, index=False, header=False, date_format="%Y-%m-%d"
+                )
+                buffer.seek(0)
+                cursor.copy_expert(sql, buffer)
+            bump_data_version()
+
+    def _to_db_types(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Select mapped columns and cast them to the text representation expected by `COPY`.
+        Args:
+            df: A DataFrame holding every column listed in `columns`.
+
+        Returns:
+            DataFrame with one column per model field, in the order of `columns`.
+        """
+        frame = df[list(self.columns.values())].copy()
+        frame.columns = list(self.columns)
+        for name in self.columns:
+            field = self.model._meta.get_field(name)
+            if isinstance(field, models.IntegerField):
+                # `COPY` rejects "10.0" for an integer column, unlike an INSERT does
+                frame[name] = frame[name].round().astype("Int64")
+            elif isinstance(field, models.DateField):
+                frame[name] = pd.to_datetime(frame[name])
+        return frame
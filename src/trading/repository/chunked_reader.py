@@ -0,0 +1,85 @@
+from datetime import date
+from itertools import islice
+from typing import Iterator, Optional
+
+import pandas as pd
+from django.db import models
+from trading.repository.base_repo import FETCH_CHUNK_SIZE
+
+
+class ChunkedReaderMixin:
+    """
+    Read rows through a server-side cursor, straight into DataFrame columns.
+    Classes using it define `model`, the Django model to read from, and `columns`, mapping every
+    model field to the DataFrame column receiving its values. Only plain tuples are fetched, no
+    model instance is ever built.
+    """
+
+    model: type[models.Model]
+    columns: dict[str, str]
+
+    def iter_transactions(
+        self,
+        symbols: Optional[list[str]] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        chunk_size: int = FETCH_CHUNK_SIZE,
+    ) -> Iterator[pd.DataFrame]:
+        """Fetch rows chunk by chunk, ordered along the (symbol, date) index.
+        Args:
+            symbols: Only fetch rows of these symbols.
+            start: Only fetch rows dated on or after this date.
+            end: Only fetch rows dated on or before this date.
+            chunk_size: Maximum number of rows of every chunk.
+
+        Returns:
+            An iterator of DataFrames holding the columns listed in `columns`.
+        """
+        queryset = self.model.objects.all()
+        if symbols is not None:
+            queryset = queryset.filter(symbol__in=symbols)
+        if start is not None:
+            queryset = queryset.filter(date__gte=start)
+        if end is not None:
+            queryset = queryset.filter(date__lte=end)
+
+        rows = (
+            queryset.order_by("symbol", "date", "id")
+            .values_list(*self.columns)
+            .iterator(chunk_size=chunk_size)
+        )
+        while batch := list(islice(rows, chunk_size)):
+            yield self._to_frame(batch)
+
+    def fetch_all_transactions(
+        self,
+        symbols: Optional[list[str]] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> pd.DataFrame:
+        """Fetch all rows matching given filters.
+        Args:
+            symbols: Only fetch rows of these symbols.
+            start: Only fetch rows dated on or after this date.
+            end: Only fetch rows dated on or before this date.
+
+        Returns:
+            A DataFrame holding the columns listed in `columns`, ordered by symbol and date.
+        """
+        chunks = list(self.iter_transactions(symbols=symbols, start=start, end=end))
+        return pd.concat(chunks, ignore_index=True) if chunks else self._to_frame([])
+
+    def _to_frame(self, rows: list[tuple]) -> pd.DataFrame:
+        """Build a DataFrame out of fetched rows, one column at a time.
+        Args:
+            rows: Values of every row, in the order of `columns`
+
+        Returns:
+            DataFrame with one column per entry of `columns`.
+        """
+        values = list(zip(*rows)) or [()] * len(self.columns)
+        df = pd.DataFrame(
+            {name: list(column) for name, column in zip(self.columns.values(), values)}
+        )
+        df["Date"] = pd.to_datetime(df["Date"])
+        return df
@@ -0,0 +1,104 @@
+from datetime import date
+from typing import Optional
+
+import pandas as pd
+from django.db import connection
+from trading.models import Transaction
+
+CUMULATIVE_COLUMNS = [
+    "Date",
+    "Symbol",
+    "Net Quantity",
+    "Cumulative Quantity",
+    "Net Position",
+    "Cumulative Position",
+]
+
+
+class CumulativePositionRepo:
+    """
+    Running positions computed by the database out of stored transactions.
+    Transactions are aggregated per (symbol, date) and accumulated with
+    `SUM(...) OVER (PARTITION BY symbol ORDER BY date)`, only the requested rows leave the database.
+    """
+
+    def fetch_cumulative_positions(
+        self,
+        symbols: Optional[list[str]] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> pd.DataFrame:
+        """Fetch daily and running net quantity and net position of every symbol.
+        Args:
+            symbols: Only fetch positions of these symbols.
+            start: Only fetch positions dated on or after this date, running totals still
+                include every earlier transaction.
+            end: Only fetch positions dated on or before this date.
+
+        Returns:
+            A DataFrame with the columns listed in `CUMULATIVE_COLUMNS`, ordered by symbol and date.
+        """
+        table = connection.ops.quote_name(Transaction._meta.db_table)
+        conditions, params = [], []
+        if symbols is not None:
+            if not symbols:
+                return self._to_frame([])
+            conditions.append(f"symbol IN ({', '.join(['%s'] * len(symbols))})")
+            params.extend(symbols)
+        # Later transactions never change earlier running totals, they can be filtered out
+        # before the window runs
+        if end is not None:
+            conditions.append("date <= %s")
+            params.append(end)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        # Earlier transactions are part of running totals, rows before `start` are filtered out
+        # only once the window ran
+        outer_where = ""
+        if start is not None:
+            outer_where = "WHERE date >= %s"
+            params.append(start)
+
+        query = f"""
+            WITH daily AS (
+                SELECT
+                    symbol,
+                    date,
+                    SUM(CASE WHEN direction = 'BUY' THEN quantity ELSE -quantity END) AS net_quantity,
+                    SUM(CASE WHEN direction = 'BUY' THEN 1 ELSE -1 END * quantity * price) AS net_position
+                FROM {table}
+                {where}
+                GROUP BY symbol, date
+            ),
+            running AS (
+                SELECT
+                    date,
+                    symbol,
+                    net_quantity,
+                    SUM(net_quantity) OVER (PARTITION BY symbol ORDER BY date) AS cumulative_quantity,
+                    net_position,
+                    SUM(net_position) OVER (PARTITION BY symbol ORDER BY date) AS cumulative_position
+                FROM daily
+            )
+            SELECT * FROM running
+            {outer_where}
+            ORDER BY symbol, date
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(query, params)
+            return self._to_frame(cursor.fetchall())
+
+    @staticmethod
+    def _to_frame(rows: list[tuple]) -> pd.DataFrame:
+        """Build a DataFrame out of fetched rows.
+        Args:
+            rows: Values of every row, in the order of `CUMULATIVE_COLUMNS`.
+
+        Returns:
+            DataFrame with the columns listed in `CUMULATIVE_COLUMNS`.
+        """
+        df = pd.DataFrame.from_records(rows, columns=CUMULATIVE_COLUMNS)
+        df["Date"] = pd.to_datetime(df["Date"])
+        # PostgreSQL sums integers as NUMERIC, fetched as Decimal
+        df[CUMULATIVE_COLUMNS[2:]] = df[CUMULATIVE_COLUMNS[2:]].astype(float)
+        return df
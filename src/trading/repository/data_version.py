@@ -0,0 +1,41 @@
+import time
+
+from django.core.cache import caches
+from django.db import transaction as db_transaction
+from trading.settings import SNAPSHOT_CACHE
+
+# Version of stored transactions, daily net positions and P&L states, part of the key of every
+# cached snapshot: changing it makes every snapshot computed before unreachable.
+DATA_VERSION_KEY = "trading:data-version"
+
+
+def data_version() -> int:
+    """Current version of stored trading data.
+    A missing version, never set or evicted from the cache, is started anew, snapshots cached
+    under the previous one are never served again.
+    Returns:
+        Version, an opaque integer.
+    """
+    cache = caches[SNAPSHOT_CACHE]
+    version = cache.get(DATA_VERSION_KEY)
+    if version is None:
+        # Another process may start it at the same time, the first one written wins
+        cache.add(DATA_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(DATA_VERSION_KEY)
+    return version
+
+
+def bump_data_version() -> None:
+    """Change the data version once the current database transaction commits.
+    Readers keep being served snapshots of the committed data until then, and a rolled back write
+    leaves the version untouched. The version is set to the commit time rather than incremented:
+    the file based cache has no atomic increment, two processes bumping it at once could lose one.
+    Returns:
+        None
+    """
+    db_transaction.on_commit(_set_data_version)
+
+
+def _set_data_version() -> None:
+    """Set the data version to a value never used before."""
+    caches[SNAPSHOT_CACHE].set(DATA_VERSION_KEY, time.time_ns(), timeout=None)
@@ -0,0 +1,105 @@
+from typing import Optional
+
+import pandas as pd
+from django.db import transaction as db_transaction
+from trading import timing
+from trading.models import PnLLot, PnLState
+from trading.repository.base_repo import BULK_BATCH_SIZE, DF_VALUE, Repository
+from trading.repository.data_version import bump_data_version
+
+STATE_FIELDS = {
+    "symbol": "Symbol",
+    "date": "Date",
+    "net_quantity": "Net Quantity",
+    "total_cost": "Total Cost",
+    "unit_cost": "Unit Cost",
+    "realised_pnl": "Total Realised",
+    "unrealised_pnl": "Unrealised P&L",
+    "date_rows": "Date Rows",
+}
+
+LOT_FIELDS = {
+    "symbol": "Symbol",
+    "open_date": "Open Date",
+    "quantity": "Quantity",
+    "unit_cost": "Unit Cost",
+}
+
+
+class PnLStateRepo(Repository):
+    def save_transactions(
+        self,
+        states: list[dict[str, DF_VALUE]],
+        lots: Optional[list[dict[str, DF_VALUE]]] = None,
+    ) -> None:
+        """Insert or update running P&L state of multiple symbols.
+        Open lots of every given symbol are replaced by given ones, in the same transaction.
+        Args:
+            states: A list of dictionaries representing P&L state, one per symbol.
+            lots: A list of dictionaries representing open lots of these symbols, oldest first.
+                None for positions held at their average cost, which keep no lot.
+
+        Returns:
+            None
+        """
+        state_objects = [
+            PnLState(**{field: s[col] for field, col in STATE_FIELDS.items()})
+            for s in states
+        ]
+        positions = {}
+        lot_objects = []
+        for lot in lots or []:
+            values = {field: lot[col] for field, col in LOT_FIELDS.items()}
+            if pd.isna(values["open_date"]):
+                values["open_date"] = None
+            position = positions.get(values["symbol"], 0)
+            positions[values["symbol"]] = position + 1
+            lot_objects.append(PnLLot(position=position, **values))
+
+        with timing.stage(
+            "save_pnl_states", rows=len(state_objects)
+        ), db_transaction.atomic():
+            PnLState.objects.bulk_create(
+                state_objects,
+                update_conflicts=True,
+                unique_fields=["symbol"],
+                update_fields=[f for f in STATE_FIELDS if f != "symbol"],
+            )
+            PnLLot.objects.filter(
+                symbol__in=[state.symbol for state in state_objects]
+            ).delete()
+            PnLLot.objects.bulk_create(lot_objects, batch_size=BULK_BATCH_SIZE)
+            bump_data_version()
+
+    def fetch_states(self, symbols: Optional[list[str]] = None) -> pd.DataFrame:
+        """Fetch running P&L state of given symbols.
+        Args:
+            symbols: Symbols to fetch state for, symbols never processed are skipped. Every
+                processed symbol when None.
+
+        Returns:
+            A DataFrame containing one row per known symbol, ordered by symbol.
+        """
+        states = PnLState.objects.order_by("symbol")
+        if symbols is not None:
+            states = states.filter(symbol__in=symbols)
+        rows = states.values_list(*STATE_FIELDS)
+        df = pd.DataFrame.from_records(list(rows), columns=list(STATE_FIELDS.values()))
+        df["Date"] = pd.to_datetime(df["Date"])
+        return df
+
+    def fetch_lots(self, symbols: Optional[list[str]] = None) -> pd.DataFrame:
+        """Fetch open lots of given symbols.
+        Args:
+            symbols: Symbols to fetch lots for. Every symbol when None.
+
+        Returns:
+            A DataFrame containing one row per open lot, ordered by symbol then oldest first.
+        """
+        lots = PnLLot.objects.order_by("symbol", "position")
+        if symbols is not None:
+            lots = lots.filter(symbol__in=symbols)
+        rows = lots.values_list(*LOT_FIELDS)
+        df = pd.DataFrame.from_records(list(rows), columns=list(LOT_FIELDS.values()))
+        df["Open Date"] = pd.to_datetime(df["Open Date"])
+        return df
@@ -1,9 +1,21 @@
+import pandas as pd
+from django.db import connection
 from django.db import transaction as db_transaction
+from trading import timing
 from trading.models import DailyNetPosition
-from trading.repository.base_repo import DF_VALUE, Repository
+from trading.repository.base_repo import BULK_BATCH_SIZE, DF_VALUE, Repository
+from trading.repository.chunked_reader import ChunkedReaderMixin
+from trading.repository.data_version import bump_data_version
 
 
-class DailyNetPositionRepo(Repository):
+class DailyNetPositionRepo(ChunkedReaderMixin, Repository):
+    model = DailyNetPosition
+    columns = {
+        "date": "Date",
+        "symbol": "Symbol",
+        "net_position": "Net Position",
+    }
+
     def save_transactions(self, positions: list[dict[str, DF_VALUE]]) -> None:
         """Save multiple positions using bulk_create for efficiency.
         Args:
@@ -21,5 +33,77 @@ class DailyNetPositionRepo(Repository):
             for p in positions
         ]
 
-        with db_transaction.atomic():
-            DailyNetPosition.objects.bulk_create(transaction_objects)
+        with (
+            timing.stage("save_daily_net", rows=len(transaction_objects)),
+            db_transaction.atomic(),
+        ):
+            DailyNetPosition.objects.bulk_create(
+                transaction_objects, batch_size=BULK_BATCH_SIZE
+            )
+            bump_data_version()
+
+
+class DailyNetPositionUpsertRepo(DailyNetPositionRepo):
+    """
+    Daily net positions repository keeping a single row per (symbol, date).
+    Rows are written with `INSERT ... ON CONFLICT DO UPDATE`, re-uploading a file either adds its
+    net positions to the stored ones or replaces them.
+    """
+
+    def __init__(self, accumulate: bool = False):
+        """
+        Args:
+            accumulate: Add incoming net positions to the stored ones instead of replacing them.
+        """
+        self.accumulate = accumulate
+
+    def save_transactions(self, positions: list[dict[str, DF_VALUE]]) -> None:
+        """Insert or update multiple positions.
+        Args:
+            positions: A list of dictionaries representing transaction data.
+
+        Returns:
+            None
+        """
+        self.save_frame(pd.DataFrame(positions, columns=list(self.columns.values())))
+
+    def save_frame(self, df: pd.DataFrame) -> None:
+        """Insert or update positions held in a DataFrame, in batches of `BULK_BATCH_SIZE` rows.
+        Rows sharing the same (symbol, date) are merged first, a single statement cannot update
+        the same row twice.
+        Args:
+            df: A DataFrame holding `Date`, `Symbol` and `Net Position` columns.
+
+        Returns:
+            None
+        """
+        frame = (
+            df.groupby(["Symbol", "Date"], sort=False, observed=True)
+            .agg({"Net Position": "sum" if self.accumulate else "last"})
+            .reset_index()
+        )
+        frame["Date"] = pd.to_datetime(frame["Date"]).dt.date
+        rows = list(
+            frame[["Symbol", "Date", "Net Position"]].itertuples(index=False, name=None)
+        )
+
+        table = connection.ops.quote_name(DailyNetPosition._meta.db_table)
+        update = (
+            f"{table}.net_position + EXCLUDED.net_position"
+            if self.accumulate
+            else "EXCLUDED.net_position"
+        )
+        with (
+            timing.stage("upsert_daily_net", rows=len(rows)),
+            db_transaction.atomic(),
+            connection.cursor() as cursor,
+        ):
+            for start in range(0, len(rows), BULK_BATCH_SIZE):
+                batch = rows[start : start + BULK_BATCH_SIZE]
+                values = ", ".join(["(%s, %s, %s)"] * len(batch))
+                cursor.execute(
+                    f"INSERT INTO {table} (symbol, date, net_position) VALUES {values} "
+                    f"ON CONFLICT (symbol, date) DO UPDATE SET net_position = {update}",
+                    [value for row in batch for value in row],
+                )
+            bump_data_version()
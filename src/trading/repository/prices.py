@@ -0,0 +1,34 @@
+from django.db import transaction as db_transaction
+from trading import timing
+from trading.models import DailyPrice
+from trading.repository.base_repo import BULK_BATCH_SIZE, DF_VALUE, Repository
+from trading.repository.chunked_reader import ChunkedReaderMixin
+
+
+class DailyPriceRepo(ChunkedReaderMixin, Repository):
+    model = DailyPrice
+    columns = {"date": "Date", "symbol": "Symbol", "price": "Price"}
+
+    def save_transactions(self, prices: list[dict[str, DF_VALUE]]) -> None:
+        """Insert daily prices, replacing the stored price of an existing (symbol, date).
+        Args:
+            prices: A list of dictionaries representing daily prices.
+
+        Returns:
+            None
+        """
+        price_objects = [
+            DailyPrice(**{field: p[col] for field, col in self.columns.items()})
+            for p in prices
+        ]
+
+        with timing.stage(
+            "save_daily_prices", rows=len(price_objects)
+        ), db_transaction.atomic():
+            DailyPrice.objects.bulk_create(
+                price_objects,
+                batch_size=BULK_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=["symbol", "date"],
+                update_fields=["price"],
+            )
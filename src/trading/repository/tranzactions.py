@@ -1,9 +1,22 @@
 from django.db import transaction as db_transaction
+from trading import timing
 from trading.models import Transaction
-from trading.repository.base_repo import DF_VALUE, Repository
+from trading.repository.base_repo import BULK_BATCH_SIZE, DF_VALUE, Repository
+from trading.repository.bulk_copy import CopyLoaderMixin
+from trading.repository.chunked_reader import ChunkedReaderMixin
+from trading.repository.data_version import bump_data_version
 
 
-class TransactionRepo(Repository):
+class TransactionRepo(ChunkedReaderMixin, Repository):
+    model = Transaction
+    columns = {
+        "date": "Date",
+        "symbol": "Symbol",
+        "quantity": "Quantity",
+        "price": "Price",
+        "direction": "Direction",
+    }
+
     def save_transactions(self, transactions: list[dict[str, DF_VALUE]]) -> None:
         """
         Save multiple transactions using bulk_create for efficiency.
@@ -22,5 +35,14 @@ class TransactionRepo(Repository):
             for t in transactions
         ]
 
-        with db_transaction.atomic():
-            Transaction.objects.bulk_create(transaction_objects)
+        with timing.stage(
+            "save_transactions", rows=len(transaction_objects)
+        ), db_transaction.atomic():
+            Transaction.objects.bulk_create(
+                transaction_objects, batch_size=BULK_BATCH_SIZE
+            )
+            bump_data_version()
+
+
+class TransactionCopyRepo(CopyLoaderMixin, TransactionRepo):
+    """Transactions repository loading DataFrames through PostgreSQL `COPY`."""
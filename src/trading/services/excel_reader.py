@@ -0,0 +1,142 @@
+from io import BytesIO
+from typing import Iterator
+
+import pandas as pd
+from openpyxl import load_workbook
+from trading.settings import EXCEL_CHUNK_SIZE
+
+# Bumped whenever parsing changes, frames cached by an older parser are ignored
+PARSER_VERSION = 2
+
+# Columns converted while reading, any other column is kept as read from the sheet
+DATE_COLUMNS = ["Date"]
+NUMERIC_COLUMNS = ["Quantity", "Price", "Yahoo Finance"]
+
+
+def _to_frame(header: list[str], columns: list[list]) -> pd.DataFrame:
+    """Build a typed DataFrame out of raw column values.
+    Args:
+        header: Column names
+        columns: Values of every column, in the same order as `header`
+
+    Returns:
+        DataFrame with date and numeric columns converted.
+    """
+    data = {}
+    for name, values in zip(header, columns):
+        if name in DATE_COLUMNS:
+            data[name] = pd.to_datetime(
+                pd.Series(values, dtype=object), errors="coerce"
+            )
+        elif name in NUMERIC_COLUMNS:
+            numbers = pd.to_numeric(pd.Series(values, dtype=object), errors="coerce")
+            # Excel stores every number as float, keep whole numbers as integers like pandas does
+            if (
+                numbers.dtype.kind == "f"
+                and numbers.notna().all()
+                and (numbers % 1 == 0).all()
+            ):
+                numbers = numbers.astype("int64")
+            data[name] = numbers
+        else:
+            text = pd.Series(values, dtype=object)
+            data[name] = text.where(text != "")
+    return pd.DataFrame(data, columns=header)
+
+
+def iter_excel_chunks(
+    file: BytesIO, chunk_size: int = EXCEL_CHUNK_SIZE
+) -> Iterator[pd.DataFrame]:
+    """Stream the first sheet of an Excel file as DataFrame chunks.
+    The workbook is opened in openpyxl read-only mode, rows are parsed lazily and only one chunk
+    of values is held in memory at a time, whatever the size of the file is.
+    Args:
+        file: Bytes representation of an Excel file.
+        chunk_size: Maximum number of rows of every chunk.
+
+    Returns:
+        Iterator of DataFrames, first row of the sheet is used as header. Index of the chunks is
+        the position of every row below the header, blank rows are skipped but still counted, so
+        that index 0 is row 2 of the sheet whatever the chunk.
+    """
+    wb = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = list(next(rows, None) or [])
+        width = len(header)
+
+        yielded = False
+        keep = None
+        columns = [[] for _ in header]
+        positions = []
+        for position, row in enumerate(rows):
+            if all(value in (None, "") for value in row):
+                continue
+            positions.append(position)
+            row = (tuple(row) + (None,) * width)[:width]
+            for column, value in zip(columns, row):
+                column.append(value)
+            if len(columns[0]) < chunk_size:
+                continue
+            keep = keep or _kept_columns(header, columns)
+            chunk = _to_frame(
+                [_column_name(header, i) for i in keep], [columns[i] for i in keep]
+            )
+            chunk.index = pd.Index(positions, dtype="int64")
+            yielded = True
+            yield chunk
+            columns = [[] for _ in header]
+            positions = []
+
+        if positions or not yielded:
+            keep = keep or _kept_columns(header, columns)
+            chunk = _to_frame(
+                [_column_name(header, i) for i in keep], [columns[i] for i in keep]
+            )
+            chunk.index = pd.Index(positions, dtype="int64")
+            yield chunk
+    finally:
+        wb.close()
+
+
+def _column_name(header: list, i: int) -> str:
+    """Name of a column, following pandas naming of cells left empty in the header.
+    Args:
+        header: Values of the header row
+        i: Position of the column
+
+    Returns:
+        Column name
+    """
+    return str(header[i]) if header[i] not in (None, "") else f"Unnamed: {i}"
+
+
+def _kept_columns(header: list, columns: list[list]) -> list[int]:
+    """Select columns worth reading.
+    Sheets often carry empty formatted cells at the right of the data, columns without a header
+    are only kept when the first chunk has any value in them.
+    Args:
+        header: Values of the header row
+        columns: Values of every column of the first chunk
+
+    Returns:
+        Positions of the columns to keep.
+    """
+    return [
+        i
+        for i, (name, values) in enumerate(zip(header, columns))
+        if name not in (None, "") or any(value not in (None, "") for value in values)
+    ]
+
+
+def read_excel(file: BytesIO, chunk_size: int = EXCEL_CHUNK_SIZE) -> pd.DataFrame:
+    """Read the first sheet of an Excel file through `iter_excel_chunks`.
+    Args:
+        file: Bytes representation of an Excel file.
+        chunk_size: Number of rows parsed at once.
+
+    Returns:
+        DataFrame containing the whole sheet.
+    """
+    chunks = list(iter_excel_chunks(file, chunk_size=chunk_size))
+    return pd.concat(chunks) if chunks else pd.DataFrame()
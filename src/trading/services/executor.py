@@ -0,0 +1,90 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import Callable, Iterator, Optional
+
+from django.db import close_old_connections
+from trading.settings import UPLOAD_EXECUTOR_QUEUE, UPLOAD_EXECUTOR_WORKERS
+
+
+class ExecutorBusy(Exception):
+    """Raised when an upload is refused because the executor queue is full."""
+
+
+class UploadExecutor:
+    """
+    Thread pool running blocking upload work (pandas, openpyxl, database writes) for async views.
+    Uploads are admitted up front, at most `workers + queue_size` uploads are in progress at once
+    and any other one is refused with `ExecutorBusy`, instead of waiting for an unbounded time.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.max_admitted = workers + queue_size
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="upload"
+        )
+        self._admitted = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def admit(self) -> Iterator[None]:
+        """Reserve room for one upload until the block exits.
+
+        Raises:
+            ExecutorBusy: Too many uploads are already in progress.
+        """
+        with self._lock:
+            if self._admitted >= self.max_admitted:
+                raise ExecutorBusy()
+            self._admitted += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._admitted -= 1
+
+    async def run(self, func: Callable, *args, **kwargs):
+        """Run a blocking function in the pool and wait for its result.
+        Context variables, e.g. timing stages of the request, are visible to the function.
+        Args:
+            func: Function to run
+            *args: Positional arguments of the function
+            **kwargs: Keyword arguments of the function
+
+        Returns:
+            Result of the function.
+        """
+        context = contextvars.copy_context()
+        call = partial(context.run, _with_connections, func, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self._pool, call)
+
+
+def _with_connections(func: Callable, *args, **kwargs):
+    """Call a function from a pool thread, dropping stale database connections of the thread
+    before and after the call, like Django does around every request."""
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+_executor: Optional[UploadExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> UploadExecutor:
+    """Get the upload executor shared by the whole process, sized by `UPLOAD_EXECUTOR_WORKERS`
+    and `UPLOAD_EXECUTOR_QUEUE` settings.
+
+    Returns:
+        Upload executor.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = UploadExecutor(UPLOAD_EXECUTOR_WORKERS, UPLOAD_EXECUTOR_QUEUE)
+    return _executor
@@ -0,0 +1,53 @@
+from typing import Iterable, Iterator, Sequence
+
+import pandas as pd
+
+CSV = "csv"
+NDJSON = "ndjson"
+CONTENT_TYPES = {
+    CSV: "text/csv",
+    NDJSON: "application/x-ndjson",
+}
+
+# Number of rows encoded at once, bounds the memory held by an export whatever its size
+EXPORT_CHUNK_SIZE = 10_000
+
+
+def iter_slices(
+    df: pd.DataFrame, chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[pd.DataFrame]:
+    """Split a DataFrame into consecutive slices, without copying it.
+    Args:
+        df: DataFrame to split
+        chunk_size: Maximum number of rows of every slice
+
+    Returns:
+        Iterator of slices, a single empty one for an empty DataFrame.
+    """
+    yield df.iloc[:chunk_size]
+    for start in range(chunk_size, len(df), chunk_size):
+        yield df.iloc[start : start + chunk_size]
+
+
+def encode(
+    frames: Iterable[pd.DataFrame], fmt: str, columns: Sequence[str] = ()
+) -> Iterator[str]:
+    """Encode DataFrames one after the other, as a single CSV or NDJSON document.
+    Args:
+        frames: DataFrames sharing the same columns, e.g. slices or chunks fetched from database
+        fmt: `CSV` or `NDJSON`
+        columns: CSV header written when there is no DataFrame at all
+
+    Returns:
+        Iterator of text chunks, one per DataFrame. CSV header is only written once.
+    """
+    header = True
+    for df in frames:
+        if fmt == CSV:
+            yield df.to_csv(index=False, header=header)
+            header = False
+        elif not df.empty:
+            # Every record is terminated by a newline, including the last one of the chunk
+            yield df.to_json(orient="records", lines=True, date_format="iso")
+    if fmt == CSV and header and columns:
+        yield pd.DataFrame(columns=list(columns)).to_csv(index=False)
@@ -0,0 +1,171 @@
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+from io import BytesIO
+from typing import BinaryIO, Iterable, Iterator, Optional
+
+import pandas as pd
+from trading import timing
+from trading.services.excel_reader import PARSER_VERSION, iter_excel_chunks
+from trading.settings import EXCEL_CHUNK_SIZE, FRAME_CACHE_SIZE_MB, MEDIA_ROOT
+
+log = logging.getLogger("root")
+
+FRAMES_ROOT = MEDIA_ROOT / "frames"
+
+
+def file_digest(file: BytesIO | str) -> str:
+    """Hash content of a file with SHA-256.
+    Args:
+        file: File object, rewound once hashed, or path on disk.
+
+    Returns:
+        Hexadecimal digest of the content.
+    """
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+    file.seek(0)
+    digest = hashlib.file_digest(file, "sha256").hexdigest()
+    file.seek(0)
+    return digest
+
+
+def iter_frame(digest: str) -> Optional[Iterator[pd.DataFrame]]:
+    """Stream the parsed chunks of a file, marking it as recently used.
+    Args:
+        digest: SHA-256 digest of the file
+
+    Returns:
+        Iterator of chunks, as they were parsed, None when the file was never cached by the
+        current parser.
+    """
+    try:
+        os.utime(_frame_path(digest))
+        # An open file stays readable if it is evicted meanwhile
+        f = open(_frame_path(digest), "rb")
+    except FileNotFoundError:
+        return None
+    return _read_chunks(f)
+
+
+def store_chunks(digest: str, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """Cache the parsed chunks of a file while they are consumed, one chunk at a time.
+    Chunks are appended to a stream of pickles, memory never holds more than one of them. The
+    entry is only kept once every chunk was written, then least recently used frames above the
+    size cap are evicted.
+    Args:
+        digest: SHA-256 digest of the file
+        chunks: Parsed chunks, written as they are, before the consumer gets them
+
+    Returns:
+        Iterator over the same chunks.
+    """
+    FRAMES_ROOT.mkdir(parents=True, exist_ok=True)
+    # Written aside and moved in place, readers never see a partial frame
+    tmp = tempfile.NamedTemporaryFile(dir=FRAMES_ROOT, suffix=".part", delete=False)
+    try:
+        with tmp:
+            for chunk in chunks:
+                with timing.stage("store_frame", rows=len(chunk)):
+                    pickle.dump(chunk, tmp, protocol=pickle.HIGHEST_PROTOCOL)
+                yield chunk
+    except BaseException:
+        # Parsing failed or the consumer stopped early, e.g. on an invalid chunk
+        os.unlink(tmp.name)
+        raise
+    os.replace(tmp.name, _frame_path(digest))
+    _evict(FRAME_CACHE_SIZE_MB * 1024 * 1024)
+
+
+def read_excel_cached(
+    file: BytesIO | str,
+    chunk_size: int = EXCEL_CHUNK_SIZE,
+    digest: Optional[str] = None,
+) -> pd.DataFrame:
+    """Read the first sheet of an Excel file, from the cache when it was already parsed.
+    Args:
+        file: Bytes representation of an Excel file, or path on disk.
+        chunk_size: Number of rows parsed at once.
+        digest: SHA-256 digest of the file when already known, computed otherwise.
+
+    Returns:
+        DataFrame containing the whole sheet.
+    """
+    chunks = list(iter_excel_chunks_cached(file, chunk_size=chunk_size, digest=digest))
+    return pd.concat(chunks) if len(chunks) > 1 else chunks[0]
+
+
+def iter_excel_chunks_cached(
+    file: BytesIO | str,
+    chunk_size: int = EXCEL_CHUNK_SIZE,
+    digest: Optional[str] = None,
+) -> Iterator[pd.DataFrame]:
+    """Stream the first sheet of an Excel file, from the cache when it was already parsed.
+    On a miss, chunks are parsed with `iter_excel_chunks` and written to the cache one by one,
+    memory stays bounded by the chunk size either way. Cached chunks keep the size they were
+    parsed with.
+    Args:
+        file: Bytes representation of an Excel file, or path on disk.
+        chunk_size: Maximum number of rows of every chunk.
+        digest: SHA-256 digest of the file when already known, e.g. computed while the upload
+            was saved, computed otherwise.
+
+    Returns:
+        Iterator of DataFrames, as returned by `iter_excel_chunks`.
+    """
+    parsed = timing.timed_iter(
+        "parse_excel", iter_excel_chunks(file, chunk_size=chunk_size)
+    )
+    if not FRAME_CACHE_SIZE_MB:
+        yield from parsed
+        return
+
+    digest = digest or file_digest(file)
+    cached = iter_frame(digest)
+    if cached is not None:
+        yield from timing.timed_iter("load_frame", cached)
+        return
+    yield from store_chunks(digest, parsed)
+
+
+def _read_chunks(f: BinaryIO) -> Iterator[pd.DataFrame]:
+    """Unpickle chunks one after the other until the end of a cached frame, then close it."""
+    with f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def _frame_path(digest: str):
+    """Location of the cached frame of a file, for the current parser version."""
+    return FRAMES_ROOT / f"{digest}-v{PARSER_VERSION}.pkl"
+
+
+def _evict(max_bytes: int) -> None:
+    """Remove least recently used frames until the cache fits in `max_bytes`.
+    Args:
+        max_bytes: Size cap of the cache
+
+    Returns:
+        None
+    """
+    entries = []
+    for path in FRAMES_ROOT.glob("*.pkl"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+        log.info(f"Evicted parsed frame {path.name}")
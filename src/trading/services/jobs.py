@@ -0,0 +1,126 @@
+import logging
+from datetime import timedelta
+from typing import Iterable, Optional
+
+from django.db import transaction as db_transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from trading.models import StoredUpload, UploadJob
+from trading.services import upload_store
+from trading.settings import JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS
+
+log = logging.getLogger("root")
+
+
+def enqueue(upload: StoredUpload, options: Optional[dict] = None) -> UploadJob:
+    """Queue processing of a file already saved on disk and registered in the upload index.
+    Args:
+        upload: Index entry of the file
+        options: Processing options, e.g. `incremental` for P&L files
+
+    Returns:
+        The queued job.
+    """
+    return UploadJob.objects.create(
+        kind=upload.kind,
+        file_name=upload.file_name,
+        options=options or {},
+        upload=upload,
+    )
+
+
+def claim(limit: int) -> list[int]:
+    """Mark the oldest queued jobs, and running jobs whose lease expired, as running.
+    Rows are locked with `SKIP LOCKED`, several workers can poll the queue without ever
+    claiming the same job twice. A running job whose worker stopped sending heartbeats for
+    `JOB_LEASE_SECONDS`, e.g. because it crashed, is claimed again, or failed once it was
+    claimed `JOB_MAX_ATTEMPTS` times.
+    Args:
+        limit: Maximum number of jobs to claim
+
+    Returns:
+        Identifiers of the claimed jobs.
+    """
+    now = timezone.now()
+    expired = Q(
+        status=UploadJob.RUNNING,
+        heartbeat_at__lt=now - timedelta(seconds=JOB_LEASE_SECONDS),
+    )
+    with db_transaction.atomic():
+        stale = list(
+            UploadJob.objects.select_for_update(skip_locked=True)
+            .filter(expired)
+            .values_list("id", flat=True)
+        )
+        retry(stale, "Worker stopped while processing the job.")
+
+        ids = list(
+            UploadJob.objects.select_for_update(skip_locked=True)
+            .filter(status=UploadJob.QUEUED)
+            .order_by("created_at")
+            .values_list("id", flat=True)[:limit]
+        )
+        UploadJob.objects.filter(id__in=ids).update(
+            status=UploadJob.RUNNING,
+            started_at=now,
+            heartbeat_at=now,
+            attempts=F("attempts") + 1,
+        )
+    return ids
+
+
+def renew(job_ids: Iterable[int]) -> None:
+    """Extend the lease of running jobs, called by their worker while it is alive.
+    Args:
+        job_ids: Identifiers of the jobs
+
+    Returns:
+        None
+    """
+    UploadJob.objects.filter(id__in=list(job_ids), status=UploadJob.RUNNING).update(
+        heartbeat_at=timezone.now()
+    )
+
+
+def retry(job_ids: Iterable[int], error: str) -> None:
+    """Queue again running jobs whose worker died, or fail the ones out of attempts.
+    Args:
+        job_ids: Identifiers of the jobs
+        error: Reason stored on failed jobs
+
+    Returns:
+        None
+    """
+    jobs = UploadJob.objects.filter(id__in=list(job_ids), status=UploadJob.RUNNING)
+    with db_transaction.atomic():
+        exhausted = jobs.filter(attempts__gte=JOB_MAX_ATTEMPTS)
+        # Files of failed jobs can be uploaded again, like files failing to process
+        uploads = list(exhausted.values_list("upload_id", flat=True))
+        failed = exhausted.update(
+            status=UploadJob.FAILED, error=error, finished_at=timezone.now()
+        )
+        StoredUpload.objects.filter(id__in=uploads, result__isnull=True).delete()
+        queued = jobs.update(status=UploadJob.QUEUED, started_at=None)
+    if failed or queued:
+        log.warning(f"{queued} jobs queued again and {failed} failed: {error}")
+
+
+def run(job_id: int) -> str:
+    """Process a claimed job and store its result or error.
+    Args:
+        job_id: Identifier of the job
+
+    Returns:
+        Final status of the job.
+    """
+    job = UploadJob.objects.select_related("upload").get(id=job_id)
+    try:
+        job.result = upload_store.process(job.upload, job.options)
+        job.status = UploadJob.DONE
+    except Exception as e:
+        log.exception(f"Job {job.id} failed")
+        job.status = UploadJob.FAILED
+        job.error = str(e)
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "result", "error", "finished_at"])
+    return job.status
@@ -1,14 +1,357 @@
+import logging
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from io import BytesIO
+from typing import NamedTuple, Optional
 
+import numpy as np
 import pandas as pd
+from trading import timing
+from trading.repository.pnl_states import PnLStateRepo
+from trading.repository.prices import DailyPriceRepo
+from trading.services.frame_cache import read_excel_cached
+from trading.services.schema import PNL_SCHEMA, apply_schema
+from trading.services.yahoo_finance import MarketDataService
+from trading.settings import PNL_COST_BASIS, PNL_WORKERS
+
+log = logging.getLogger("root")
+
+# Below this amount of rows spawning worker processes costs more than it saves
+PARALLEL_MIN_ROWS = 50_000
+
+# Cost basis methods, see `PNL_COST_BASIS` setting
+AVERAGE = "average"
+FIFO = "fifo"
+LIFO = "lifo"
+COST_BASIS_METHODS = (AVERAGE, FIFO, LIFO)
+
+LOT_COLUMNS = [
+    "Symbol",
+    "Open Date",
+    "Close Date",
+    "Quantity",
+    "Unit Cost",
+    "Close Price",
+    "Realised P&L",
+]
+
+OPEN_LOT_COLUMNS = ["Symbol", "Open Date", "Quantity", "Unit Cost"]
+
+STATE_COLUMNS = [
+    "Symbol",
+    "Date",
+    "Net Quantity",
+    "Total Cost",
+    "Unit Cost",
+    "Total Realised",
+    "Unrealised P&L",
+    "Date Rows",
+]
+
+
+class ResumeConflict(ValueError):
+    """A file cannot be resumed, it has fewer trades on a processed day than were processed."""
+
+
+def _frame_rows(processor: "PnLProcessor", *args, **kwargs) -> int:
+    """Rows of the DataFrame of a processor, counted by timed stages."""
+    return len(processor.data)
+
+
+class PositionState(NamedTuple):
+    """Running state of a position after its last processed row."""
+
+    net_quantity: float = 0.0
+    total_cost: float = 0.0
+    unit_cost: float = 0.0
+    unrealised: float = 0.0
+    # Open lots as (quantity, unit cost), oldest first, FIFO and LIFO methods only
+    lots: tuple[tuple[float, float], ...] = ()
+
+
+def _pnl_statistics(
+    quantity: np.ndarray,
+    price: np.ndarray,
+    added_cost: np.ndarray,
+    market_price: np.ndarray,
+    state: PositionState = PositionState(),
+    cost_basis: str = AVERAGE,
+) -> tuple[dict[str, np.ndarray], dict[str, np.ndarray], dict[str, np.ndarray]]:
+    """Compute P&L statistics columns for a single instrument.
+    Everything that depends only on the current row is computed with array operations, the only
+    sequential dependency (cost of the position after the previous row feeds the removed cost of
+    the current one) is resolved in one pass over plain Python floats.
+    Args:
+        quantity: Signed traded quantity per row, `NaN` for rows without a trade.
+        price: Execution price per row.
+        added_cost: Cost added to the position by each row (only `BUY` rows add cost).
+        market_price: Market price used to value the position on each row.
+        state: Running state to resume from, an empty position by default.
+        cost_basis: `AVERAGE`, `FIFO` or `LIFO`, see `PNL_COST_BASIS` setting.
+
+    Returns:
+        Mapping of column name to computed values, in the row order of the inputs, lots closed
+        by sales and lots left open (see `_lot_costs`), both empty for the average cost method.
+
+    Note:
+        A trade realising a loss realises nothing, `Daily Realised P&L` is clipped at 0 as the
+        original implementation does. Lots closed by such a trade realise nothing either, the
+        realised P&L of the lots closed by a trade always add up to the one of its row.
+    """
+    daily_net = state.net_quantity + np.cumsum(np.nan_to_num(quantity))
+
+    if cost_basis == AVERAGE:
+        removed_cost, total_cost, unit_cost = _average_costs(
+            quantity, added_cost, daily_net, state
+        )
+        closed, held = _closed_lots(), _open_lots()
+    else:
+        removed_cost, total_cost, unit_cost, closed, held = _lot_costs(
+            quantity, price, added_cost, daily_net, state, lifo=cost_basis == LIFO
+        )
+
+    market_value = daily_net * market_price
+    # Purchases realise nothing at the average cost, whatever they remove
+    realised = added_cost - quantity * price - removed_cost
+    loss = realised < 0
+    realised = np.where(loss, 0.0, realised)
+    close_row = closed["close_row"]
+    closed["realised"] = np.where(
+        loss[close_row],
+        0.0,
+        closed["quantity"] * (price[close_row] - closed["unit_cost"]),
+    )
+    total_unrealised = market_value - total_cost
+    prev_total_unrealised = np.concatenate(([state.unrealised], total_unrealised[:-1]))
+
+    columns = {
+        "Removed Cost": removed_cost,
+        "Total Cost": total_cost,
+        "Unit Cost": unit_cost,
+        "Market Value": market_value,
+        "Daily Realised P&L": realised,
+        "Total Unrealised P&L": total_unrealised,
+        "Daily Unrealised P&L": total_unrealised + realised - prev_total_unrealised,
+        "Daily Net": daily_net,
+    }
+    return columns, closed, held
+
+
+def _average_costs(
+    quantity: np.ndarray,
+    added_cost: np.ndarray,
+    daily_net: np.ndarray,
+    state: PositionState,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Cost of a position valued at its average unit cost, sales remove `unit cost * quantity`.
+    Args:
+        quantity: Signed traded quantity per row, `NaN` for rows without a trade.
+        added_cost: Cost added to the position by each row.
+        daily_net: Position after each row.
+        state: Running state to resume from.
+
+    Returns:
+        Removed cost, total cost and unit cost after each row.
+    """
+    removed_cost, total_cost, unit_cost = [], [], []
+    prev_total_cost, prev_unit_cost = state.total_cost, state.unit_cost
+    for qty, added, net in zip(
+        quantity.tolist(), added_cost.tolist(), daily_net.tolist()
+    ):
+        removed = prev_unit_cost * -qty
+        if not removed > 0:
+            removed = 0.0
+        prev_total_cost = added - removed + prev_total_cost
+        if prev_total_cost and net:
+            prev_unit_cost = prev_total_cost / net
+        removed_cost.append(removed)
+        total_cost.append(prev_total_cost)
+        unit_cost.append(prev_unit_cost)
+
+    return (
+        np.asarray(removed_cost, dtype=float),
+        np.asarray(total_cost, dtype=float),
+        np.asarray(unit_cost, dtype=float),
+    )
+
+
+def _lot_costs(
+    quantity: np.ndarray,
+    price: np.ndarray,
+    added_cost: np.ndarray,
+    daily_net: np.ndarray,
+    state: PositionState,
+    lifo: bool = False,
+) -> tuple[
+    np.ndarray, np.ndarray, np.ndarray, dict[str, np.ndarray], dict[str, np.ndarray]
+]:
+    """Cost of a position held as lots, trades remove the cost of the lots they are matched with.
+    Every trade first closes open lots of the opposite side, oldest first (FIFO) or newest first
+    (LIFO), and opens a lot at its price with the quantity left: sales beyond the long lots open
+    a short lot, purchases beyond the short lots open a long one. Open lots are all on the side of
+    the position, they live in preallocated arrays used as a queue (FIFO) or a stack (LIFO), a lot
+    is opened and fully closed at most once, so each trade costs amortized constant time.
+    Args:
+        quantity: Signed traded quantity per row, `NaN` for rows without a trade.
+        price: Execution price per row.
+        added_cost: Cost added to the position by each row.
+        daily_net: Position after each row.
+        state: Running state to resume from, with its open lots. A long position without lots,
+            saved by the average cost method, is carried as a single lot valued at its total cost.
+        lifo: Match trades with the newest lots first instead of the oldest ones.
+
+    Returns:
+        Removed cost, total cost and unit cost after each row, closed lots (see `_closed_lots`)
+        and lots left open after the last row (see `_open_lots`).
+
+    Note:
+        Cost of a short position is negative, the proceeds of its sales. Removed cost of a row
+        is `Added Cost - Quantity * Price - realised P&L of the lots it closes`, so that the
+        realised P&L of a row is always the one of its lots.
+    """
+    carried = state.lots
+    if not carried and state.net_quantity > 0:
+        carried = ((state.net_quantity, state.total_cost / state.net_quantity),)
+    capacity = int(np.count_nonzero(np.nan_to_num(quantity))) + len(carried)
+    lot_quantity = array("d", bytes(8 * capacity))
+    lot_unit_cost = array("d", bytes(8 * capacity))
+    lot_row = array("q", bytes(8 * capacity))
+    head = tail = 0
+    # Carried lots are identified by negative rows, -1 being the oldest one
+    for lot_qty, lot_cost in carried:
+        lot_quantity[tail] = lot_qty
+        lot_unit_cost[tail] = lot_cost
+        lot_row[tail] = -1 - tail
+        tail += 1
+
+    open_row, close_row, closed_quantity, closed_unit_cost = [], [], [], []
+    removed_cost, total_cost, unit_cost = [], [], []
+    prev_total_cost, prev_unit_cost = state.total_cost, state.unit_cost
+    for row, (qty, px, added, net) in enumerate(
+        zip(quantity.tolist(), price.tolist(), added_cost.tolist(), daily_net.tolist())
+    ):
+        removed = 0.0
+        if qty > 0 or qty < 0:
+            realised = 0.0
+            left = qty
+            # Lots are closed while they are on the other side of the trade
+            while left and head < tail and (lot_quantity[head] > 0) != (left > 0):
+                lot = tail - 1 if lifo else head
+                matched = min(abs(left), abs(lot_quantity[lot]))
+                if lot_quantity[lot] < 0:
+                    matched = -matched
+                realised += matched * (px - lot_unit_cost[lot])
+                open_row.append(lot_row[lot])
+                close_row.append(row)
+                closed_quantity.append(matched)
+                closed_unit_cost.append(lot_unit_cost[lot])
+                left += matched
+                lot_quantity[lot] -= matched
+                if lot_quantity[lot] == 0:
+                    if lifo:
+                        tail -= 1
+                    else:
+                        head += 1
+            if left:
+                lot_quantity[tail] = left
+                lot_unit_cost[tail] = px
+                lot_row[tail] = row
+                tail += 1
+            removed = added - qty * px - realised
+
+        prev_total_cost = added - removed + prev_total_cost
+        if prev_total_cost and net:
+            prev_unit_cost = prev_total_cost / net
+        removed_cost.append(removed)
+        total_cost.append(prev_total_cost)
+        unit_cost.append(prev_unit_cost)
+
+    closed = _closed_lots(open_row, close_row, closed_quantity, closed_unit_cost)
+    held = _open_lots(
+        lot_row[head:tail].tolist(),
+        lot_quantity[head:tail].tolist(),
+        lot_unit_cost[head:tail].tolist(),
+    )
+    return (
+        np.asarray(removed_cost, dtype=float),
+        np.asarray(total_cost, dtype=float),
+        np.asarray(unit_cost, dtype=float),
+        closed,
+        held,
+    )
+
+
+def _closed_lots(
+    open_row: list[int] = (),
+    close_row: list[int] = (),
+    quantity: list[float] = (),
+    unit_cost: list[float] = (),
+) -> dict[str, np.ndarray]:
+    """Pack lots closed by trades into arrays.
+    Args:
+        open_row: Row opening every lot, negative for lots carried from a resumed state
+        close_row: Row of the trade closing every lot, partially or fully
+        quantity: Quantity of the lot matched by the trade, negative for short lots
+        unit_cost: Unit cost of the lot
+
+    Returns:
+        Mapping of name to values, rows are positions within the instrument rows.
+    """
+    return {
+        "open_row": np.asarray(open_row, dtype=np.int64),
+        "close_row": np.asarray(close_row, dtype=np.int64),
+        "quantity": np.asarray(quantity, dtype=float),
+        "unit_cost": np.asarray(unit_cost, dtype=float),
+    }
+
+
+def _open_lots(
+    open_row: list[int] = (),
+    quantity: list[float] = (),
+    unit_cost: list[float] = (),
+) -> dict[str, np.ndarray]:
+    """Pack lots left open after the last row into arrays, oldest first.
+    Args:
+        open_row: Row opening every lot, negative for lots carried from a resumed state
+        quantity: Quantity left in the lot, negative for short lots
+        unit_cost: Unit cost of the lot
+
+    Returns:
+        Mapping of name to values, rows are positions within the instrument rows.
+    """
+    return {
+        "open_row": np.asarray(open_row, dtype=np.int64),
+        "quantity": np.asarray(quantity, dtype=float),
+        "unit_cost": np.asarray(unit_cost, dtype=float),
+    }
 
 
 class PnLProcessor:
-    """ """
+    """
+    P&L calculation over a book of trades.
+    Every `Symbol` found in the file is an independent position, statistics are computed per symbol
+    while keeping the original row order of the file.
+    """
 
-    def __init__(self, df: pd.DataFrame):
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        workers: int = PNL_WORKERS,
+        cost_basis: str = PNL_COST_BASIS,
+    ):
+        if cost_basis not in COST_BASIS_METHODS:
+            raise ValueError(
+                f"Unknown cost basis {cost_basis}, use one of {COST_BASIS_METHODS}."
+            )
         self._df = df
+        self._workers = workers
+        self._cost_basis = cost_basis
+        self._states = pd.DataFrame(columns=STATE_COLUMNS).set_index("Symbol")
+        self._lots: dict[str, pd.DataFrame] = {}
+        self._checkpoint = pd.DataFrame(columns=STATE_COLUMNS)
+        self._open_lots = pd.DataFrame(columns=OPEN_LOT_COLUMNS)
+        self._realised_lots = pd.DataFrame(columns=LOT_COLUMNS)
         self._format_col_types()
 
     @property
@@ -20,78 +363,481 @@ class PnLProcessor:
         """
         return self._df
 
-    def run(self):
+    @property
+    def realised_lots(self) -> pd.DataFrame:
+        """Realised P&L attributed to every lot closed by a trade, FIFO and LIFO methods only.
+        Sales close long lots and purchases close short lots, which have a negative `Quantity`. A
+        lot partially closed appears once per trade. A position resumed from a state without lots,
+        saved by the average cost method, is carried as a single lot without `Open Date`.
+
+        Returns:
+            DataFrame with one row per (lot, trade), see `LOT_COLUMNS`.
+        """
+        return self._realised_lots
+
+    @property
+    def checkpoint(self) -> pd.DataFrame:
+        """Running state of every symbol after the last processed row.
+
+        Returns:
+            DataFrame with one row per symbol, see `STATE_COLUMNS`.
+        """
+        return self._checkpoint
+
+    @property
+    def open_lots(self) -> pd.DataFrame:
+        """Lots left open after the last processed row, FIFO and LIFO methods only.
+
+        Returns:
+            DataFrame with one row per lot, oldest first within every symbol, see
+            `OPEN_LOT_COLUMNS`.
+        """
+        return self._open_lots
+
+    def resume(self, repo: PnLStateRepo) -> None:
+        """Resume calculation from the states persisted by a previous run.
+        Rows dated before the last processed date of their symbol are dropped, so are the rows of
+        that date processed by the previous run, the first ones in file order. The remaining ones
+        are computed on top of the persisted running state and open lots.
+        Args:
+            repo: Repository holding P&L states
+
+        Returns:
+            None
+
+        Raises:
+            ResumeConflict: When the file has fewer rows of a symbol on its last processed date
+                than were processed, it does not repeat them and its rows cannot be matched.
+
+        Note:
+            Mutation of the DataFrame. Files are expected to repeat every trade of the last
+            processed date of a symbol, trades added on that date are processed.
+        """
+        symbols = self._df["Symbol"].dropna().unique().tolist()
+        self._states = repo.fetch_states(symbols).set_index("Symbol")
+        self._lots = {
+            symbol: lots
+            for symbol, lots in repo.fetch_lots(symbols).groupby("Symbol", sort=False)
+        }
+
+        symbol = self._df["Symbol"].astype(object)
+        last_date = symbol.map(self._states["Date"])
+        # Unknown for states saved before rows were counted, their whole day is skipped
+        processed = symbol.map(self._states["Date Rows"].astype(float))
+        same_day = self._df["Date"] == last_date
+        # Position of the row among the rows of its symbol on the last processed date
+        position = same_day.groupby(symbol).cumsum() - 1
+        same_day_rows = same_day.groupby(symbol).transform("sum")
+
+        conflicts = symbol[same_day & (same_day_rows < processed)].unique()
+        if len(conflicts):
+            raise ResumeConflict(
+                f"Fewer trades than processed on the last processed date of "
+                f"{', '.join(sorted(conflicts))}. Incremental files must repeat the trades of "
+                f"that date, upload the whole book without continuing instead."
+            )
+        unknown = symbol[same_day & processed.isna()].unique()
+        if len(unknown):
+            log.warning(
+                f"Trades on the last processed date of {', '.join(sorted(unknown))} are "
+                f"skipped, the rows processed on that date are unknown."
+            )
+
+        self._df = self._df[
+            last_date.isna()
+            | (self._df["Date"] > last_date)
+            | (same_day & (position >= processed))
+        ].reset_index(drop=True)
+
+    @timing.timed("revalue", rows=_frame_rows)
+    def revalue(self, repo: DailyPriceRepo) -> None:
+        """Value every row at the stored daily prices instead of the prices of the file.
+        Prices of all symbols up to the last trade date are fetched at once and joined on the rows.
+        Args:
+            repo: Repository holding daily prices
+
+        Returns:
+            None
+
+        Note:
+            Mutation of the DataFrame.
+        """
+        symbols = self._df["Symbol"].dropna().unique().tolist()
+        prices = repo.fetch_all_transactions(
+            symbols=symbols, end=self._df["Date"].max()
+        )
+        self.apply_prices(prices)
+
+    def apply_prices(self, prices: pd.DataFrame) -> None:
+        """Set market price of every row to the latest price of its symbol on or before its date.
+        Rows without such a price keep the price of the file.
+        Args:
+            prices: DataFrame with Symbol, Date and Price columns.
+
+        Returns:
+            None
+
+        Note:
+            Mutation of the DataFrame.
+        """
+        rows = pd.DataFrame(
+            {
+                "Row": np.arange(len(self._df)),
+                "Date": self._df["Date"].astype("datetime64[ns]"),
+                "Symbol": self._df["Symbol"],
+            }
+        ).dropna()
+        # Join keys must share their dtype, prices of symbols absent from the book are dropped
+        prices = prices[["Symbol", "Date", "Price"]].astype(
+            {"Date": "datetime64[ns]", "Symbol": rows["Symbol"].dtype}
+        )
+        prices = prices.dropna()
+        # One as-of join for all symbols: both sides must be sorted on the join key
+        matched = pd.merge_asof(
+            rows.sort_values("Date"),
+            prices.sort_values("Date"),
+            on="Date",
+            by="Symbol",
+            direction="backward",
+        )
+        stored = np.full(len(self._df), np.nan)
+        stored[matched["Row"].to_numpy()] = matched["Price"].to_numpy(dtype=float)
+        stored = pd.Series(stored, index=self._df.index)
+
+        if "Yahoo Finance" in self._df.columns:
+            stored = stored.fillna(self._df["Yahoo Finance"])
+        self._df["Yahoo Finance"] = stored
+
+    def save_state(self, repo: PnLStateRepo) -> None:
+        """Persist running state of every processed symbol using given repository.
+        Args:
+            repo: Repository holding P&L states
+
+        Returns:
+            None
+        """
+        lots = None
+        if self._cost_basis != AVERAGE:
+            lots = self._open_lots.to_dict(orient="records")
+        repo.save_transactions(self._checkpoint.to_dict(orient="records"), lots)
+
+    def run(self, reference: bool = False):
         self._ensure_columns()
-        self.make_statistics()
+        self.make_statistics(reference=reference)
         self.get_current_positions()
 
-    def make_statistics(self) -> None:
+    @timing.timed("make_statistics", rows=_frame_rows)
+    def make_statistics(self, reference: bool = False) -> None:
         """Analyze transactions and get statistics on given transactions.
         Calculate required columns, mentioned below, to be able to perform P&L on given data.
         Required columns are: Daily Net, Total Cost, Unit Cost, Removed and Added Cost, Daily Realised
         and Unrealised P&L and Total Unrealised P&L
+        Args:
+            reference: Use the original row by row implementation instead of the vectorized one.
+                Both produce the same numbers, the reference one is kept to validate the former.
 
         Returns:
             None
 
         Note:
             Mutation of the DataFrame.
-
-            That's not the best approach in therms of readability and performance, but due to the
-            time limitations that's the only simple way to meet requirements imposed by recruiter.
         """
         self._df["Added Cost"] = (self._df["Quantity"] * self._df["Price"]).where(
             self._df["Direction"] == "BUY", 0
         )
+        if reference:
+            if not self._states.empty:
+                raise ValueError("Reference implementation cannot resume from a state.")
+            if self._cost_basis != AVERAGE:
+                raise ValueError("Reference implementation only uses the average cost.")
+            self._make_statistics_reference()
+            return
 
-        for i in self._df.index:
-            prev_total_cost = self._df.loc[i - 1, "Total Cost"] if i else 0
-            prev_unit_cost = self._df.loc[i - 1, "Unit Cost"] if i else 0
+        partitions = self._partitions()
+        columns = {
+            col: self._df[col].to_numpy(dtype=float)
+            for col in ["Quantity", "Price", "Added Cost", "Yahoo Finance"]
+        }
+        args = [
+            [values[idx] for idx in partitions.values()] for values in columns.values()
+        ]
+        args.append([self._initial_state(symbol) for symbol in partitions])
+        args.append([self._cost_basis] * len(partitions))
 
-            self._df.loc[i, "Daily Net"] = self._df.loc[:i, "Quantity"].sum()
+        parallel = len(partitions) > 1 and len(self._df) >= PARALLEL_MIN_ROWS
+        if self._workers > 1 and parallel:
+            with ProcessPoolExecutor(max_workers=self._workers) as executor:
+                results = list(
+                    executor.map(
+                        _pnl_statistics,
+                        *args,
+                        chunksize=max(1, len(partitions) // (self._workers * 4)),
+                    )
+                )
+        else:
+            results = list(map(_pnl_statistics, *args))
+
+        results, closed, held = zip(*results) if results else ((), (), ())
+        statistics = {}
+        for idx, result in zip(partitions.values(), results):
+            for col, values in result.items():
+                statistics.setdefault(col, np.empty(len(self._df)))[idx] = values
+        for col, values in statistics.items():
+            self._df[col] = values
+
+        self._checkpoint = self._make_checkpoint(partitions, results)
+        self._open_lots = self._make_open_lots(partitions, held)
+        self._realised_lots = self._make_realised_lots(partitions, closed)
 
-            added_cost = self._df.loc[i, "Added Cost"]
-            qty = self._df.loc[i, "Quantity"]
+    def _initial_state(self, symbol: str) -> PositionState:
+        """Get running state to start the calculation of a symbol from.
+        Args:
+            symbol: Symbol of the position
+
+        Returns:
+            Persisted state of the symbol when resuming, an empty position otherwise.
+        """
+        if symbol not in self._states.index:
+            return PositionState()
+        state = self._states.loc[symbol]
+        lots = self._lots.get(symbol)
+        return PositionState(
+            net_quantity=float(state["Net Quantity"]),
+            total_cost=float(state["Total Cost"]),
+            unit_cost=float(state["Unit Cost"]),
+            unrealised=float(state["Unrealised P&L"]),
+            lots=(
+                ()
+                if lots is None
+                else tuple(
+                    zip(
+                        lots["Quantity"].astype(float).tolist(),
+                        lots["Unit Cost"].astype(float).tolist(),
+                    )
+                )
+            ),
+        )
+
+    def _open_dates(
+        self, symbol: str, idx: np.ndarray, open_row: np.ndarray
+    ) -> np.ndarray:
+        """Open date of lots of a symbol, identified by the row opening them.
+        Args:
+            symbol: Symbol of the position
+            idx: Positional indices of the rows of the symbol
+            open_row: Row opening every lot within the rows of the symbol, negative for lots
+                carried from a resumed state, -1 being the oldest one
+
+        Returns:
+            Dates, `NaT` for a position carried as a single lot.
+        """
+        dates = np.empty(len(open_row), dtype="datetime64[ns]")
+        own = open_row >= 0
+        dates[own] = self._df["Date"].to_numpy(dtype="datetime64[ns]")[
+            idx[open_row[own]]
+        ]
+        lots = self._lots.get(symbol)
+        carried = (
+            np.array(["NaT"], dtype="datetime64[ns]")
+            if lots is None
+            else lots["Open Date"].to_numpy(dtype="datetime64[ns]")
+        )
+        dates[~own] = carried[-1 - open_row[~own]]
+        return dates
+
+    def _make_checkpoint(
+        self, partitions: dict[str, np.ndarray], results: list[dict[str, np.ndarray]]
+    ) -> pd.DataFrame:
+        """Extract running state of every symbol from its computed statistics.
+        Args:
+            partitions: Mapping of symbol to the positional indices of its rows
+            results: Computed statistics of every partition, in the same order
+
+        Returns:
+            DataFrame with one row per symbol, see `STATE_COLUMNS`.
+        """
+        dates = self._df["Date"].to_numpy()
+        prev_realised = self._states["Total Realised"]
+        prev_date, prev_rows = self._states["Date"], self._states["Date Rows"]
+        rows = []
+        for (symbol, idx), result in zip(partitions.items(), results):
+            if pd.isna(symbol):
+                continue
+            last = dates[idx].max()
+            date_rows = int(np.count_nonzero(dates[idx] == last))
+            # Rows of the resumed state on the same date were processed too
+            if prev_date.get(symbol) == last:
+                date_rows += int(prev_rows[symbol])
+            rows.append(
+                {
+                    "Symbol": symbol,
+                    "Date": last,
+                    "Net Quantity": result["Daily Net"][-1],
+                    "Total Cost": result["Total Cost"][-1],
+                    "Unit Cost": result["Unit Cost"][-1],
+                    "Total Realised": prev_realised.get(symbol, 0.0)
+                    + np.nansum(result["Daily Realised P&L"]),
+                    "Unrealised P&L": result["Total Unrealised P&L"][-1],
+                    "Date Rows": date_rows,
+                }
+            )
+        return pd.DataFrame(rows, columns=STATE_COLUMNS)
+
+    def _make_open_lots(
+        self, partitions: dict[str, np.ndarray], lots: list[dict[str, np.ndarray]]
+    ) -> pd.DataFrame:
+        """Gather lots left open in every partition.
+        Args:
+            partitions: Mapping of symbol to the positional indices of its rows
+            lots: Open lots of every partition, in the same order
+
+        Returns:
+            DataFrame with one row per lot, see `OPEN_LOT_COLUMNS`.
+        """
+        frames = [
+            pd.DataFrame(
+                {
+                    "Symbol": symbol,
+                    "Open Date": self._open_dates(symbol, idx, held["open_row"]),
+                    "Quantity": held["quantity"],
+                    "Unit Cost": held["unit_cost"],
+                },
+                columns=OPEN_LOT_COLUMNS,
+            )
+            for (symbol, idx), held in zip(partitions.items(), lots)
+            if len(held["open_row"]) and not pd.isna(symbol)
+        ]
+        if not frames:
+            return pd.DataFrame(columns=OPEN_LOT_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+    def _make_realised_lots(
+        self, partitions: dict[str, np.ndarray], lots: list[dict[str, np.ndarray]]
+    ) -> pd.DataFrame:
+        """Attribute realised P&L to the lots closed in every partition.
+        Args:
+            partitions: Mapping of symbol to the positional indices of its rows
+            lots: Closed lots of every partition, in the same order
+
+        Returns:
+            DataFrame with one row per (lot, trade), see `LOT_COLUMNS`.
+        """
+        open_dates, close_rows, quantity, unit_cost, realised = [], [], [], [], []
+        for (symbol, idx), closed in zip(partitions.items(), lots):
+            if not len(closed["close_row"]):
+                continue
+            # Rows of a partition are positions within its own rows
+            open_dates.append(self._open_dates(symbol, idx, closed["open_row"]))
+            close_rows.append(idx[closed["close_row"]])
+            quantity.append(closed["quantity"])
+            unit_cost.append(closed["unit_cost"])
+            realised.append(closed["realised"])
+        if not close_rows:
+            return pd.DataFrame(columns=LOT_COLUMNS)
+
+        close_rows = np.concatenate(close_rows)
+        return pd.DataFrame(
+            {
+                "Symbol": self._df["Symbol"].to_numpy()[close_rows],
+                "Open Date": np.concatenate(open_dates),
+                "Close Date": self._df["Date"].to_numpy()[close_rows],
+                "Quantity": np.concatenate(quantity),
+                "Unit Cost": np.concatenate(unit_cost),
+                "Close Price": self._df["Price"].to_numpy(dtype=float)[close_rows],
+                "Realised P&L": np.concatenate(realised),
+            },
+            columns=LOT_COLUMNS,
+        )
+
+    def _partitions(self) -> dict[str, np.ndarray]:
+        """Split the book per symbol.
+        Returns:
+            Mapping of symbol to the positional indices of its rows, in file order.
+        """
+        return self._df.groupby(
+            "Symbol", sort=False, dropna=False, observed=True
+        ).indices
+
+    def _make_statistics_reference(self) -> None:
+        """Row by row implementation of `make_statistics`, applied on every symbol of the book.
+        Returns:
+            None
+
+        Note:
+            Mutation of the DataFrame.
+        """
+        frames = []
+        for idx in self._partitions().values():
+            frame = self._df.iloc[idx]
+            index = frame.index
+            frame = frame.reset_index(drop=True)
+            self._reference_statistics(frame)
+            frames.append(frame.set_index(index))
+        self._df = pd.concat(frames).sort_index() if frames else self._df
+
+    @staticmethod
+    def _reference_statistics(df: pd.DataFrame) -> None:
+        """Original row by row P&L calculation over a single instrument.
+        Args:
+            df: Transactions of one symbol, indexed from 0.
+
+        Returns:
+            None
+
+        Note:
+            Mutation of the DataFrame.
+
+            That's not the best approach in therms of readability and performance, but due to the
+            time limitations that's the only simple way to meet requirements imposed by recruiter.
+            It is quadratic on the number of rows, use it only to validate the vectorized engine.
+        """
+        for i in df.index:
+            prev_total_cost = df.loc[i - 1, "Total Cost"] if i else 0
+            prev_unit_cost = df.loc[i - 1, "Unit Cost"] if i else 0
+
+            df.loc[i, "Daily Net"] = df.loc[:i, "Quantity"].sum()
+
+            added_cost = df.loc[i, "Added Cost"]
+            qty = df.loc[i, "Quantity"]
 
             # Remove Cost, Total Cost and Unit Cost
-            self._df.loc[i, "Removed Cost"] = (
+            df.loc[i, "Removed Cost"] = (
                 prev_unit_cost * -qty if prev_unit_cost * -qty > 0 else 0
             )
-            self._df.loc[i, "Total Cost"] = (
-                added_cost - self._df.loc[i, "Removed Cost"] + prev_total_cost
+            df.loc[i, "Total Cost"] = (
+                added_cost - df.loc[i, "Removed Cost"] + prev_total_cost
             )
-            self._df.loc[i, "Unit Cost"] = (
-                self._df.loc[i, "Total Cost"] / self._df.loc[i, "Daily Net"]
-                if self._df.loc[i, "Total Cost"] and self._df.loc[i, "Daily Net"]
-                else self._df.loc[i - 1, "UnitCost"]
+            df.loc[i, "Unit Cost"] = (
+                df.loc[i, "Total Cost"] / df.loc[i, "Daily Net"]
+                if df.loc[i, "Total Cost"] and df.loc[i, "Daily Net"]
+                else prev_unit_cost
             )
 
             # Market Value, Daily Realised P&L, Total Unrealised P&L, Daily Unrealised P&L
-            self._df.loc[i, "Market Value"] = (
-                self._df.loc[i, "Daily Net"] * self._df.loc[i, "Yahoo Finance"]
+            df.loc[i, "Market Value"] = (
+                df.loc[i, "Daily Net"] * df.loc[i, "Yahoo Finance"]
             )
-            self._df.loc[i, "Daily Realised P&L"] = (
-                -self._df.loc[i, "Quantity"] * self._df.loc[i, "Price"]
-                - self._df.loc[i, "Removed Cost"]
+            df.loc[i, "Daily Realised P&L"] = (
+                -df.loc[i, "Quantity"] * df.loc[i, "Price"] - df.loc[i, "Removed Cost"]
             )
-            self._df.loc[i, "Daily Realised P&L"] = (
+            df.loc[i, "Daily Realised P&L"] = (
                 0
-                if self._df.loc[i, "Daily Realised P&L"] < 0
-                else self._df.loc[i, "Daily Realised P&L"]
+                if df.loc[i, "Daily Realised P&L"] < 0
+                else df.loc[i, "Daily Realised P&L"]
             )
-            self._df.loc[i, "Total Unrealised P&L"] = (
-                self._df.loc[i, "Market Value"] - self._df.loc[i, "Total Cost"]
+            df.loc[i, "Total Unrealised P&L"] = (
+                df.loc[i, "Market Value"] - df.loc[i, "Total Cost"]
             )
-            self._df.loc[i, "Daily Unrealised P&L"] = (
-                self._df.loc[i, "Total Unrealised P&L"]
-                + self._df.loc[i, "Daily Realised P&L"]
-                - (0 if not i else self._df.loc[i - 1, "Total Unrealised P&L"])
+            df.loc[i, "Daily Unrealised P&L"] = (
+                df.loc[i, "Total Unrealised P&L"]
+                + df.loc[i, "Daily Realised P&L"]
+                - (0 if not i else df.loc[i - 1, "Total Unrealised P&L"])
             )
 
     def _ensure_columns(self) -> None:
         """
         Ensure that all required columns for P&L calculation are in the dataframe
-        by initializing them with 0.
+        by initializing them with 0.0, statistics are never integers.
 
         Returns:
             None
@@ -110,8 +856,9 @@ class PnLProcessor:
             "Daily Net",
         ]:
             if col not in self._df.columns:
-                self._df[col] = 0
+                self._df[col] = 0.0
 
+    @timing.timed("current_positions", rows=_frame_rows)
     def get_current_positions(self) -> pd.DataFrame:
         """Get current positions.
         Extract required to conclude on current positions.
@@ -131,54 +878,89 @@ class PnLProcessor:
             ]
         )
 
-        # Ensure Date is in datetime format and get the latest
-        date = self._df["Date"].max()
-
-        # Get the latest row
-        last_row = self._df.iloc[-1]
+        grouped = self._df.groupby("Symbol", sort=False, observed=True)
 
-        # Extract relevant fields
-        symbol = last_row["Symbol"]
-        today_qty = last_row["Daily Net"]
-        total_cost = last_row["Total Cost"]
-        unit_cost = last_row["Unit Cost"]
-        market_value = last_row["Market Value"]
-        yahoo_finance = last_row["Yahoo Finance"]
+        # Get the latest row of every symbol
+        last_rows = grouped.tail(1).set_index("Symbol")
+        today_qty = last_rows["Daily Net"]
+        total_realised = grouped["Daily Realised P&L"].sum()
+        # Realised P&L of rows processed before the state we resumed from
+        # States of a run not resumed are an empty, untyped, frame
+        total_realised += (
+            self._states["Total Realised"]
+            .reindex(total_realised.index, fill_value=0.0)
+            .astype(float)
+        )
 
-        # Calculate Total Realised P&L (sum over all rows)
-        total_realised = float(self._df["Daily Realised P&L"].sum())
+        return pd.DataFrame(
+            {
+                # Ensure Date is in datetime format and get the latest
+                "Date": grouped["Date"].max(),
+                "Symbol": last_rows.index,
+                "Today Qty": today_qty,
+                "Direction": np.select(
+                    [today_qty > 0, today_qty < 0], ["LONG", "SHORT"], "FLAT"
+                ),
+                "Total Cost": last_rows["Total Cost"],
+                "Unit Cost": last_rows["Unit Cost"],
+                "Market Value": last_rows["Market Value"],
+                # Calculate Total Realised P&L (sum over all rows of the symbol)
+                "Total Realised": total_realised,
+                "Yahoo Finance": last_rows["Yahoo Finance"],
+            }
+        ).reset_index(drop=True)
 
-        # Determine direction
-        if today_qty > 0:
-            direction = "LONG"
-        elif today_qty < 0:
-            direction = "SHORT"
-        else:
-            direction = "FLAT"
+    @staticmethod
+    def mark_to_market(
+        positions: pd.DataFrame, market_data: Optional[MarketDataService]
+    ) -> pd.DataFrame:
+        """Value current positions at latest market prices.
+        Prices of all symbols are requested at once, symbols without a quote keep the price of the file.
+        Args:
+            positions: Current positions, as returned by `get_current_positions`.
+            market_data: Market data service, None to keep positions as they are.
 
-        return pd.DataFrame(
-            [
-                {
-                    "Date": date,
-                    "Symbol": symbol,
-                    "Today Qty": today_qty,
-                    "Direction": direction,
-                    "Total Cost": total_cost,
-                    "Unit Cost": unit_cost,
-                    "Market Value": market_value,
-                    "Total Realised": total_realised,
-                    "Yahoo Finance": yahoo_finance,
-                }
-            ]
-        )
+        Returns:
+            DataFrame of current positions with updated `Yahoo Finance` and `Market Value` columns.
+        """
+        if market_data is None or positions.empty:
+            return positions
+        prices = market_data.get_prices(positions["Symbol"].tolist())
+        positions = positions.copy()
+        # Mapping a categorical column gives a categorical one, which arithmetic rejects
+        quoted = positions["Symbol"].astype(object).map(prices).astype(float)
+        positions["Yahoo Finance"] = quoted.fillna(positions["Yahoo Finance"])
+        positions["Market Value"] = positions["Today Qty"] * positions["Yahoo Finance"]
+        return positions
 
     def _format_col_types(self):
-        """Format columns to have proper type.
+        """Format columns to have proper type, see `PNL_SCHEMA`.
         Returns:
             None
         """
-        self._df["Date"] = pd.to_datetime(self._df["Date"], errors="coerce")
+        self._df = apply_schema(self._df, PNL_SCHEMA)
 
     @classmethod
-    def from_excel(cls, file: BytesIO) -> "PnLProcessor":
-        return cls(pd.read_excel(file))
+    def from_excel(
+        cls,
+        file: BytesIO,
+        workers: int = PNL_WORKERS,
+        cost_basis: str = PNL_COST_BASIS,
+        digest: Optional[str] = None,
+    ) -> "PnLProcessor":
+        """
+        Instantiate PnLProcessor class from an Excel file.
+        Args:
+            file: Bytes representation of an Excel file.
+            workers: Number of processes used to compute statistics of large books.
+            cost_basis: `average`, `fifo` or `lifo`, see `PNL_COST_BASIS` setting.
+            digest: SHA-256 digest of the file when already known, see `read_excel_cached`.
+
+        Returns:
+            Instance of PnLProcessor
+        """
+        return cls(
+            read_excel_cached(file, digest=digest),
+            workers=workers,
+            cost_basis=cost_basis,
+        )
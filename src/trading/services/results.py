@@ -0,0 +1,114 @@
+import json
+import shutil
+import time
+import uuid
+
+import pandas as pd
+from trading import timing
+from trading.settings import MEDIA_ROOT, RESULTS_MAX_AGE
+
+RESULTS_ROOT = MEDIA_ROOT / "results"
+
+# Upper bound of rows served by a single page
+MAX_PAGE_SIZE = 1_000
+
+
+@timing.timed("save_results", rows=lambda frames: sum(map(len, frames.values())))
+def save_results(frames: dict[str, pd.DataFrame]) -> str:
+    """Keep result sets of an upload on disk, to be served page by page later on.
+    Result sets older than `RESULTS_MAX_AGE` seconds are dropped on the way.
+    Args:
+        frames: Mapping of result set name to its DataFrame
+
+    Returns:
+        Key identifying the result sets of this upload.
+    """
+    _drop_expired()
+    key = uuid.uuid4().hex
+    location = RESULTS_ROOT / key
+    location.mkdir(parents=True)
+    for name, df in frames.items():
+        df.to_pickle(location / f"{name}.pkl")
+    return key
+
+
+def load_result(key: str, name: str) -> pd.DataFrame:
+    """Load a result set saved by `save_results`.
+    Args:
+        key: Key of the upload
+        name: Name of the result set
+
+    Returns:
+        DataFrame of the result set.
+
+    Raises:
+        FileNotFoundError: Unknown key or result set name.
+    """
+    if not (key.isalnum() and name.isidentifier()):
+        raise FileNotFoundError(f"No result set {name} for {key}")
+    return pd.read_pickle(RESULTS_ROOT / key / f"{name}.pkl")
+
+
+def touch_results(key: str) -> bool:
+    """Keep result sets of an upload for another `RESULTS_MAX_AGE` seconds.
+    Args:
+        key: Key of the upload
+
+    Returns:
+        Whether result sets of the upload are still available.
+    """
+    location = RESULTS_ROOT / key
+    if not (key.isalnum() and location.is_dir()):
+        return False
+    location.touch()
+    return True
+
+
+def get_page(
+    df: pd.DataFrame,
+    page: int = 1,
+    page_size: int = 100,
+    sort: str | None = None,
+    descending: bool = False,
+) -> dict:
+    """Slice one page out of a result set.
+    Args:
+        df: Result set
+        page: Page number, starting from 1
+        page_size: Number of rows per page, capped to `MAX_PAGE_SIZE`
+        sort: Column to sort on, file order when missing or unknown
+        descending: Sort in descending order
+
+    Returns:
+        JSON serializable dictionary with `columns`, `rows` and pagination details.
+    """
+    page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+    pages = max((len(df) + page_size - 1) // page_size, 1)
+    page = min(max(page, 1), pages)
+    if sort in df.columns:
+        df = df.sort_values(sort, ascending=not descending, kind="stable")
+
+    start = (page - 1) * page_size
+    data = json.loads(
+        df.iloc[start : start + page_size].to_json(
+            orient="split", index=False, date_format="iso"
+        )
+    )
+    return {
+        "columns": data["columns"],
+        "rows": data["data"],
+        "page": page,
+        "pages": pages,
+        "page_size": page_size,
+        "total": len(df),
+    }
+
+
+def _drop_expired() -> None:
+    """Remove result sets saved more than `RESULTS_MAX_AGE` seconds ago."""
+    if not RESULTS_ROOT.exists():
+        return
+    expiry = time.time() - RESULTS_MAX_AGE
+    for location in RESULTS_ROOT.iterdir():
+        if location.stat().st_mtime < expiry:
+            shutil.rmtree(location, ignore_errors=True)
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+# Declared dtypes of uploaded files, columns missing from a file are skipped and any other column
+# is kept as parsed. Symbols and directions repeat on every row, categories store each distinct
+# value once and every row as a small integer code.
+TRADES_SCHEMA = {
+    "Date": "datetime64[ns]",
+    "Symbol": "category",
+    "Direction": "category",
+    "Quantity": "int32",
+    "Price": "float64",
+}
+PNL_SCHEMA = {**TRADES_SCHEMA, "Yahoo Finance": "float64"}
+
+
+def apply_schema(df: pd.DataFrame, schema: dict[str, str]) -> pd.DataFrame:
+    """Cast columns of a DataFrame to their declared dtype.
+    Columns already holding their dtype are not copied. Unparseable dates and numbers become
+    missing values, integer columns holding missing or fractional values (e.g. rows of a P&L book
+    without a trade) fall back to `float64` instead of being truncated.
+    Args:
+        df: Parsed DataFrame
+        schema: Mapping of column name to dtype, see `TRADES_SCHEMA` and `PNL_SCHEMA`
+
+    Returns:
+        DataFrame with typed columns, `df` itself when every column already had its dtype.
+    """
+    columns = {}
+    for name, dtype in schema.items():
+        if name not in df.columns or df[name].dtype == dtype:
+            continue
+        values = df[name]
+        if dtype == "category":
+            columns[name] = values.astype("category")
+        elif dtype.startswith("datetime64"):
+            columns[name] = pd.to_datetime(values, errors="coerce").astype(dtype)
+        else:
+            columns[name] = _to_number(values, np.dtype(dtype))
+    return df.assign(**columns) if columns else df
+
+
+def _to_number(values: pd.Series, dtype: np.dtype) -> pd.Series:
+    """Convert values to a numeric dtype, falling back to `float64` for unrepresentable integers.
+    Args:
+        values: Column to convert
+        dtype: Target dtype
+
+    Returns:
+        Converted column.
+    """
+    numbers = pd.to_numeric(values, errors="coerce")
+    if dtype.kind not in "iu":
+        return numbers.astype(dtype)
+    limits = np.iinfo(dtype)
+    if numbers.isna().any() or (numbers % 1 != 0).any():
+        return numbers.astype("float64")
+    if len(numbers) and (numbers.min() < limits.min or numbers.max() > limits.max):
+        return numbers.astype("float64")
+    return numbers.astype(dtype)
+
+
+def memory_report(df: pd.DataFrame) -> dict[str, dict]:
+    """Memory held by every column of a DataFrame, values of object columns included.
+    Args:
+        df: DataFrame to inspect
+
+    Returns:
+        Mapping of column name to its `dtype` and `bytes`, plus a `total` entry.
+    """
+    usage = df.memory_usage(deep=True, index=False)
+    report = {
+        name: {"dtype": str(df[name].dtype), "bytes": int(usage[name])}
+        for name in df.columns
+    }
+    report["total"] = {"dtype": "", "bytes": int(usage.sum())}
+    return report
@@ -0,0 +1,70 @@
+import hashlib
+import json
+import logging
+from typing import Callable, Iterable, Optional
+
+import pandas as pd
+from django.core.cache import caches
+from trading import timing
+from trading.repository.data_version import data_version
+from trading.settings import SNAPSHOT_CACHE
+
+log = logging.getLogger("root")
+
+
+def snapshot_key(
+    name: str, symbols: Optional[Iterable[str]], version: int, **params
+) -> str:
+    """Cache key of a snapshot.
+    Args:
+        name: Name of the computed view, e.g. `cumulative_positions`
+        symbols: Symbols the snapshot is restricted to, None for every symbol
+        version: Data version the snapshot is computed from
+        params: Any other parameter of the computation, e.g. a date range
+
+    Returns:
+        Key, the same for the same set of symbols whatever their order or repetitions.
+    """
+    selection = sorted(set(symbols)) if symbols is not None else None
+    # Symbol lists can be long, keys of the cache backends are not
+    digest = hashlib.sha256(
+        json.dumps([selection, params], sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return f"snapshot:{name}:{version}:{digest}"
+
+
+def get_snapshot(
+    name: str,
+    build: Callable[[], pd.DataFrame],
+    symbols: Optional[Iterable[str]] = None,
+    **params,
+) -> pd.DataFrame:
+    """Serve a computed view of stored data from the snapshot cache, computing it on a miss.
+    Snapshots are keyed by the current data version, any write to transactions, daily net
+    positions or P&L states changes it: a snapshot is never served once its data changed, and
+    nothing has to be deleted from the cache, outdated snapshots expire on their own.
+    Args:
+        name: Name of the computed view, e.g. `cumulative_positions`
+        build: Computes the view, called on a miss only
+        symbols: Symbols the view is restricted to, None for every symbol
+        params: Any other parameter of the computation, e.g. a date range
+
+    Returns:
+        Computed view.
+    """
+    cache = caches[SNAPSHOT_CACHE]
+    # Version is read before computing: a write committed meanwhile bumps it, the snapshot is
+    # then stored under a version readers no longer ask for
+    key = snapshot_key(name, symbols, data_version(), **params)
+    with timing.stage("load_snapshot") as timer:
+        df = cache.get(key)
+        timer.rows = len(df) if df is not None else 0
+    if df is not None:
+        return df
+
+    with timing.stage(f"snapshot_{name}") as timer:
+        df = build()
+        timer.rows = len(df)
+    cache.set(key, df)
+    log.debug(f"Cached {name} snapshot of {len(df)} rows under {key}")
+    return df
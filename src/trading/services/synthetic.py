@@ -0,0 +1,84 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+TRADES = "trades"
+PNL = "pnl"
+
+
+def generate_trades(
+    rows: int,
+    symbols: int = 10,
+    seed: int = 0,
+    kind: str = TRADES,
+    start: str = "2024-01-01",
+) -> pd.DataFrame:
+    """Generate a reproducible trades file.
+    Args:
+        rows: Number of rows.
+        symbols: Number of distinct symbols.
+        seed: Seed of the random generator, the same arguments always give the same rows.
+        kind: `trades` for a trade blotter (`Date`, `Symbol`, positive `Quantity`, `Price` and
+            `Direction`), `pnl` for a P&L book with one row per symbol and day, signed quantities,
+            days without trade and a `Yahoo Finance` market price.
+        start: First date of the file.
+
+    Returns:
+        DataFrame shaped like the files uploaded by users.
+    """
+    rng = np.random.default_rng(seed)
+    names = np.array([f"SYM{i:04d}" for i in range(symbols)], dtype=object)
+    days = max(-(-rows // symbols), 1)
+
+    if kind == TRADES:
+        buy = rng.random(rows) < 0.5
+        return pd.DataFrame(
+            {
+                "Date": pd.Timestamp(start)
+                + pd.to_timedelta(rng.integers(0, days, rows), "D"),
+                "Symbol": names[rng.integers(0, symbols, rows)],
+                "Quantity": rng.integers(1, 100, rows),
+                "Price": rng.uniform(10, 1_000, rows).round(2),
+                "Direction": np.where(buy, "BUY", "SELL").astype(object),
+            }
+        )
+
+    # One row per (day, symbol), days in order, market prices following a random walk
+    day = np.repeat(np.arange(days), symbols)[:rows]
+    symbol = np.tile(np.arange(symbols), days)[:rows]
+    walks = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (days, symbols)), axis=0))
+    market = walks[day, symbol].round(2)
+
+    traded = rng.random(rows) < 0.5
+    buy = rng.random(rows) < 0.6
+    quantity = rng.integers(1, 100, rows) * np.where(buy, 1, -1)
+    price = (market * (1 + rng.normal(0, 0.005, rows))).round(2)
+    return pd.DataFrame(
+        {
+            "Date": pd.Timestamp(start) + pd.to_timedelta(day, "D"),
+            "Symbol": names[symbol],
+            "Quantity": np.where(traded, quantity, np.nan),
+            "Price": np.where(traded, price, np.nan),
+            "Direction": np.where(traded, np.where(buy, "BUY", "SELL"), None),
+            "Yahoo Finance": market,
+        }
+    )
+
+
+def write_excel(df: pd.DataFrame, path: Path | str) -> None:
+    """Write a DataFrame as an Excel file, row by row in openpyxl write-only mode.
+    Args:
+        df: DataFrame to write.
+        path: Location of the file.
+
+    Returns:
+        None
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(list(df.columns))
+    for row in df.astype(object).where(df.notna(), None).itertuples(index=False):
+        ws.append(row)
+    wb.save(path)
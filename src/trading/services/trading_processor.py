@@ -1,14 +1,26 @@
 from io import BytesIO
+from typing import Optional
 
+import numpy as np
 import pandas as pd
+from trading import timing
 from trading.repository.base_repo import Repository
+from trading.services.frame_cache import iter_excel_chunks_cached, read_excel_cached
+from trading.services.schema import TRADES_SCHEMA, apply_schema
+from trading.services.validation import (
+    InvalidTrades,
+    ValidationReport,
+    validate_trades,
+)
+from trading.settings import EXCEL_CHUNK_SIZE
 
 
 class TradingProcessor:
     """ """
 
     def __init__(self, df: pd.DataFrame):
-        self._df = df
+        self._daily_net: Optional[pd.DataFrame] = None
+        self.df = df
 
     def calc_daily_net(self) -> pd.DataFrame:
         """Calculate daily net positions for each distinct Symbol.
@@ -18,25 +30,40 @@ class TradingProcessor:
         Returns:
             A DataFrame containing the daily net positions with the columns:
             - `Date` (datetime): The date of the transaction.
-            - `Symbol` (str): The identifier of the asset.
+            - `Symbol` (category): The identifier of the asset.
             - `Net Position` (float): The net position for the asset on the given date.
+            Rows keep the order in which (`Date`, `Symbol`) pairs first appear in the file.
+
+        Note:
+            Result is computed once and cached until a new DataFrame is assigned to `df`, callers
+            must not mutate it.
+        """
+        if self._daily_net is not None:
+            return self._daily_net
+
+        with timing.stage("calc_daily_net", rows=len(self._df)):
+            sign = np.where((self._df["Direction"] == "BUY").to_numpy(), 1, -1)
+            self._df["Net Position"] = self._df["Quantity"] * self._df["Price"] * sign
+            self._daily_net = (
+                self._df.groupby(["Date", "Symbol"], sort=False, observed=True)
+                .agg({"Net Position": "sum"})
+                .reset_index()
+            )
+        return self._daily_net
+
+    def validate(self) -> None:
+        """Check every transaction can be processed, before computing or saving anything.
+
+        Raises:
+            InvalidTrades: Some rows are invalid, the error holds the report of the failing rows.
         """
-        self._df["Net Position"] = self._df.apply(
-            lambda row: row["Quantity"]
-            * row["Price"]
-            * (1 if row["Direction"] == "BUY" else -1),
-            axis=1,
-        )
-        net_positions = (
-            self._df.groupby(["Date", "Symbol"])
-            .agg({"Net Position": "sum"})
-            .reset_index()
-        )
-        return net_positions
+        report = validate_trades(self._df)
+        if not report.ok:
+            raise InvalidTrades(report)
 
     def save(self, repo: Repository) -> None:
         """Persist transactions into Database using give repository.
-        To perform that we need first to export our transactions DataFrame into a dictionary.
+        The DataFrame is handed as is, the repository decides how to export it.
         Args:
             repo: Repository instance
 
@@ -45,12 +72,10 @@ class TradingProcessor:
         """
         if self._df is None:
             raise ValueError("No transactions DataFrame to save.")
-        transactions = self._df.to_dict(orient="records")
-        repo.save_transactions(transactions)
+        repo.save_frame(self._df)
 
     def save_daily_net(self, repo: Repository) -> None:
         """Persist calculated Daily Net Positions into database using given repository.
-        To perform that we need first to export our transactions DataFrame into a dictionary.
 
         Args:
             repo: Repository instance
@@ -58,21 +83,97 @@ class TradingProcessor:
         Returns:
             None
         """
-        positions = self.calc_daily_net().to_dict(orient="records")
-        repo.save_transactions(positions)
+        repo.save_frame(self.calc_daily_net())
 
     @property
-    def df(self):
+    def df(self) -> pd.DataFrame:
         return self._df
 
+    @df.setter
+    def df(self, df: pd.DataFrame) -> None:
+        """Replace transactions DataFrame, invalidating every result computed on the previous one.
+        Columns are cast to `TRADES_SCHEMA` dtypes.
+        Args:
+            df: Transactions DataFrame
+
+        Returns:
+            None
+        """
+        self._df = apply_schema(df, TRADES_SCHEMA)
+        self._daily_net = None
+
     @classmethod
-    def from_excel(cls, file: BytesIO) -> "TradingProcessor":
+    def from_excel(
+        cls, file: BytesIO, digest: Optional[str] = None
+    ) -> "TradingProcessor":
         """
         Instantiate TradingProcessor class from an Excel file.
         Args:
             file: Bytes representation of an Excel file.
+            digest: SHA-256 digest of the file when already known, see `read_excel_cached`.
 
         Returns:
             Instance of TradingProcessor
         """
-        return cls(pd.read_excel(file))
+        return cls(read_excel_cached(file, digest=digest))
+
+    @classmethod
+    def process_excel(
+        cls,
+        file: BytesIO,
+        transactions_repo: Repository,
+        positions_repo: Repository,
+        chunk_size: int = EXCEL_CHUNK_SIZE,
+        digest: Optional[str] = None,
+    ) -> tuple[pd.DataFrame, pd.DataFrame, int]:
+        """Stream an Excel file chunk by chunk and persist it using given repositories.
+        Transactions of every chunk are saved as soon as the chunk is read, only daily net
+        positions, bounded by the number of days and symbols, are accumulated across chunks
+        and saved once the whole file was read.
+        Every chunk is validated before being saved, once an invalid row is found nothing else is
+        saved but the remaining chunks are still validated to report every invalid row.
+        Args:
+            file: Bytes representation of an Excel file.
+            transactions_repo: Repository persisting transactions
+            positions_repo: Repository persisting daily net positions
+            chunk_size: Maximum number of rows held in memory at once.
+            digest: SHA-256 digest of the file when already known, see `read_excel_cached`.
+
+        Returns:
+            First chunk of transactions, as a preview of the file, daily net positions of the
+            whole file and the number of transactions saved.
+
+        Raises:
+            InvalidTrades: Some rows are invalid. Chunks saved before are not rolled back here,
+            callers run this method in a database transaction.
+        """
+        preview = daily_net = None
+        rows = 0
+        report = ValidationReport()
+        for chunk in iter_excel_chunks_cached(
+            file, chunk_size=chunk_size, digest=digest
+        ):
+            report = report.merge(validate_trades(chunk))
+            if not report.ok:
+                continue
+            tp = cls(chunk)
+            tp.save(transactions_repo)
+            rows += len(tp.df)
+            if preview is None:
+                preview, daily_net = tp.df, tp.calc_daily_net()
+                continue
+            # Symbol categories differ from one chunk to the next, concatenation gives objects
+            daily_net = apply_schema(
+                pd.concat([daily_net, tp.calc_daily_net()])
+                .groupby(["Date", "Symbol"], sort=False, observed=True)
+                .agg({"Net Position": "sum"})
+                .reset_index(),
+                TRADES_SCHEMA,
+            )
+
+        if not report.ok:
+            raise InvalidTrades(report)
+        if preview is None:
+            return pd.DataFrame(), pd.DataFrame(), 0
+        positions_repo.save_frame(daily_net)
+        return preview, daily_net, rows
@@ -0,0 +1,247 @@
+import hashlib
+import json
+import logging
+from typing import Optional
+
+import pandas as pd
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError
+from django.db import transaction as db_transaction
+from django.utils import timezone
+from trading.models import StoredUpload, UploadJob
+from trading.services.executor import UploadExecutor
+from trading.services.results import save_results
+from trading.services.uploads import process_pnl_file, process_trades_file
+from trading.settings import (
+    MARKET_DATA_PROVIDER,
+    MEDIA_ROOT,
+    PNL_COST_BASIS,
+    PNL_PRICE_SOURCE,
+)
+from trading.tools import StoredFile
+
+log = logging.getLogger("root")
+
+
+def options_key(kind: str, options: Optional[dict] = None) -> str:
+    """Digest of the settings, besides its content, a file is processed with.
+    Trades files are stored as they are, a trades file is a duplicate whatever the options. A P&L
+    file is processed with its upload options and the cost basis and price settings of the
+    server, the same file uploaded with other ones is processed concurrently.
+    Args:
+        kind: `UploadJob.TRADES` or `UploadJob.PNL`
+        options: Processing options, e.g. `incremental` for P&L files
+
+    Returns:
+        Hexadecimal digest, empty for trades files.
+    """
+    if kind == UploadJob.TRADES:
+        return ""
+    settings = {
+        "incremental": bool((options or {}).get("incremental", False)),
+        "cost_basis": PNL_COST_BASIS,
+        "price_source": PNL_PRICE_SOURCE,
+        "market_data": MARKET_DATA_PROVIDER,
+    }
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+
+
+def claim(
+    kind: str, stored: StoredFile, options: Optional[dict] = None
+) -> tuple[StoredUpload, bool]:
+    """Register a stored file for processing, unless the same content was already registered
+    with the same options.
+    A processed trades file is never processed again, its stored result is served instead. The
+    result of a P&L file depends on the stored states, lots and prices and processing it saves
+    states, so a P&L file is processed again once its previous processing is over: only a file
+    being processed is a duplicate.
+    Args:
+        kind: `UploadJob.TRADES` or `UploadJob.PNL`
+        stored: File saved by `save_to_disk`
+        options: Processing options, e.g. `incremental` for P&L files
+
+    Returns:
+        Index entry of the file and whether the caller must process it.
+    """
+    key = {
+        "sha256": stored.sha256,
+        "kind": kind,
+        "options_key": options_key(kind, options),
+    }
+    try:
+        with db_transaction.atomic():
+            upload, created = StoredUpload.objects.get_or_create(
+                **key, defaults={"file_name": stored.name}
+            )
+    except IntegrityError:
+        # Same file registered concurrently
+        return StoredUpload.objects.get(**key), False
+    if created or kind == UploadJob.TRADES or upload.result is None:
+        return upload, created
+
+    # Only one of concurrent uploads of a processed file takes it over
+    reopened = StoredUpload.objects.filter(id=upload.id, result__isnull=False).update(
+        result=None, processed_at=None, file_name=stored.name
+    )
+    # Either way the file is now being processed
+    upload.result = upload.processed_at = None
+    upload.file_name = stored.name
+    return upload, bool(reopened)
+
+
+def process(upload: StoredUpload, options: dict) -> dict:
+    """Process a registered file and keep its result in the index.
+    Entries of files failing to process are removed, the file can be uploaded again.
+    Args:
+        upload: Index entry of the file
+        options: Processing options, e.g. `incremental` for P&L files
+
+    Returns:
+        JSON serializable result, holding `results` key and `summary`, plus `current_positions`
+        records for P&L files.
+    """
+    path = upload_path(upload)
+    try:
+        if upload.kind == UploadJob.TRADES:
+            result = trades_result(*process_trades_file(path, digest=upload.sha256))
+        else:
+            result = pnl_result(
+                *process_pnl_file(
+                    path,
+                    incremental=options.get("incremental", False),
+                    digest=upload.sha256,
+                )
+            )
+    except Exception:
+        release(upload)
+        raise
+
+    complete(upload, result)
+    return result
+
+
+async def process_async(
+    upload: StoredUpload, options: dict, executor: UploadExecutor
+) -> dict:
+    """Async counterpart of `process`, every blocking step runs on given executor.
+    A trades file is streamed chunk by chunk and saved in a single database transaction, as
+    `process` does, nothing is kept when any step fails.
+    Args:
+        upload: Index entry of the file
+        options: Processing options, e.g. `incremental` for P&L files
+        executor: Executor running blocking work
+
+    Returns:
+        JSON serializable result, as returned by `process`.
+    """
+    path = upload_path(upload)
+    try:
+        if upload.kind == UploadJob.TRADES:
+            frames = await executor.run(process_trades_file, path, digest=upload.sha256)
+            result = await executor.run(trades_result, *frames)
+        else:
+            frames = await executor.run(
+                process_pnl_file,
+                path,
+                incremental=options.get("incremental", False),
+                digest=upload.sha256,
+            )
+            result = await executor.run(pnl_result, *frames)
+    except Exception:
+        await sync_to_async(release)(upload)
+        raise
+
+    await sync_to_async(complete)(upload, result)
+    return result
+
+
+def upload_path(upload: StoredUpload) -> str:
+    """Location of a registered file on disk."""
+    return str(MEDIA_ROOT / upload.file_name)
+
+
+def trades_result(
+    transactions: pd.DataFrame, daily_net: pd.DataFrame, rows: int
+) -> dict:
+    """Keep result sets of a trades file and summarize them.
+    Args:
+        transactions: Preview of the transactions
+        daily_net: Daily net positions of the whole file
+        rows: Number of transactions of the whole file
+
+    Returns:
+        JSON serializable result, holding `results` key and `summary`.
+    """
+    return {
+        # Transactions are only kept as a preview, the whole file is in the database
+        "results": save_results(
+            {"transactions_preview": transactions, "daily_net": daily_net}
+        ),
+        "summary": {
+            "transactions": rows,
+            "transactions_preview": len(transactions),
+            "daily_net": len(daily_net),
+        },
+    }
+
+
+def pnl_result(
+    pnl: pd.DataFrame,
+    current_positions: pd.DataFrame,
+    realised_lots: Optional[pd.DataFrame] = None,
+) -> dict:
+    """Keep result sets of a P&L file and summarize them.
+    Args:
+        pnl: P&L statistics
+        current_positions: Current positions
+        realised_lots: Realised P&L per lot, only kept when there is any
+
+    Returns:
+        JSON serializable result, holding `results` key, `summary` and `current_positions` records.
+    """
+    frames = {"pnl": pnl, "current_positions": current_positions}
+    summary = {"pnl": len(pnl)}
+    if realised_lots is not None and not realised_lots.empty:
+        frames["realised_lots"] = realised_lots
+        summary["realised_lots"] = len(realised_lots)
+    return {
+        "results": save_results(frames),
+        "summary": summary,
+        "current_positions": _to_records(current_positions),
+    }
+
+
+def complete(upload: StoredUpload, result: dict) -> None:
+    """Keep the result of a processed file in the index.
+    Args:
+        upload: Index entry of the file
+        result: JSON serializable result
+
+    Returns:
+        None
+    """
+    upload.result = result
+    upload.processed_at = timezone.now()
+    upload.save(update_fields=["result", "processed_at"])
+
+
+def release(upload: StoredUpload) -> None:
+    """Remove the index entry of a file which failed to process, it can be uploaded again.
+    Args:
+        upload: Index entry of the file
+
+    Returns:
+        None
+    """
+    StoredUpload.objects.filter(id=upload.id).delete()
+
+
+def _to_records(df: pd.DataFrame) -> list[dict]:
+    """Convert a DataFrame into JSON serializable records.
+    Args:
+        df: DataFrame to convert
+
+    Returns:
+        A list of dictionaries, dates in ISO format and `NaN` as `None`.
+    """
+    return json.loads(df.to_json(orient="records", date_format="iso"))
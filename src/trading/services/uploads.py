@@ -0,0 +1,78 @@
+from io import BytesIO
+from typing import Optional
+
+import pandas as pd
+from django.db import transaction as db_transaction
+from trading.repository.base_repo import Repository
+from trading.repository.pnl_states import PnLStateRepo
+from trading.repository.positions import DailyNetPositionUpsertRepo
+from trading.repository.prices import DailyPriceRepo
+from trading.repository.tranzactions import TransactionCopyRepo, TransactionRepo
+from trading.services.pnl_processor import PnLProcessor
+from trading.services.trading_processor import TradingProcessor
+from trading.services.yahoo_finance import get_market_data
+from trading.settings import BULK_LOADER, DAILY_NET_MODE, PNL_PRICE_SOURCE
+
+
+def trades_repositories() -> tuple[Repository, Repository]:
+    """Repositories persisting trades files, as selected by `BULK_LOADER` and `DAILY_NET_MODE`.
+    Returns:
+        Transactions repository and daily net positions repository.
+    """
+    transactions_repo = (
+        TransactionCopyRepo() if BULK_LOADER == "copy" else TransactionRepo()
+    )
+    positions_repo = DailyNetPositionUpsertRepo(accumulate=DAILY_NET_MODE == "add")
+    return transactions_repo, positions_repo
+
+
+def process_trades_file(
+    file: BytesIO | str, digest: Optional[str] = None
+) -> tuple[pd.DataFrame, pd.DataFrame, int]:
+    """Persist transactions of a trades file and its daily net positions.
+    The file is saved in a single database transaction, nothing is kept when a row is invalid.
+    Args:
+        file: Excel file, as uploaded or as a path on disk.
+        digest: SHA-256 digest of the file when already known, e.g. by the upload index.
+
+    Returns:
+        Preview of the transactions, daily net positions of the whole file and the number of
+        transactions saved.
+
+    Raises:
+        InvalidTrades: Some rows of the file are invalid.
+    """
+    with db_transaction.atomic():
+        return TradingProcessor.process_excel(
+            file, *trades_repositories(), digest=digest
+        )
+
+
+def process_pnl_file(
+    file: BytesIO | str, incremental: bool = False, digest: Optional[str] = None
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Compute P&L of a trades file and persist the running state of its symbols.
+    Args:
+        file: Excel file, as uploaded or as a path on disk.
+        incremental: Only compute trades after the last processed date of each symbol.
+        digest: SHA-256 digest of the file when already known, e.g. by the upload index.
+
+    Returns:
+        P&L statistics, current positions valued at market prices and realised P&L per lot
+        (FIFO and LIFO cost basis only), all empty when there is no new trade.
+    """
+    states_repo = PnLStateRepo()
+    pnl_processor = PnLProcessor.from_excel(file, digest=digest)
+    if incremental:
+        pnl_processor.resume(states_repo)
+    if pnl_processor.data.empty:
+        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+
+    if PNL_PRICE_SOURCE == "table":
+        pnl_processor.revalue(DailyPriceRepo())
+    pnl_processor.run()
+    pnl_processor.save_state(states_repo)
+    current_positions = PnLProcessor.mark_to_market(
+        pnl_processor.get_current_positions(), get_market_data()
+    )
+    return pnl_processor.data, current_positions, pnl_processor.realised_lots
@@ -0,0 +1,138 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+from trading import timing
+
+REQUIRED_COLUMNS = ["Date", "Symbol", "Direction", "Quantity", "Price"]
+DIRECTIONS = ["BUY", "SELL"]
+
+# Rows listed per reason in reports and error messages, counts are always complete
+MAX_REPORTED_ROWS = 20
+
+# Rows are reported as numbered by Excel, index 0 of a sheet read below its header is row 2
+FIRST_ROW = 2
+
+
+class ValidationReport(NamedTuple):
+    """Outcome of the validation of a trades DataFrame.
+    `failures` maps every reason to the Excel row numbers failing it, a row may fail several.
+    """
+
+    rows: int = 0
+    missing_columns: tuple[str, ...] = ()
+    failures: dict[str, np.ndarray] = {}
+
+    @property
+    def ok(self) -> bool:
+        return not self.missing_columns and not self.failures
+
+    @property
+    def invalid_rows(self) -> int:
+        """Number of distinct rows failing at least one check."""
+        if not self.failures:
+            return 0
+        return len(np.unique(np.concatenate(list(self.failures.values()))))
+
+    def merge(self, other: "ValidationReport") -> "ValidationReport":
+        """Combine reports of consecutive chunks of the same file.
+        Args:
+            other: Report of the next chunk
+
+        Returns:
+            Report of both chunks.
+        """
+        failures = dict(self.failures)
+        for reason, index in other.failures.items():
+            failures[reason] = np.concatenate((failures.get(reason, index[:0]), index))
+        missing = self.missing_columns + tuple(
+            column
+            for column in other.missing_columns
+            if column not in self.missing_columns
+        )
+        return ValidationReport(self.rows + other.rows, missing, failures)
+
+    def summary(self, limit: int = MAX_REPORTED_ROWS) -> list[dict]:
+        """Compact, JSON serializable, view of the report.
+        Args:
+            limit: Maximum number of row numbers listed per reason
+
+        Returns:
+            One entry per reason with `reason`, `count` and first failing `rows`.
+        """
+        entries = [
+            {"reason": f"Missing `{column}` column", "count": self.rows, "rows": []}
+            for column in self.missing_columns
+        ]
+        entries.extend(
+            {
+                "reason": reason,
+                "count": len(index),
+                "rows": index[:limit].tolist(),
+            }
+            for reason, index in self.failures.items()
+        )
+        return entries
+
+    def __str__(self) -> str:
+        if self.ok:
+            return f"{self.rows} valid rows"
+        reasons = []
+        for entry in self.summary(limit=5):
+            rows = ", ".join(map(str, entry["rows"]))
+            if entry["count"] > len(entry["rows"]):
+                rows += ", ..." if rows else "all rows"
+            reasons.append(f"{entry['reason']} (rows {rows})")
+        invalid = self.rows if self.missing_columns else self.invalid_rows
+        return f"{invalid} of {self.rows} rows are invalid: " + "; ".join(reasons)
+
+
+class InvalidTrades(ValueError):
+    """Raised when a trades file holds rows that can not be processed."""
+
+    def __init__(self, report: ValidationReport):
+        super().__init__(str(report))
+        self.report = report
+
+
+@timing.timed("validate_trades", rows=len)
+def validate_trades(df: pd.DataFrame) -> ValidationReport:
+    """Check every row of a trades DataFrame, one column at a time.
+    Every check is a boolean mask over a whole column, rows are never visited one by one.
+    Quantities are stored as integers, fractional ones are rejected rather than rounded.
+    Args:
+        df: Transactions, with `REQUIRED_COLUMNS` columns, indexed by position below the header
+            of their sheet as `iter_excel_chunks` does
+
+    Returns:
+        Report of the failing rows, identified by their Excel row number.
+    """
+    missing = tuple(column for column in REQUIRED_COLUMNS if column not in df)
+    if missing:
+        return ValidationReport(len(df), missing)
+
+    # Columns parsed from Excel are already typed, coercion only costs something for other inputs
+    dates = pd.to_datetime(df["Date"], errors="coerce")
+    quantity = pd.to_numeric(df["Quantity"], errors="coerce").to_numpy(
+        dtype=float, na_value=np.nan
+    )
+    price = pd.to_numeric(df["Price"], errors="coerce").to_numpy(
+        dtype=float, na_value=np.nan
+    )
+    known_direction = df["Direction"].isin(DIRECTIONS).to_numpy()
+    with np.errstate(invalid="ignore"):
+        non_positive = quantity <= 0
+        fractional = np.isfinite(quantity) & (quantity % 1 != 0)
+    checks = {
+        "Unparseable or missing `Date`": dates.isna().to_numpy(),
+        "Missing `Symbol`": df["Symbol"].isna().to_numpy(),
+        "`Direction` other than BUY or SELL": ~known_direction,
+        "Non numeric, infinite or missing `Quantity`": ~np.isfinite(quantity),
+        "Non positive `Quantity`": non_positive,
+        "Non integer `Quantity`": fractional,
+        "Non numeric, infinite or missing `Price`": ~np.isfinite(price),
+    }
+
+    rows = df.index.to_numpy() + FIRST_ROW
+    failures = {reason: rows[mask] for reason, mask in checks.items() if mask.any()}
+    return ValidationReport(len(df), (), failures)
@@ -0,0 +1,210 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Protocol
+
+import pandas as pd
+from trading.settings import (
+    MARKET_DATA_CACHE_SIZE,
+    MARKET_DATA_FILE,
+    MARKET_DATA_PROVIDER,
+    MARKET_DATA_TTL,
+)
+
+log = logging.getLogger("root")
+
+
+class PriceProvider(Protocol):
+    """
+    Interface for market price sources.
+    Concrete implementations should fetch quotes of every requested symbol in a single call.
+    """
+
+    def fetch_prices(self, symbols: list[str]) -> dict[str, float]:
+        """
+        Fetch latest price of multiple symbols.
+
+        Args:
+            symbols: Symbols to quote.
+
+        Returns:
+            Mapping of symbol to its latest price, symbols without a quote are left out.
+        """
+        ...
+
+
+class YahooFinanceProvider(PriceProvider):
+    """Latest close prices from Yahoo Finance, through the `yfinance` package."""
+
+    def fetch_prices(self, symbols: list[str]) -> dict[str, float]:
+        """Download last days of daily bars of all symbols at once and keep the last close.
+        Errors, rate limiting included, are logged and leave the symbols unquoted.
+        Args:
+            symbols: Symbols to quote.
+
+        Returns:
+            Mapping of symbol to its latest close price.
+        """
+        try:
+            import yfinance as yf
+        except ImportError as exc:
+            raise ImportError(
+                "Yahoo Finance provider requires the `yfinance` package."
+            ) from exc
+
+        try:
+            bars = yf.download(
+                symbols, period="5d", interval="1d", progress=False, auto_adjust=False
+            )
+        except Exception:
+            log.exception(f"Unable to fetch prices of {len(symbols)} symbols")
+            return {}
+
+        close = bars["Close"]
+        if isinstance(close, pd.Series):
+            close = close.to_frame(symbols[0])
+        last = close.ffill().iloc[-1] if not close.empty else pd.Series(dtype=float)
+        return {
+            symbol: float(price) for symbol, price in last.items() if pd.notna(price)
+        }
+
+
+class FileProvider(PriceProvider):
+    """
+    Prices read from a local CSV file with `Symbol` and `Price` columns.
+    Meant for offline use and tests, the file is read once on first use.
+    """
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self._prices: Optional[dict[str, float]] = None
+
+    def fetch_prices(self, symbols: list[str]) -> dict[str, float]:
+        """Look given symbols up in the file.
+        Args:
+            symbols: Symbols to quote.
+
+        Returns:
+            Mapping of symbol to its price in the file.
+        """
+        if self._prices is None:
+            df = pd.read_csv(self.path)
+            self._prices = dict(zip(df["Symbol"], df["Price"].astype(float)))
+        return {s: self._prices[s] for s in symbols if s in self._prices}
+
+
+class PriceCache:
+    """
+    Thread-safe cache of prices, entries expire after `ttl` seconds and the least recently used
+    ones are evicted once `max_size` entries are held. A symbol without a quote is cached as None,
+    it is not requested from the provider again until it expires.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, Optional[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, symbols: list[str]) -> dict[str, Optional[float]]:
+        """Get cached prices of given symbols.
+        Args:
+            symbols: Symbols to look up.
+
+        Returns:
+            Mapping of symbol to price, None for symbols known to have no quote, for symbols
+            cached and not expired.
+        """
+        now = time.monotonic()
+        prices = {}
+        with self._lock:
+            for symbol in symbols:
+                entry = self._entries.get(symbol)
+                if entry is None:
+                    continue
+                expires_at, price = entry
+                if expires_at <= now:
+                    del self._entries[symbol]
+                    continue
+                self._entries.move_to_end(symbol)
+                prices[symbol] = price
+        return prices
+
+    def set_many(self, prices: dict[str, Optional[float]]) -> None:
+        """Cache prices of multiple symbols.
+        Args:
+            prices: Mapping of symbol to price, None for a symbol without quote.
+
+        Returns:
+            None
+        """
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            for symbol, price in prices.items():
+                self._entries[symbol] = (expires_at, price)
+                self._entries.move_to_end(symbol)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+class MarketDataService:
+    """Market prices from a provider, with a cache in front of it."""
+
+    def __init__(
+        self,
+        provider: PriceProvider,
+        ttl: float = MARKET_DATA_TTL,
+        max_size: int = MARKET_DATA_CACHE_SIZE,
+    ):
+        self.provider = provider
+        self.cache = PriceCache(ttl=ttl, max_size=max_size)
+
+    def get_prices(self, symbols: list[str]) -> dict[str, float]:
+        """Get latest price of multiple symbols.
+        Cached prices are served as is, all the other symbols are fetched with one provider call.
+        Symbols the provider has no quote for are cached too, delisted or unknown symbols are not
+        requested again on every call.
+        Args:
+            symbols: Symbols to quote.
+
+        Returns:
+            Mapping of symbol to its latest price, symbols without a quote are left out.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        prices = self.cache.get_many(symbols)
+        missing = [s for s in symbols if s not in prices]
+        if missing:
+            fetched = self.provider.fetch_prices(missing)
+            fetched = {s: fetched.get(s) for s in missing}
+            self.cache.set_many(fetched)
+            prices.update(fetched)
+        return {s: price for s, price in prices.items() if price is not None}
+
+
+_service: Optional[MarketDataService] = None
+_service_lock = threading.Lock()
+
+
+def get_market_data() -> Optional[MarketDataService]:
+    """Get the market data service configured by `MARKET_DATA_PROVIDER` setting.
+    The service, and so its cache, is shared by the whole process.
+
+    Returns:
+        Market data service, None when no provider is configured.
+    """
+    global _service
+    if not MARKET_DATA_PROVIDER:
+        return None
+    with _service_lock:
+        if _service is None:
+            if MARKET_DATA_PROVIDER == "file":
+                provider = FileProvider(MARKET_DATA_FILE)
+            elif MARKET_DATA_PROVIDER == "yahoo":
+                provider = YahooFinanceProvider()
+            else:
+                # Rejected when settings are loaded already
+                raise ValueError(f"Unknown market data provider {MARKET_DATA_PROVIDER}")
+            _service = MarketDataService(provider)
+    return _service
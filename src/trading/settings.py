@@ -11,8 +11,11 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
 import os
+from importlib.util import find_spec
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -42,6 +45,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "trading.timing.TimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -167,5 +171,99 @@ LOGGING = {
     },
 }
 
+# Number of processes used to compute P&L of books containing many symbols
+PNL_WORKERS = int(os.getenv("PNL_WORKERS", "1"))
+
+# How uploaded rows are written to the database: `copy` uses PostgreSQL COPY when available, `orm`
+# always goes through Django bulk_create
+BULK_LOADER = os.getenv("BULK_LOADER", "copy")
+
+# How daily net positions of an upload are merged with stored ones for the same symbol and date:
+# `add` sums them, like transactions of every upload are all kept, `replace` keeps the latest upload
+# only, daily net positions then no longer match stored transactions
+DAILY_NET_MODE = os.getenv("DAILY_NET_MODE", "add")
+
+# Number of rows parsed at once when streaming uploaded Excel files
+EXCEL_CHUNK_SIZE = int(os.getenv("EXCEL_CHUNK_SIZE", "10000"))
+
+# Queue uploads and process them with the `process_jobs` command instead of inside the request
+UPLOAD_JOBS = os.getenv("UPLOAD_JOBS", "false").lower() == "true"
+# Number of processes used by the `process_jobs` command
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Seconds a running job is kept without a heartbeat of its worker, e.g. after a crash, before
+# another worker claims it again; a job is given up after JOB_MAX_ATTEMPTS claims
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "300"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+# Seconds result sets of an upload stay available for paginated reads
+RESULTS_MAX_AGE = int(os.getenv("RESULTS_MAX_AGE", "86400"))
+
+# Source of market prices used to value current positions: `yahoo`, `file` (CSV file with `Symbol`
+# and `Price` columns at MARKET_DATA_FILE) or empty to keep prices of the uploaded file
+MARKET_DATA_PROVIDER = os.getenv("MARKET_DATA_PROVIDER", "")
+MARKET_DATA_FILE = os.getenv("MARKET_DATA_FILE", "")
+# `yfinance` is an optional dependency, a missing one fails at startup instead of on every P&L upload
+if MARKET_DATA_PROVIDER not in ("", "yahoo", "file"):
+    raise ImproperlyConfigured(
+        f"Unknown MARKET_DATA_PROVIDER {MARKET_DATA_PROVIDER}, use `yahoo` or `file`."
+    )
+if MARKET_DATA_PROVIDER == "yahoo" and find_spec("yfinance") is None:
+    raise ImproperlyConfigured(
+        "MARKET_DATA_PROVIDER=yahoo requires the `yfinance` package, `pip install yfinance`."
+    )
+if MARKET_DATA_PROVIDER == "file" and not MARKET_DATA_FILE:
+    raise ImproperlyConfigured("MARKET_DATA_PROVIDER=file requires MARKET_DATA_FILE.")
+# Seconds a fetched price, or the absence of a quote, is reused and maximum number of cached symbols
+MARKET_DATA_TTL = float(os.getenv("MARKET_DATA_TTL", "60"))
+MARKET_DATA_CACHE_SIZE = int(os.getenv("MARKET_DATA_CACHE_SIZE", "1024"))
+
+# Market prices used to compute P&L: `file` (price column of the uploaded file) or `table`
+# (stored daily prices, loaded with the `load_prices` command, falling back to the file)
+PNL_PRICE_SOURCE = os.getenv("PNL_PRICE_SOURCE", "file")
+
+# Cost of the quantity removed from a position by a sale: `average` unit cost of the position,
+# or cost of the matched lots, oldest first (`fifo`) or newest first (`lifo`)
+PNL_COST_BASIS = os.getenv("PNL_COST_BASIS", "average")
+
+# Disk space, in megabytes, of parsed Excel files kept to skip parsing the same file again,
+# least recently used ones are evicted first; 0 disables the cache
+FRAME_CACHE_SIZE_MB = int(os.getenv("FRAME_CACHE_SIZE_MB", "512"))
+
+# Time processing stages, report them in `Server-Timing` headers and at `/metrics`
+TIMING_ENABLED = os.getenv("TIMING_ENABLED", "false").lower() == "true"
+
+# Serve uploads with async views, for ASGI deployments. Blocking work runs on a pool of
+# UPLOAD_EXECUTOR_WORKERS threads, with room for UPLOAD_EXECUTOR_QUEUE more uploads waiting
+# for a thread; any further upload is answered with 503
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "false").lower() == "true"
+UPLOAD_EXECUTOR_WORKERS = int(os.getenv("UPLOAD_EXECUTOR_WORKERS", "2"))
+UPLOAD_EXECUTOR_QUEUE = int(os.getenv("UPLOAD_EXECUTOR_QUEUE", "8"))
+
 MEDIA_ROOT = BASE_DIR / "static" / "uploads"
+
+# Cache of computed position and P&L snapshots, see `trading.services.snapshots`. The `file`
+# backend is shared by every process of the host, `locmem` only suits a single process: a write
+# made by one process would not invalidate snapshots cached by the others.
+SNAPSHOT_CACHE = "snapshots"
+SNAPSHOT_CACHE_BACKEND = os.getenv("SNAPSHOT_CACHE_BACKEND", "file")
+SNAPSHOT_CACHE_TTL = int(os.getenv("SNAPSHOT_CACHE_TTL", "3600"))
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    SNAPSHOT_CACHE: {
+        "BACKEND": (
+            "django.core.cache.backends.locmem.LocMemCache"
+            if SNAPSHOT_CACHE_BACKEND == "locmem"
+            else "django.core.cache.backends.filebased.FileBasedCache"
+        ),
+        "LOCATION": (
+            SNAPSHOT_CACHE
+            if SNAPSHOT_CACHE_BACKEND == "locmem"
+            else str(MEDIA_ROOT / "snapshots")
+        ),
+        "TIMEOUT": SNAPSHOT_CACHE_TTL,
+        "OPTIONS": {"MAX_ENTRIES": 1000},
+    },
+}
 STATIC_ROOT = BASE_DIR / "templates"
\ No newline at end of file
@@ -0,0 +1,68 @@
+import threading
+from typing import Callable
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import HttpResponse
+from django.shortcuts import loader
+from django.test import AsyncRequestFactory, SimpleTestCase
+from trading import views
+from trading.models import StoredUpload, UploadJob
+from trading.services import upload_store
+from trading.tools import StoredFile
+
+XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+FILE = StoredFile(name="book.xlsx", sha256="a" * 64)
+
+
+class AsyncViewsTest(SimpleTestCase):
+    """Async views look up stored results and render templates off the event loop."""
+
+    def setUp(self):
+        self.threads = {}
+        patchers = [
+            mock.patch.object(views, "save_to_disk", return_value=FILE),
+            # The same file is being processed, its stored result is looked up
+            mock.patch.object(
+                upload_store,
+                "claim",
+                side_effect=lambda kind, *args: (StoredUpload(kind=kind), False),
+            ),
+            self.record(views, "_stored_result"),
+            self.record(loader, "render_to_string"),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def record(self, target: object, name: str) -> mock._patch:
+        func: Callable = getattr(target, name)
+
+        def call(*args, **kwargs):
+            self.threads[name] = threading.get_ident()
+            return func(*args, **kwargs)
+
+        return mock.patch.object(target, name, side_effect=call)
+
+    def post(self, view: type) -> HttpResponse:
+        request = AsyncRequestFactory().post(
+            "/", {"file": SimpleUploadedFile(FILE.name, b"xlsx", content_type=XLSX)}
+        )
+
+        async def handle() -> HttpResponse:
+            self.threads["loop"] = threading.get_ident()
+            return await view.post(request)
+
+        return async_to_sync(handle)()
+
+    def assert_off_the_event_loop(self, response: HttpResponse) -> None:
+        self.assertContains(response, "This file is already being processed.")
+        self.assertNotEqual(self.threads["_stored_result"], self.threads["loop"])
+        self.assertNotEqual(self.threads["render_to_string"], self.threads["loop"])
+
+    def test_trades_upload(self):
+        self.assert_off_the_event_loop(self.post(views.AsyncTradingProcessorView))
+
+    def test_pnl_upload(self):
+        self.assert_off_the_event_loop(self.post(views.AsyncPnLProcessorView))
@@ -0,0 +1,67 @@
+from unittest import mock
+
+import pandas as pd
+from django.db import connection
+from django.test import TestCase
+from trading.models import Transaction
+from trading.repository import bulk_copy
+from trading.repository.tranzactions import TransactionCopyRepo, TransactionRepo
+
+TRADES = pd.DataFrame(
+    {
+        "Date": pd.date_range("2024-01-01", periods=5),
+        "Symbol": ["AAA", "BBB", "AAA", "BBB", "AAA"],
+        "Quantity": [10, 5, -4, 2, 1],
+        "Price": [10.0, 20.0, 11.0, 21.0, 12.0],
+        "Direction": ["BUY", "BUY", "SELL", "BUY", "BUY"],
+    }
+)
+
+
+class CopyFallbackTest(TestCase):
+    """Off PostgreSQL, `COPY` loaders save rows through batched `bulk_create` instead."""
+
+    def setUp(self):
+        for patcher in (
+            mock.patch.object(connection, "vendor", "sqlite"),
+            mock.patch.object(bulk_copy, "BULK_BATCH_SIZE", 2),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_rows_are_saved_in_batches(self):
+        with mock.patch.object(
+            TransactionRepo,
+            "save_transactions",
+            autospec=True,
+            side_effect=TransactionRepo.save_transactions,
+        ) as save, self.captureOnCommitCallbacks() as callbacks:
+            TransactionCopyRepo().save_frame(TRADES)
+
+        self.assertEqual([len(call.args[1]) for call in save.call_args_list], [2, 2, 1])
+        # Each batch bumps the data version, once the whole frame commits
+        self.assertEqual(len(callbacks), 3)
+        self.assertEqual(
+            list(
+                Transaction.objects.order_by("date").values_list("quantity", flat=True)
+            ),
+            TRADES["Quantity"].tolist(),
+        )
+
+    def test_failing_batch_saves_nothing(self):
+        calls = []
+
+        def save(repo, rows):
+            calls.append(rows)
+            if len(calls) == 2:
+                raise RuntimeError
+            TransactionRepo.save_transactions(repo, rows)
+
+        with mock.patch.object(
+            TransactionRepo, "save_transactions", autospec=True, side_effect=save
+        ), self.captureOnCommitCallbacks() as callbacks:
+            with self.assertRaises(RuntimeError):
+                TransactionCopyRepo().save_frame(TRADES)
+
+        self.assertFalse(Transaction.objects.exists())
+        self.assertEqual(callbacks, [])
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+from django.test import TestCase
+from trading.repository.cumulative_positions import CumulativePositionRepo
+from trading.repository.positions import DailyNetPositionRepo
+from trading.services.synthetic import generate_trades
+from trading.services.trading_processor import TradingProcessor
+from trading.services.uploads import trades_repositories
+
+
+def upload(df: pd.DataFrame) -> None:
+    """Persist transactions and daily net positions of a trades file, as an upload does."""
+    processor = TradingProcessor(df.copy())
+    transactions_repo, positions_repo = trades_repositories()
+    transactions_repo.save_frame(processor.df)
+    positions_repo.save_frame(processor.calc_daily_net())
+
+
+class DailyNetConsistencyTest(TestCase):
+    """Stored daily net positions always match stored transactions."""
+
+    def test_uploads_on_the_same_days_add_up(self):
+        # Two different files trading the same symbols on the same days
+        upload(generate_trades(300, symbols=3, seed=1))
+        upload(generate_trades(300, symbols=3, seed=2))
+
+        stored = (
+            DailyNetPositionRepo()
+            .fetch_all_transactions()
+            .sort_values(["Symbol", "Date"])
+            .reset_index(drop=True)
+        )
+        expected = CumulativePositionRepo().fetch_cumulative_positions()
+        self.assertEqual(len(stored), len(expected))
+        np.testing.assert_allclose(
+            stored["Net Position"].to_numpy(dtype=float),
+            expected["Net Position"].to_numpy(dtype=float),
+            rtol=1e-9,
+        )
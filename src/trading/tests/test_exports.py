@@ -0,0 +1,104 @@
+import json
+import tempfile
+from datetime import date
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from django.test import TestCase
+from django.urls import reverse
+from trading import views
+from trading.models import DailyNetPosition
+from trading.services import results
+
+RESULT = pd.DataFrame(
+    {
+        "Date": pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-04"]),
+        "Symbol": pd.Categorical(["AAA", "BBB", "AAA"]),
+        "Unit Cost": [10.5, np.nan, 12.0],
+    }
+)
+
+
+class ExportTest(TestCase):
+    """Exports are streamed as downloadable CSV or NDJSON files holding every row."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = mock.patch.object(results, "RESULTS_ROOT", Path(tmp.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.key = results.save_results({"pnl": RESULT})
+
+    def export(self, url: str, fmt: str, content_type: str, name: str, **params) -> str:
+        response = self.client.get(url, {"format": fmt, **params})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], content_type)
+        self.assertEqual(
+            response["Content-Disposition"], f'attachment; filename="{name}.{fmt}"'
+        )
+        return b"".join(response.streaming_content).decode()
+
+    def test_result_as_csv(self):
+        url = reverse("export_result", args=[self.key, "pnl"])
+        csv = self.export(url, "csv", "text/csv", "pnl")
+        self.assertEqual(
+            csv.splitlines(),
+            [
+                "Date,Symbol,Unit Cost",
+                "2024-01-02,AAA,10.5",
+                "2024-01-03,BBB,",
+                "2024-01-04,AAA,12.0",
+            ],
+        )
+
+    def test_result_as_ndjson(self):
+        url = reverse("export_result", args=[self.key, "pnl"])
+        ndjson = self.export(url, "ndjson", "application/x-ndjson", "pnl")
+        records = [json.loads(line) for line in ndjson.splitlines()]
+        self.assertEqual(len(records), 3)
+        self.assertEqual(
+            records[1],
+            {"Date": "2024-01-03T00:00:00.000", "Symbol": "BBB", "Unit Cost": None},
+        )
+
+    def test_unknown_result_or_format(self):
+        url = reverse("export_result", args=[self.key, "missing"])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        url = reverse("export_result", args=[self.key, "pnl"])
+        self.assertEqual(self.client.get(url, {"format": "xml"}).status_code, 400)
+
+    def test_daily_net_positions_across_chunks(self):
+        for day in range(1, 6):
+            DailyNetPosition.objects.create(
+                symbol="AAA", date=date(2024, 1, day), net_position=day
+            )
+        DailyNetPosition.objects.create(
+            symbol="BBB", date=date(2024, 1, 1), net_position=1.0
+        )
+
+        with mock.patch.object(views, "EXPORT_CHUNK_SIZE", 2):
+            csv = self.export(
+                reverse("export_daily_net"),
+                "csv",
+                "text/csv",
+                "daily_net_positions",
+                symbol="AAA",
+                start="2024-01-02",
+                end="2024-01-05",
+            )
+        lines = csv.splitlines()
+        # Header is written once, whatever the number of chunks
+        self.assertEqual(lines[0], "Date,Symbol,Net Position")
+        self.assertEqual(
+            lines[1:], [f"2024-01-0{day},AAA,{day}.0" for day in range(2, 6)]
+        )
+
+    def test_no_daily_net_positions_is_a_header_only(self):
+        csv = self.export(
+            reverse("export_daily_net"), "csv", "text/csv", "daily_net_positions"
+        )
+        self.assertEqual(csv.splitlines(), ["Date,Symbol,Net Position"])
@@ -0,0 +1,65 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+from django.test import SimpleTestCase
+from trading.services import frame_cache
+from trading.services.excel_reader import iter_excel_chunks
+from trading.services.synthetic import generate_trades, write_excel
+
+
+class FrameCacheTest(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.path = self.root / "trades.xlsx"
+        write_excel(generate_trades(250, symbols=3, seed=0), self.path)
+        patcher = mock.patch.object(frame_cache, "FRAMES_ROOT", self.root / "frames")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def cached_files(self) -> list[Path]:
+        return sorted((self.root / "frames").glob("*"))
+
+    def test_chunks_are_served_from_the_cache(self):
+        parsed = list(iter_excel_chunks(str(self.path), chunk_size=100))
+        first = list(
+            frame_cache.iter_excel_chunks_cached(str(self.path), chunk_size=100)
+        )
+        self.assertEqual(len(self.cached_files()), 1)
+
+        with mock.patch.object(frame_cache, "iter_excel_chunks") as parse:
+            second = list(
+                frame_cache.iter_excel_chunks_cached(str(self.path), chunk_size=100)
+            )
+        parse.assert_called_once()
+        parse.return_value.__iter__.assert_not_called()
+        self.assertEqual(len(second), 3)
+        for expected, a, b in zip(parsed, first, second):
+            pd.testing.assert_frame_equal(a, expected)
+            pd.testing.assert_frame_equal(b, expected)
+
+    def test_chunks_are_written_one_at_a_time(self):
+        chunks = frame_cache.iter_excel_chunks_cached(str(self.path), chunk_size=100)
+        next(chunks)
+        # Only the first chunk was parsed and written so far, the entry is not visible yet
+        files = self.cached_files()
+        self.assertEqual([f.suffix for f in files], [".part"])
+        self.assertGreater(files[0].stat().st_size, 0)
+        list(chunks)
+        self.assertEqual([f.suffix for f in self.cached_files()], [".pkl"])
+
+    def test_partially_read_file_is_not_cached(self):
+        chunks = frame_cache.iter_excel_chunks_cached(str(self.path), chunk_size=100)
+        next(chunks)
+        chunks.close()
+        self.assertEqual(self.cached_files(), [])
+
+    def test_known_digest_is_not_computed_again(self):
+        digest = frame_cache.file_digest(str(self.path))
+        with mock.patch.object(frame_cache, "file_digest") as file_digest:
+            frame_cache.read_excel_cached(str(self.path), digest=digest)
+        file_digest.assert_not_called()
+        self.assertEqual(self.cached_files()[0].name.split("-")[0], digest)
@@ -0,0 +1,59 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from trading.models import StoredUpload, UploadJob
+from trading.services import jobs
+from trading.settings import JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS
+
+
+class JobLeaseTest(TestCase):
+    def make_job(self, **fields) -> UploadJob:
+        upload = StoredUpload.objects.create(
+            sha256="0" * 64, kind=UploadJob.TRADES, file_name="trades.xlsx"
+        )
+        return UploadJob.objects.create(
+            kind=UploadJob.TRADES, file_name="trades.xlsx", upload=upload, **fields
+        )
+
+    def test_claim_marks_jobs_running(self):
+        job = self.make_job()
+        self.assertEqual(jobs.claim(2), [job.id])
+        job.refresh_from_db()
+        self.assertEqual(job.status, UploadJob.RUNNING)
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNotNone(job.heartbeat_at)
+        self.assertEqual(jobs.claim(2), [])
+
+    def test_expired_job_is_claimed_again(self):
+        expired = timezone.now() - timedelta(seconds=JOB_LEASE_SECONDS + 1)
+        job = self.make_job(status=UploadJob.RUNNING, heartbeat_at=expired, attempts=1)
+        self.assertEqual(jobs.claim(2), [job.id])
+        job.refresh_from_db()
+        self.assertEqual(job.status, UploadJob.RUNNING)
+        self.assertEqual(job.attempts, 2)
+
+    def test_renewed_job_is_not_claimed_again(self):
+        expired = timezone.now() - timedelta(seconds=JOB_LEASE_SECONDS + 1)
+        job = self.make_job(status=UploadJob.RUNNING, heartbeat_at=expired, attempts=1)
+        jobs.renew([job.id])
+        self.assertEqual(jobs.claim(2), [])
+
+    def test_job_out_of_attempts_fails_and_releases_its_file(self):
+        expired = timezone.now() - timedelta(seconds=JOB_LEASE_SECONDS + 1)
+        job = self.make_job(
+            status=UploadJob.RUNNING, heartbeat_at=expired, attempts=JOB_MAX_ATTEMPTS
+        )
+        self.assertEqual(jobs.claim(2), [])
+        job.refresh_from_db()
+        self.assertEqual(job.status, UploadJob.FAILED)
+        self.assertIsNone(job.upload)
+        self.assertFalse(StoredUpload.objects.exists())
+
+    def test_retry_queues_jobs_of_a_broken_pool(self):
+        job = self.make_job()
+        jobs.claim(1)
+        jobs.retry([job.id], "Worker process died while processing the job.")
+        job.refresh_from_db()
+        self.assertEqual(job.status, UploadJob.QUEUED)
+        self.assertEqual(jobs.claim(1), [job.id])
@@ -0,0 +1,81 @@
+import pandas as pd
+from django.test import SimpleTestCase
+from trading.services.pnl_processor import PnLProcessor
+from trading.services.synthetic import PNL, generate_trades
+from trading.services.yahoo_finance import MarketDataService
+
+
+class CountingProvider:
+    """Provider quoting a fixed set of symbols and recording every request."""
+
+    def __init__(self, prices: dict[str, float]):
+        self.prices = prices
+        self.requests: list[list[str]] = []
+
+    def fetch_prices(self, symbols: list[str]) -> dict[str, float]:
+        self.requests.append(symbols)
+        return {s: self.prices[s] for s in symbols if s in self.prices}
+
+
+class MarketDataServiceTest(SimpleTestCase):
+    def test_cached_prices_are_not_fetched_again(self):
+        provider = CountingProvider({"AAPL": 10.0, "TSLA": 20.0})
+        service = MarketDataService(provider, ttl=60, max_size=10)
+
+        self.assertEqual(service.get_prices(["AAPL"]), {"AAPL": 10.0})
+        self.assertEqual(
+            service.get_prices(["AAPL", "TSLA"]), {"AAPL": 10.0, "TSLA": 20.0}
+        )
+        self.assertEqual(provider.requests, [["AAPL"], ["TSLA"]])
+
+    def test_symbols_without_quote_are_not_fetched_again(self):
+        provider = CountingProvider({"AAPL": 10.0})
+        service = MarketDataService(provider, ttl=60, max_size=10)
+
+        self.assertEqual(service.get_prices(["AAPL", "DELISTED"]), {"AAPL": 10.0})
+        self.assertEqual(service.get_prices(["AAPL", "DELISTED"]), {"AAPL": 10.0})
+        self.assertEqual(provider.requests, [["AAPL", "DELISTED"]])
+
+    def test_expired_entries_are_fetched_again(self):
+        provider = CountingProvider({"AAPL": 10.0})
+        service = MarketDataService(provider, ttl=0, max_size=10)
+
+        service.get_prices(["AAPL", "DELISTED"])
+        service.get_prices(["AAPL", "DELISTED"])
+        self.assertEqual(len(provider.requests), 2)
+
+
+class MarkToMarketTest(SimpleTestCase):
+    def current_positions(self) -> pd.DataFrame:
+        processor = PnLProcessor(
+            generate_trades(60, symbols=3, seed=3, kind=PNL), workers=1
+        )
+        processor.run()
+        positions = processor.get_current_positions()
+        self.assertIsInstance(positions["Symbol"].dtype, pd.CategoricalDtype)
+        return positions
+
+    def test_every_symbol_quoted(self):
+        positions = self.current_positions()
+        prices = {symbol: 100.0 + i for i, symbol in enumerate(positions["Symbol"])}
+        service = MarketDataService(CountingProvider(prices), ttl=60, max_size=10)
+
+        marked = PnLProcessor.mark_to_market(positions, service)
+        self.assertEqual(marked["Yahoo Finance"].dtype, float)
+        self.assertEqual(marked["Yahoo Finance"].tolist(), list(prices.values()))
+        pd.testing.assert_series_equal(
+            marked["Market Value"],
+            positions["Today Qty"] * pd.Series(list(prices.values())),
+            check_names=False,
+        )
+
+    def test_symbols_without_quote_keep_the_price_of_the_file(self):
+        positions = self.current_positions()
+        first = positions["Symbol"].iloc[0]
+        service = MarketDataService(CountingProvider({first: 1.0}), ttl=60, max_size=10)
+
+        marked = PnLProcessor.mark_to_market(positions, service)
+        self.assertEqual(marked["Yahoo Finance"].iloc[0], 1.0)
+        pd.testing.assert_series_equal(
+            marked["Yahoo Finance"].iloc[1:], positions["Yahoo Finance"].iloc[1:]
+        )
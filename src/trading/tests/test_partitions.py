@@ -0,0 +1,127 @@
+import unittest
+from datetime import date
+
+from django.db import IntegrityError, connection
+from django.db import transaction as db_transaction
+from django.test import SimpleTestCase, TestCase
+from trading.models import DailyNetPosition, Transaction
+from trading.repository.partitions import (
+    PARTITIONED_TABLES,
+    add_months,
+    create_partition,
+    default_partition_name,
+    detach_partition,
+    is_partitioned,
+    list_partitions,
+    partition_name,
+    partition_table,
+    unpartition_table,
+)
+
+TRANSACTIONS, DAILY_NET = PARTITIONED_TABLES
+
+# Far enough in the future to have no partition of its own, rows land in the default partition
+MONTH = date(2099, 5, 1)
+LAST_MONTH = add_months(date.today(), -1)
+
+
+class MonthsTest(SimpleTestCase):
+    def test_add_months(self):
+        self.assertEqual(add_months(date(2024, 1, 31), 1), date(2024, 2, 1))
+        self.assertEqual(add_months(date(2024, 12, 15), 1), date(2025, 1, 1))
+        self.assertEqual(add_months(date(2024, 1, 15), -1), date(2023, 12, 1))
+
+    def test_partition_name(self):
+        self.assertEqual(
+            partition_name(TRANSACTIONS, MONTH), "trading_transactions_p2099_05"
+        )
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "PostgreSQL partitioning")
+class PartitionTest(TestCase):
+    def count(self, table: str) -> int:
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {connection.ops.quote_name(table)}")
+            return cursor.fetchone()[0]
+
+    def trade(self, day: date, symbol: str = "AAA") -> Transaction:
+        return Transaction.objects.create(
+            date=day, symbol=symbol, quantity=1, price=1.0, direction="BUY"
+        )
+
+    def test_tables_are_partitioned_by_migrations(self):
+        with connection.cursor() as cursor:
+            for table in PARTITIONED_TABLES:
+                self.assertTrue(is_partitioned(cursor, table))
+                names = [partition.name for partition in list_partitions(cursor, table)]
+                self.assertIn(default_partition_name(table), names)
+
+    def test_create_partition_moves_rows_out_of_the_default_partition(self):
+        self.trade(MONTH.replace(day=10))
+        self.trade(add_months(MONTH, 1))
+        default = default_partition_name(TRANSACTIONS)
+        self.assertEqual(self.count(default), 2)
+
+        with connection.cursor() as cursor:
+            name = create_partition(cursor, TRANSACTIONS, MONTH)
+            self.assertEqual(name, partition_name(TRANSACTIONS, MONTH))
+            self.assertIsNone(create_partition(cursor, TRANSACTIONS, MONTH))
+            partitions = {p.name: p for p in list_partitions(cursor, TRANSACTIONS)}
+
+        self.assertEqual(partitions[name].start, MONTH)
+        self.assertEqual(partitions[name].end, add_months(MONTH, 1))
+        self.assertEqual(self.count(name), 1)
+        self.assertEqual(self.count(default), 1)
+        self.assertEqual(Transaction.objects.count(), 2)
+
+    def test_detached_partition_leaves_the_table(self):
+        self.trade(MONTH)
+        with connection.cursor() as cursor:
+            name = create_partition(cursor, TRANSACTIONS, MONTH)
+            detach_partition(cursor, TRANSACTIONS, name)
+            self.assertFalse(Transaction.objects.exists())
+            # Kept as a standalone table, until dropped
+            self.assertEqual(self.count(name), 1)
+            cursor.execute(
+                f"ALTER TABLE {TRANSACTIONS} ATTACH PARTITION {name} "
+                f"FOR VALUES FROM ('{MONTH}') TO ('{add_months(MONTH, 1)}')"
+            )
+            detach_partition(cursor, TRANSACTIONS, name, drop=True)
+            cursor.execute("SELECT to_regclass(%s)", [name])
+            self.assertIsNone(cursor.fetchone()[0])
+
+    def test_round_trip_keeps_rows_and_keys(self):
+        DailyNetPosition.objects.create(symbol="AAA", date=MONTH, net_position=1.0)
+        DailyNetPosition.objects.create(symbol="AAA", date=LAST_MONTH, net_position=2.0)
+
+        with connection.cursor() as cursor:
+            unpartition_table(cursor, DAILY_NET)
+            self.assertFalse(is_partitioned(cursor, DAILY_NET))
+            self.assertEqual(DailyNetPosition.objects.count(), 2)
+
+            partition_table(cursor, DAILY_NET)
+            self.assertTrue(is_partitioned(cursor, DAILY_NET))
+            names = [partition.name for partition in list_partitions(cursor, DAILY_NET)]
+
+        self.assertIn(partition_name(DAILY_NET, LAST_MONTH), names)
+        self.assertEqual(DailyNetPosition.objects.count(), 2)
+        self.assertEqual(self.count(default_partition_name(DAILY_NET)), 1)
+        # Id sequence and unique constraint survive the rebuild
+        DailyNetPosition.objects.create(symbol="BBB", date=MONTH, net_position=3.0)
+        with self.assertRaises(IntegrityError), db_transaction.atomic():
+            DailyNetPosition.objects.create(symbol="AAA", date=MONTH, net_position=4.0)
+
+    def test_rows_older_than_the_history_land_in_the_default_partition(self):
+        DailyNetPosition.objects.create(
+            symbol="AAA", date=date(1900, 1, 1), net_position=1.0
+        )
+        with connection.cursor() as cursor:
+            unpartition_table(cursor, DAILY_NET)
+            partition_table(cursor, DAILY_NET, history=2)
+            monthly = [p for p in list_partitions(cursor, DAILY_NET) if p.start]
+
+        current = add_months(date.today(), 0)
+        self.assertEqual(
+            [p.start for p in monthly], [add_months(current, i) for i in (-2, -1, 0)]
+        )
+        self.assertEqual(self.count(default_partition_name(DAILY_NET)), 1)
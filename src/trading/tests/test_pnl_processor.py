@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+from trading.services.excel_reader import read_excel
+from trading.services.pnl_processor import PnLProcessor
+from trading.services.synthetic import PNL, generate_trades
+from trading.settings import BASE_DIR
+
+PNL_SAMPLE = BASE_DIR.parent / "samples" / "pnl" / "pnl.xlsx"
+
+STATISTICS = [
+    "Daily Net",
+    "Removed Cost",
+    "Total Cost",
+    "Unit Cost",
+    "Market Value",
+    "Daily Realised P&L",
+    "Total Unrealised P&L",
+    "Daily Unrealised P&L",
+]
+
+
+def run(df: pd.DataFrame, **kwargs) -> tuple[PnLProcessor, pd.DataFrame]:
+    """Compute statistics and current positions of a P&L book.
+    Args:
+        df: P&L book
+        kwargs: Options of `PnLProcessor.run`
+
+    Returns:
+        Processor holding the computed book, and current positions.
+    """
+    processor = PnLProcessor(df.copy(), workers=1)
+    processor.run(**kwargs)
+    return processor, processor.get_current_positions()
+
+
+class VectorizedStatisticsTest(SimpleTestCase):
+    """The vectorized engine reproduces the row by row reference implementation."""
+
+    def assert_same_statistics(self, df: pd.DataFrame) -> None:
+        vectorized, positions = run(df)
+        reference, reference_positions = run(df, reference=True)
+
+        self.assertEqual(len(vectorized.data), len(reference.data))
+        for col in STATISTICS:
+            np.testing.assert_allclose(
+                vectorized.data[col].to_numpy(dtype=float),
+                reference.data[col].to_numpy(dtype=float),
+                rtol=1e-9,
+                equal_nan=True,
+                err_msg=col,
+            )
+        pd.testing.assert_frame_equal(positions, reference_positions, rtol=1e-9)
+
+    def test_sample_book(self):
+        if not Path(PNL_SAMPLE).exists():
+            self.skipTest(f"{PNL_SAMPLE} is not available")
+        self.assert_same_statistics(read_excel(PNL_SAMPLE))
+
+    def test_generated_book(self):
+        # Several symbols, days without trades, positions crossing zero and going short
+        df = generate_trades(600, symbols=6, seed=7, kind=PNL)
+        self.assertTrue((df.groupby("Symbol")["Quantity"].cumsum() < 0).any())
+        self.assert_same_statistics(df)
+
+    def test_interleaved_symbols_keep_file_order(self):
+        df = generate_trades(300, symbols=3, seed=3, kind=PNL)
+        shuffled = df.sample(frac=1, random_state=0).sort_values("Date", kind="stable")
+        self.assert_same_statistics(shuffled.reset_index(drop=True))
@@ -0,0 +1,268 @@
+import numpy as np
+import pandas as pd
+from django.test import TestCase
+from trading.models import PnLState
+from trading.repository.pnl_states import PnLStateRepo
+from trading.services.pnl_processor import (
+    AVERAGE,
+    FIFO,
+    LIFO,
+    PnLProcessor,
+    ResumeConflict,
+)
+from trading.services.synthetic import PNL, generate_trades
+
+STATISTICS = [
+    "Daily Net",
+    "Removed Cost",
+    "Total Cost",
+    "Unit Cost",
+    "Market Value",
+    "Daily Realised P&L",
+    "Total Unrealised P&L",
+    "Daily Unrealised P&L",
+]
+
+
+def full_run(df: pd.DataFrame, cost_basis: str = AVERAGE) -> PnLProcessor:
+    """Compute a whole P&L book at once."""
+    processor = PnLProcessor(df.copy(), workers=1, cost_basis=cost_basis)
+    processor.run()
+    return processor
+
+
+def resumed_run(
+    df: pd.DataFrame, cut: pd.Timestamp, cost_basis: str = AVERAGE
+) -> PnLProcessor:
+    """Compute rows dated before `cut` and persist their state, then resume with the whole book.
+    Args:
+        df: P&L book
+        cut: First date of the second upload
+        cost_basis: Cost basis of both uploads
+
+    Returns:
+        Processor of the second upload, holding rows dated on or after `cut` only.
+    """
+    repo = PnLStateRepo()
+    first = PnLProcessor(df[df["Date"] < cut].copy(), workers=1, cost_basis=cost_basis)
+    first.run()
+    first.save_state(repo)
+
+    second = PnLProcessor(df.copy(), workers=1, cost_basis=cost_basis)
+    second.resume(repo)
+    second.run()
+    return second
+
+
+def book(quantities: list[int], prices: list[float]) -> pd.DataFrame:
+    """Trades of a single symbol, one per day from 2024-01-01, valued at their own price."""
+    return pd.DataFrame(
+        {
+            "Date": pd.date_range("2024-01-01", periods=len(quantities)),
+            "Symbol": "AAA",
+            "Quantity": quantities,
+            "Price": prices,
+            "Direction": ["BUY" if q > 0 else "SELL" for q in quantities],
+            "Yahoo Finance": prices,
+        }
+    )
+
+
+class ResumeTest(TestCase):
+    """A book computed in two incremental uploads gives the numbers of a single upload."""
+
+    cost_basis = AVERAGE
+
+    def upload(self, df: pd.DataFrame) -> PnLProcessor:
+        """Resume a file from the persisted states and persist the states it leaves."""
+        processor = PnLProcessor(df.copy(), workers=1, cost_basis=self.cost_basis)
+        processor.resume(PnLStateRepo())
+        processor.run()
+        processor.save_state(PnLStateRepo())
+        return processor
+
+    def assert_statistics(self, data: pd.DataFrame, expected: pd.DataFrame) -> None:
+        self.assertEqual(len(data), len(expected))
+        for col in STATISTICS:
+            np.testing.assert_allclose(
+                data[col].to_numpy(dtype=float),
+                expected[col].to_numpy(dtype=float),
+                rtol=1e-9,
+                atol=1e-6,
+                equal_nan=True,
+                err_msg=col,
+            )
+
+    def assert_same_as_full_run(self, df: pd.DataFrame, cut: str) -> None:
+        cut = pd.Timestamp(cut)
+        full = full_run(df, self.cost_basis)
+        resumed = resumed_run(df, cut, self.cost_basis)
+
+        expected = full.data[full.data["Date"] >= cut].reset_index(drop=True)
+        self.assert_statistics(resumed.data, expected)
+        pd.testing.assert_frame_equal(
+            resumed.get_current_positions(), full.get_current_positions(), rtol=1e-9
+        )
+        expected_lots = full.realised_lots[full.realised_lots["Close Date"] >= cut]
+        pd.testing.assert_frame_equal(
+            resumed.realised_lots.reset_index(drop=True),
+            expected_lots.reset_index(drop=True),
+            rtol=1e-9,
+        )
+        pd.testing.assert_frame_equal(
+            resumed.open_lots.sort_values("Symbol", kind="stable").reset_index(
+                drop=True
+            ),
+            full.open_lots.sort_values("Symbol", kind="stable").reset_index(drop=True),
+            rtol=1e-9,
+        )
+
+    def test_long_only_book(self):
+        df = pd.DataFrame(
+            {
+                "Date": pd.to_datetime(
+                    ["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04"]
+                ),
+                "Symbol": "AAA",
+                "Quantity": [10, 10, -5, -10],
+                "Price": [10.0, 20.0, 30.0, 40.0],
+                "Direction": ["BUY", "BUY", "SELL", "SELL"],
+                "Yahoo Finance": [10.0, 20.0, 30.0, 40.0],
+            }
+        )
+        self.assert_same_as_full_run(df, "2024-01-03")
+
+    def test_generated_book(self):
+        df = generate_trades(600, symbols=6, seed=11, kind=PNL)
+        self.assert_same_as_full_run(df, df["Date"].iloc[len(df) // 2])
+
+    def test_already_processed_rows_are_skipped(self):
+        df = generate_trades(120, symbols=3, seed=5, kind=PNL)
+        repo = PnLStateRepo()
+        first = PnLProcessor(df.copy(), workers=1, cost_basis=self.cost_basis)
+        first.run()
+        first.save_state(repo)
+
+        again = PnLProcessor(df.copy(), workers=1, cost_basis=self.cost_basis)
+        again.resume(repo)
+        self.assertTrue(again.data.empty)
+
+    def test_trades_added_on_the_last_processed_day_are_processed(self):
+        df = book([10, 5, 5, -8, 4], [10.0, 11.0, 12.0, 13.0, 14.0])
+        df["Date"] = pd.to_datetime(
+            ["2024-01-01", "2024-01-02", "2024-01-02", "2024-01-02", "2024-01-03"]
+        )
+        full = full_run(df, self.cost_basis)
+
+        self.upload(df.iloc[:2])
+        second = self.upload(df.iloc[:4])
+        self.assert_statistics(second.data, full.data.iloc[2:4].reset_index(drop=True))
+        self.assertEqual(PnLStateRepo().fetch_states()["Date Rows"].tolist(), [3])
+
+        third = self.upload(df)
+        self.assert_statistics(third.data, full.data.iloc[4:].reset_index(drop=True))
+        pd.testing.assert_frame_equal(
+            third.get_current_positions(), full.get_current_positions(), rtol=1e-9
+        )
+
+    def test_file_missing_processed_trades_of_the_day_is_refused(self):
+        df = book([10, 5, 5], [10.0, 11.0, 12.0])
+        df["Date"] = pd.Timestamp("2024-01-02")
+        self.upload(df)
+
+        processor = PnLProcessor(df.iloc[:1].copy(), workers=1)
+        with self.assertRaisesMessage(ResumeConflict, "AAA"):
+            processor.resume(PnLStateRepo())
+
+    def test_states_without_row_count_skip_their_whole_day(self):
+        df = book([10, 5], [10.0, 11.0])
+        self.upload(df)
+        PnLState.objects.update(date_rows=None)
+
+        df.loc[len(df)] = df.iloc[1]
+        with self.assertLogs("root", level="WARNING"):
+            self.assertTrue(self.upload(df).data.empty)
+
+
+class FifoResumeTest(ResumeTest):
+    """Open lots are persisted with the state, sales after a resume match the original lots."""
+
+    cost_basis = FIFO
+
+    def test_short_position_keeps_its_lots(self):
+        # The position is short at the cut but a lot bought after the short sale is still open
+        df = pd.DataFrame(
+            {
+                "Date": pd.to_datetime(
+                    ["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04"]
+                ),
+                "Symbol": "AAA",
+                "Quantity": [-5, 3, 6, -4],
+                "Price": [10.0, 20.0, 30.0, 40.0],
+                "Direction": ["SELL", "BUY", "BUY", "SELL"],
+                "Yahoo Finance": [10.0, 20.0, 30.0, 40.0],
+            }
+        )
+        self.assert_same_as_full_run(df, "2024-01-03")
+
+    def test_lots_realise_the_realised_pnl_of_their_sales(self):
+        df = pd.DataFrame(
+            {
+                "Date": pd.to_datetime(
+                    ["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04"]
+                ),
+                "Symbol": "AAA",
+                "Quantity": [10, 10, -15, -5],
+                "Price": [10.0, 20.0, 12.0, 40.0],
+                "Direction": ["BUY", "BUY", "SELL", "SELL"],
+                "Yahoo Finance": [10.0, 20.0, 12.0, 40.0],
+            }
+        )
+        processor = full_run(df, self.cost_basis)
+        realised = processor.data["Daily Realised P&L"]
+        lots = processor.realised_lots
+        # The first sale loses money, neither the sale nor its lots realise anything
+        self.assertEqual(realised.iloc[2], 0.0)
+        self.assertEqual(lots["Realised P&L"].iloc[:2].tolist(), [0.0, 0.0])
+        self.assertAlmostEqual(lots["Realised P&L"].sum(), realised.sum())
+
+    def assert_lots_realise_their_rows(self, processor: PnLProcessor) -> None:
+        # Every trade of these books is on its own day
+        realised = processor.data.set_index("Date")["Daily Realised P&L"]
+        by_lots = processor.realised_lots.groupby("Close Date")["Realised P&L"].sum()
+        np.testing.assert_allclose(
+            by_lots.reindex(realised.index, fill_value=0.0).to_numpy(),
+            realised.to_numpy(),
+            atol=1e-9,
+        )
+
+    def test_covering_purchase_closes_short_lots(self):
+        df = book([10, 10, -15, -10, 5], [10.0, 20.0, 30.0, 40.0, 35.0])
+        processor = full_run(df, self.cost_basis)
+
+        self.assert_lots_realise_their_rows(processor)
+        # The oversold quantity was a short lot, the last purchase covers it and the book is flat
+        self.assertEqual(processor.data["Daily Net"].iloc[-1], 0)
+        self.assertEqual(processor.data["Total Cost"].iloc[-1], 0)
+        self.assertTrue(processor.open_lots.empty)
+        self.assert_same_as_full_run(df, "2024-01-04")
+        self.assert_same_as_full_run(df, "2024-01-05")
+
+    def test_oversold_quantity_opens_a_short_lot(self):
+        df = book([10, -15, 3], [10.0, 12.0, 8.0])
+        processor = full_run(df, self.cost_basis)
+
+        self.assert_lots_realise_their_rows(processor)
+        self.assertEqual(
+            processor.data["Daily Realised P&L"].tolist(), [0.0, 20.0, 12.0]
+        )
+        self.assertEqual(processor.data["Total Cost"].tolist(), [100.0, -60.0, -24.0])
+        lots = processor.open_lots
+        self.assertEqual(lots["Quantity"].tolist(), [-2.0])
+        self.assertEqual(lots["Unit Cost"].tolist(), [12.0])
+        self.assertEqual(lots["Open Date"].tolist(), [pd.Timestamp("2024-01-02")])
+        self.assert_same_as_full_run(df, "2024-01-03")
+
+
+class LifoResumeTest(FifoResumeTest):
+    cost_basis = LIFO
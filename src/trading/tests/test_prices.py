@@ -0,0 +1,62 @@
+import pandas as pd
+from django.test import TestCase
+from trading.repository.prices import DailyPriceRepo
+from trading.services.pnl_processor import PnLProcessor
+
+PRICES = pd.DataFrame(
+    {
+        "Symbol": ["AAA", "AAA", "AAA", "CCC"],
+        "Date": pd.to_datetime(
+            ["2024-01-02", "2024-01-05", "2024-01-09", "2024-01-01"]
+        ),
+        "Price": [20.0, 50.0, 90.0, 7.0],
+    }
+)
+
+
+class RevalueTest(TestCase):
+    """Rows are valued at the latest stored price of their symbol on or before their date."""
+
+    def setUp(self):
+        DailyPriceRepo().save_frame(PRICES)
+
+    def revalue(self, rows: list[tuple[str, str]]) -> pd.Series:
+        processor = PnLProcessor(
+            pd.DataFrame(
+                {
+                    "Date": pd.to_datetime([day for day, _ in rows]),
+                    "Symbol": [symbol for _, symbol in rows],
+                    "Quantity": 1,
+                    "Price": 1.0,
+                    "Direction": "BUY",
+                    "Yahoo Finance": [float(i) for i in range(len(rows))],
+                }
+            ),
+            workers=1,
+        )
+        processor.revalue(DailyPriceRepo())
+        return processor.data["Yahoo Finance"]
+
+    def test_exact_date(self):
+        self.assertEqual(self.revalue([("2024-01-05", "AAA")]).tolist(), [50.0])
+
+    def test_earlier_price_is_used_as_of_the_date(self):
+        prices = self.revalue([("2024-01-03", "AAA"), ("2024-01-08", "AAA")])
+        self.assertEqual(prices.tolist(), [20.0, 50.0])
+
+    def test_rows_before_the_first_price_keep_the_price_of_the_file(self):
+        prices = self.revalue([("2024-01-01", "AAA"), ("2024-01-02", "AAA")])
+        self.assertEqual(prices.tolist(), [0.0, 20.0])
+
+    def test_symbols_without_prices_keep_the_price_of_the_file(self):
+        prices = self.revalue([("2024-01-05", "BBB"), ("2024-01-05", "AAA")])
+        self.assertEqual(prices.tolist(), [0.0, 50.0])
+
+    def test_rows_out_of_date_order_get_their_own_price(self):
+        rows = [
+            ("2024-01-09", "AAA"),
+            ("2024-01-01", "CCC"),
+            ("2024-01-02", "AAA"),
+            ("2024-01-01", "AAA"),
+        ]
+        self.assertEqual(self.revalue(rows).tolist(), [90.0, 7.0, 20.0, 3.0])
@@ -0,0 +1,79 @@
+import json
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+from trading.services.exports import CSV, NDJSON, encode, iter_slices
+from trading.services.pnl_processor import PnLProcessor
+from trading.services.results import get_page
+from trading.services.schema import PNL_SCHEMA, TRADES_SCHEMA, apply_schema
+from trading.services.synthetic import PNL, TRADES, generate_trades
+from trading.services.trading_processor import TradingProcessor
+from trading.services.yahoo_finance import MarketDataService
+
+
+class QuoteEverything:
+    def fetch_prices(self, symbols: list[str]) -> dict[str, float]:
+        return {symbol: 50.0 for symbol in symbols}
+
+
+class SchemaTest(SimpleTestCase):
+    """Typed columns, categorical symbols and int32 quantities, flow through every stage."""
+
+    def assert_typed(self, df: pd.DataFrame, schema: dict[str, str]) -> None:
+        for name, dtype in schema.items():
+            if name not in df:
+                continue
+            # Rows of a P&L book without a trade leave integer columns with missing values
+            if dtype.startswith("int") and df[name].isna().any():
+                dtype = "float64"
+            self.assertEqual(str(df[name].dtype), dtype, name)
+
+    def assert_serializable(self, df: pd.DataFrame) -> None:
+        page = get_page(df, page_size=len(df) or 1, sort="Symbol")
+        self.assertEqual(page["total"], len(df))
+        self.assertIsInstance(page["rows"][0][page["columns"].index("Symbol")], str)
+        csv = "".join(encode(iter_slices(df, chunk_size=7), CSV))
+        self.assertEqual(len(csv.splitlines()), len(df) + 1)
+        lines = "".join(encode(iter_slices(df, chunk_size=7), NDJSON)).splitlines()
+        self.assertEqual(
+            [json.loads(line)["Symbol"] for line in lines], df["Symbol"].tolist()
+        )
+
+    def test_integer_columns_with_missing_values_fall_back_to_float(self):
+        df = apply_schema(
+            pd.DataFrame({"Quantity": [1, None], "Price": ["1.5", "x"]}), PNL_SCHEMA
+        )
+        self.assertEqual(df["Quantity"].dtype, np.float64)
+        self.assertTrue(np.isnan(df["Price"].iloc[1]))
+
+    def test_daily_net(self):
+        processor = TradingProcessor(
+            apply_schema(
+                generate_trades(200, symbols=4, seed=1, kind=TRADES), TRADES_SCHEMA
+            )
+        )
+        self.assert_typed(processor.df, TRADES_SCHEMA)
+        daily_net = processor.calc_daily_net()
+        self.assertIsInstance(daily_net["Symbol"].dtype, pd.CategoricalDtype)
+        self.assertEqual(daily_net["Net Position"].dtype, np.float64)
+        self.assert_serializable(daily_net)
+
+    def test_pnl(self):
+        processor = PnLProcessor(
+            generate_trades(200, symbols=4, seed=1, kind=PNL), workers=1
+        )
+        self.assert_typed(processor.data, PNL_SCHEMA)
+        processor.run()
+        statistics = processor.data.select_dtypes(exclude=["category", "datetime"])
+        for name in statistics.columns.drop("Quantity"):
+            self.assertEqual(statistics[name].dtype, np.float64, name)
+        self.assert_serializable(processor.data)
+
+        positions = PnLProcessor.mark_to_market(
+            processor.get_current_positions(),
+            MarketDataService(QuoteEverything(), ttl=60, max_size=10),
+        )
+        self.assertEqual(positions["Market Value"].dtype, np.float64)
+        self.assertTrue((positions["Yahoo Finance"] == 50.0).all())
+        self.assert_serializable(positions)
@@ -0,0 +1,60 @@
+from datetime import date
+
+import pandas as pd
+from django.core.cache import caches
+from django.db import transaction as db_transaction
+from django.test import TransactionTestCase, override_settings
+from trading.repository.data_version import data_version
+from trading.repository.positions import DailyNetPositionRepo
+from trading.services.snapshots import get_snapshot
+from trading.settings import SNAPSHOT_CACHE
+
+POSITION = {"Date": date(2024, 1, 2), "Symbol": "AAA", "Net Position": 10.0}
+
+
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        SNAPSHOT_CACHE: {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "snapshots-test",
+        },
+    }
+)
+class SnapshotCacheTest(TransactionTestCase):
+    """Snapshots are computed again once a write commits, never after a rollback."""
+
+    def setUp(self):
+        caches[SNAPSHOT_CACHE].clear()
+        self.builds = 0
+
+    def snapshot(self) -> pd.DataFrame:
+        def build() -> pd.DataFrame:
+            self.builds += 1
+            return pd.DataFrame({"Builds": [self.builds]})
+
+        return get_snapshot("positions", build, symbols=["AAA"])
+
+    def test_commit_bumps_the_version_and_invalidates_snapshots(self):
+        self.snapshot()
+        self.snapshot()
+        self.assertEqual(self.builds, 1)
+
+        version = data_version()
+        with db_transaction.atomic():
+            DailyNetPositionRepo().save_transactions([POSITION])
+            # Readers are served the committed data until the write commits
+            self.assertEqual(data_version(), version)
+        self.assertNotEqual(data_version(), version)
+
+        self.assertEqual(self.snapshot()["Builds"].tolist(), [2])
+
+    def test_rollback_leaves_the_cache_intact(self):
+        self.snapshot()
+        version = data_version()
+        with self.assertRaises(RuntimeError), db_transaction.atomic():
+            DailyNetPositionRepo().save_transactions([POSITION])
+            raise RuntimeError
+
+        self.assertEqual(data_version(), version)
+        self.assertEqual(self.snapshot()["Builds"].tolist(), [1])
@@ -0,0 +1,117 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import TestCase, TransactionTestCase
+from trading.models import DailyNetPosition, StoredUpload, Transaction, UploadJob
+from trading.repository.positions import DailyNetPositionUpsertRepo
+from trading.services import upload_store
+from trading.services.executor import UploadExecutor
+from trading.services.results import load_result
+from trading.services.synthetic import generate_trades, write_excel
+from trading.services.trading_processor import TradingProcessor
+from trading.services.uploads import trades_repositories
+from trading.tools import StoredFile
+
+FILE = StoredFile(name="book.xlsx", sha256="a" * 64)
+
+
+class ClaimTest(TestCase):
+    def test_same_file_is_a_duplicate(self):
+        _, created = upload_store.claim(UploadJob.TRADES, FILE)
+        self.assertTrue(created)
+        _, created = upload_store.claim(UploadJob.TRADES, FILE)
+        self.assertFalse(created)
+
+    def test_trades_file_is_a_duplicate_whatever_the_options(self):
+        upload_store.claim(UploadJob.TRADES, FILE)
+        _, created = upload_store.claim(UploadJob.TRADES, FILE, {"incremental": True})
+        self.assertFalse(created)
+
+    def test_pnl_file_with_other_options_is_processed_again(self):
+        upload_store.claim(UploadJob.PNL, FILE, {"incremental": False})
+        _, created = upload_store.claim(UploadJob.PNL, FILE, {"incremental": False})
+        self.assertFalse(created)
+        _, created = upload_store.claim(UploadJob.PNL, FILE, {"incremental": True})
+        self.assertTrue(created)
+
+    def test_pnl_file_with_other_settings_is_processed_again(self):
+        upload_store.claim(UploadJob.PNL, FILE)
+        with mock.patch.object(upload_store, "PNL_COST_BASIS", "fifo"):
+            _, created = upload_store.claim(UploadJob.PNL, FILE)
+        self.assertTrue(created)
+        with mock.patch.object(upload_store, "PNL_PRICE_SOURCE", "table"):
+            _, created = upload_store.claim(UploadJob.PNL, FILE)
+        self.assertTrue(created)
+
+
+class ReprocessTest(TestCase):
+    def test_processed_trades_file_is_a_duplicate(self):
+        upload, _ = upload_store.claim(UploadJob.TRADES, FILE)
+        upload_store.complete(upload, {"summary": {}})
+        upload, created = upload_store.claim(UploadJob.TRADES, FILE)
+        self.assertFalse(created)
+        self.assertIsNotNone(upload.result)
+
+    def test_processed_pnl_file_is_processed_again(self):
+        # Its result depends on stored states and prices, and processing it saves states
+        upload, _ = upload_store.claim(UploadJob.PNL, FILE)
+        upload_store.complete(upload, {"summary": {}})
+
+        again, created = upload_store.claim(UploadJob.PNL, FILE)
+        self.assertTrue(created)
+        self.assertEqual(again.id, upload.id)
+        self.assertIsNone(StoredUpload.objects.get(id=upload.id).result)
+        # Meanwhile, the same file is being processed
+        _, created = upload_store.claim(UploadJob.PNL, FILE)
+        self.assertFalse(created)
+
+
+class ProcessAsyncTest(TransactionTestCase):
+    """Trades files processed by async views are saved in a single database transaction."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = mock.patch.object(upload_store, "MEDIA_ROOT", Path(tmp.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        write_excel(generate_trades(200, symbols=3, seed=5), Path(tmp.name) / FILE.name)
+        self.upload, _ = upload_store.claim(UploadJob.TRADES, FILE)
+
+    def process(self) -> dict:
+        return async_to_sync(upload_store.process_async)(
+            self.upload, {}, UploadExecutor(workers=1, queue_size=0)
+        )
+
+    def test_trades_file_is_saved(self):
+        result = self.process()
+        self.assertEqual(Transaction.objects.count(), 200)
+        self.assertEqual(result["summary"]["transactions"], 200)
+        self.assertEqual(
+            DailyNetPosition.objects.count(), result["summary"]["daily_net"]
+        )
+        self.assertIsNotNone(StoredUpload.objects.get(id=self.upload.id).result)
+
+    def test_summary_counts_transactions_beyond_the_preview(self):
+        path = upload_store.upload_path(self.upload)
+        preview, daily_net, rows = TradingProcessor.process_excel(
+            path, *trades_repositories(), chunk_size=50
+        )
+        self.assertEqual((len(preview), rows), (50, 200))
+        result = upload_store.trades_result(preview, daily_net, rows)
+        self.assertEqual(result["summary"]["transactions"], 200)
+        self.assertEqual(result["summary"]["transactions_preview"], 50)
+        self.assertEqual(
+            len(load_result(result["results"], "transactions_preview")), 50
+        )
+
+    def test_nothing_is_kept_when_saving_positions_fails(self):
+        with mock.patch.object(
+            DailyNetPositionUpsertRepo, "save_frame", side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                self.process()
+        self.assertFalse(Transaction.objects.exists())
+        self.assertFalse(StoredUpload.objects.filter(id=self.upload.id).exists())
@@ -0,0 +1,50 @@
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+from django.test import SimpleTestCase
+from trading.services.excel_reader import iter_excel_chunks
+from trading.services.validation import ValidationReport, validate_trades
+
+# Sheet rows 2 to 7, the fourth one left blank
+ROWS = [
+    ["2024-01-02", "AAA", "BUY", 10, 10.0],
+    ["2024-01-02", "BBB", "BUY", 2.5, 20.0],
+    ["2024-01-03", "AAA", "SELL", 5, 11.0],
+    [None, None, None, None, None],
+    ["2024-01-04", "BBB", "HOLD", 1, 21.0],
+    ["2024-01-05", "AAA", "SELL", 0.5, 12.0],
+]
+
+
+class ValidateTradesTest(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "trades.xlsx"
+        df = pd.DataFrame(
+            ROWS, columns=["Date", "Symbol", "Direction", "Quantity", "Price"]
+        )
+        df["Date"] = pd.to_datetime(df["Date"])
+        # Written through pandas, openpyxl write-only mode drops rows without any value
+        df.to_excel(self.path, index=False)
+
+    def validate(self, chunk_size: int) -> ValidationReport:
+        report = ValidationReport()
+        for chunk in iter_excel_chunks(str(self.path), chunk_size=chunk_size):
+            report = report.merge(validate_trades(chunk))
+        return report
+
+    def test_fractional_quantities_are_rejected(self):
+        failures = self.validate(chunk_size=100).failures
+        self.assertEqual(failures["Non integer `Quantity`"].tolist(), [3, 7])
+
+    def test_rows_are_reported_as_numbered_by_excel(self):
+        for chunk_size in (100, 2):
+            with self.subTest(chunk_size=chunk_size):
+                report = self.validate(chunk_size)
+                self.assertEqual(report.rows, 5)
+                self.assertEqual(
+                    report.failures["`Direction` other than BUY or SELL"].tolist(), [6]
+                )
+                self.assertEqual(report.invalid_rows, 3)
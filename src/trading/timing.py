@@ -0,0 +1,282 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Iterable, Iterator, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpRequest, HttpResponse
+
+from .settings import TIMING_ENABLED
+
+# Upper bounds, in seconds, of the duration histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Stages recorded while handling the current request, None outside of a request
+_request_stages: ContextVar[Optional[list["Stage"]]] = ContextVar(
+    "request_stages", default=None
+)
+
+
+class Histogram:
+    """Cumulative duration histogram and row counter of a stage, in Prometheus fashion."""
+
+    def __init__(self):
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.rows = 0
+
+    def observe(self, duration: float, rows: int) -> None:
+        """Count a run of the stage.
+        Args:
+            duration: Duration of the run, in seconds
+            rows: Rows handled by the run
+
+        Returns:
+            None
+        """
+        i = bisect.bisect_left(DURATION_BUCKETS, duration)
+        if i < len(self.buckets):
+            self.buckets[i] += 1
+        self.count += 1
+        self.total += duration
+        self.rows += rows
+
+
+_histograms: dict[str, Histogram] = {}
+_histograms_lock = threading.Lock()
+
+
+class Stage:
+    """
+    A timed stage, used as a context manager.
+    Code in the block can set `rows` to the number of rows it handled.
+    """
+
+    __slots__ = ("name", "rows", "duration", "_started")
+
+    def __init__(self, name: str, rows: int = 0):
+        self.name = name
+        self.rows = rows
+        self.duration = 0.0
+
+    def __enter__(self) -> "Stage":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.duration += time.perf_counter() - self._started
+        record(self)
+
+
+class _NullStage:
+    """Stage handed out when timing is disabled, every operation is a no-op."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullStage":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+    def __setattr__(self, name, value) -> None:
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name: str, rows: int = 0) -> Stage | _NullStage:
+    """Time a block of code.
+    Args:
+        name: Name of the stage, a token such as `parse_excel`
+        rows: Rows handled by the stage, can also be set on the stage within the block
+
+    Returns:
+        Context manager timing the block, a shared no-op one when timing is disabled.
+    """
+    if not TIMING_ENABLED:
+        return _NULL_STAGE
+    return Stage(name, rows)
+
+
+def timed(name: str, rows: Optional[Callable[..., int]] = None) -> Callable:
+    """Decorator timing every call of a function as a stage.
+    Args:
+        name: Name of the stage
+        rows: Computes rows handled by a call out of the arguments of the call,
+            e.g. `lambda self: len(self.df)`.
+
+    Returns:
+        The decorated function, or the function itself when timing is disabled.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        if not TIMING_ENABLED:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with Stage(name, rows(*args, **kwargs) if rows else 0):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def timed_iter(name: str, items: Iterable) -> Iterator:
+    """Time the production of the items of an iterator, e.g. chunks parsed lazily.
+    Time spent by the consumer between items is not counted, the stage is recorded once the
+    iterator is exhausted, with the total length of items as rows.
+    Args:
+        name: Name of the stage
+        items: Iterable to time
+
+    Returns:
+        Iterator over the same items.
+    """
+    if not TIMING_ENABLED:
+        yield from items
+        return
+
+    timer = Stage(name)
+    iterator = iter(items)
+    try:
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                timer.duration += time.perf_counter() - started
+            timer.rows += len(item)
+            yield item
+    finally:
+        record(timer)
+
+
+def record(timer: Stage) -> None:
+    """Count a finished stage in its histogram and in the stages of the current request.
+    Args:
+        timer: Finished stage
+
+    Returns:
+        None
+    """
+    with _histograms_lock:
+        histogram = _histograms.get(timer.name)
+        if histogram is None:
+            histogram = _histograms[timer.name] = Histogram()
+        histogram.observe(timer.duration, timer.rows)
+
+    stages = _request_stages.get()
+    if stages is not None:
+        stages.append(timer)
+
+
+def server_timing(stages: list[Stage]) -> str:
+    """Format stages as a `Server-Timing` header value.
+    Runs of the same stage, like chunks of a file, are summed up.
+    Args:
+        stages: Stages recorded for a request
+
+    Returns:
+        Header value, e.g. `parse_excel;dur=12.3;desc="2000 rows"`.
+    """
+    totals: dict[str, list] = {}
+    for s in stages:
+        total = totals.setdefault(s.name, [0.0, 0])
+        total[0] += s.duration
+        total[1] += s.rows
+    return ", ".join(
+        f"{name};dur={duration * 1000:.1f}" + (f';desc="{rows} rows"' if rows else "")
+        for name, (duration, rows) in totals.items()
+    )
+
+
+def render_metrics() -> str:
+    """Render stage histograms in Prometheus text exposition format.
+    Only stages run by this process are included, e.g. not those of job workers.
+
+    Returns:
+        Metrics as text.
+    """
+    lines = [
+        "# HELP trading_stage_duration_seconds Duration of processing stages.",
+        "# TYPE trading_stage_duration_seconds histogram",
+    ]
+    with _histograms_lock:
+        histograms = {
+            name: (list(h.buckets), h.count, h.total, h.rows)
+            for name, h in sorted(_histograms.items())
+        }
+
+    for name, (buckets, count, total, _) in histograms.items():
+        cumulative = 0
+        for bound, hits in zip(DURATION_BUCKETS, buckets):
+            cumulative += hits
+            lines.append(
+                f'trading_stage_duration_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative}'
+            )
+        lines.append(
+            f'trading_stage_duration_seconds_bucket{{stage="{name}",le="+Inf"}} {count}'
+        )
+        lines.append(f'trading_stage_duration_seconds_sum{{stage="{name}"}} {total}')
+        lines.append(f'trading_stage_duration_seconds_count{{stage="{name}"}} {count}')
+
+    lines += [
+        "# HELP trading_stage_rows_total Rows handled by processing stages.",
+        "# TYPE trading_stage_rows_total counter",
+    ]
+    for name, (_, _, _, rows) in histograms.items():
+        lines.append(f'trading_stage_rows_total{{stage="{name}"}} {rows}')
+    return "\n".join(lines) + "\n"
+
+
+class TimingMiddleware:
+    """
+    Time every request and report its stages in a `Server-Timing` response header.
+    Removed from the middleware chain when timing is disabled (`TIMING_ENABLED` setting).
+    Runs both under WSGI and ASGI, without switching an async chain to sync mode.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        if not TIMING_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if self.is_async:
+            return self.__acall__(request)
+        stages = []
+        token = _request_stages.set(stages)
+        try:
+            with Stage("total"):
+                response = self.get_response(request)
+        finally:
+            _request_stages.reset(token)
+        response["Server-Timing"] = server_timing(stages)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        stages = []
+        token = _request_stages.set(stages)
+        try:
+            with Stage("total"):
+                response = await self.get_response(request)
+        finally:
+            _request_stages.reset(token)
+        response["Server-Timing"] = server_timing(stages)
+        return response
@@ -1,27 +1,50 @@
-import time
-from typing import Optional
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import NamedTuple, Optional
 
 from django import forms
-from django.core.files.storage import FileSystemStorage
 from django.core.files.uploadedfile import UploadedFile
 from django.utils.text import get_valid_filename
 
 from .settings import MEDIA_ROOT
 
 
-def save_to_disk(uploaded_file: UploadedFile) -> None:
+class StoredFile(NamedTuple):
+    """File saved by `save_to_disk`."""
+
+    name: str
+    sha256: str
+
+
+def save_to_disk(uploaded_file: UploadedFile) -> StoredFile:
     """Persist file on the disk at location mentioned in setting for MEDIA.
-    To reduce collision of the files we keep original file name, after we secure the name
-    and replace risky characters, and then adding current timestamp.
+    Files are named after the SHA-256 hash of their content, computed while chunks are written,
+    the same content uploaded twice is stored once.
     Args:
         uploaded_file: Files uploaded by the user
 
     Returns:
-        None
+        Name of the stored file, relative to MEDIA location, and hash of its content.
     """
-    fs = FileSystemStorage(location=MEDIA_ROOT)
-    file_name = f"{int(time.time())}-{get_valid_filename(uploaded_file.name)}"
-    fs.save(file_name, uploaded_file)
+    MEDIA_ROOT.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    with tempfile.NamedTemporaryFile(
+        dir=MEDIA_ROOT, suffix=".part", delete=False
+    ) as tmp:
+        try:
+            for chunk in uploaded_file.chunks():
+                digest.update(chunk)
+                tmp.write(chunk)
+        except BaseException:
+            os.unlink(tmp.name)
+            raise
+
+    suffix = Path(get_valid_filename(uploaded_file.name)).suffix.lower()
+    file_name = f"{digest.hexdigest()}{suffix}"
+    os.replace(tmp.name, MEDIA_ROOT / file_name)
+    return StoredFile(file_name, digest.hexdigest())
 
 
 class TextFileUploadForm(forms.Form):
@@ -45,3 +68,15 @@ class TextFileUploadForm(forms.Form):
             # raise forms.ValidationError("Only text files are allowed.")
             return None
         return uploaded_file
+
+
+class PnLFileUploadForm(TextFileUploadForm):
+    """
+    File upload for P&L processing.
+    Lets the user continue from the state persisted by previous uploads instead of
+    recomputing the whole history.
+    """
+
+    incremental = forms.BooleanField(
+        required=False, label="Continue from last processed date"
+    )
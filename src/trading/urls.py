@@ -18,11 +18,39 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path
 
-from .views import TradingProcessorView, welcome, PnLProcessorView
+from .settings import ASYNC_VIEWS
+from .views import (
+    AsyncPnLProcessorView,
+    AsyncTradingProcessorView,
+    TradingProcessorView,
+    welcome,
+    PnLProcessorView,
+    job_status,
+    export_daily_net,
+    export_result,
+    metrics,
+    pnl_positions,
+    positions,
+    result_page,
+)
+
+# Upload views blocking a worker for the whole request (WSGI) or handing work to a thread pool
+# and yielding to the event loop (ASGI)
+trade_processor_view = (
+    AsyncTradingProcessorView if ASYNC_VIEWS else TradingProcessorView
+)
+pnl_processor_view = AsyncPnLProcessorView if ASYNC_VIEWS else PnLProcessorView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("trade-processor/", TradingProcessorView.as_view(), name="trade_processor"),
-    path("pnl/", PnLProcessorView.as_view(), name="pnl_processor"),
+    path("trade-processor/", trade_processor_view.as_view(), name="trade_processor"),
+    path("pnl/", pnl_processor_view.as_view(), name="pnl_processor"),
+    path("jobs/<int:job_id>/", job_status, name="job_status"),
+    path("results/<str:key>/<str:name>/", result_page, name="result_page"),
+    path("results/<str:key>/<str:name>/export", export_result, name="export_result"),
+    path("exports/daily-net-positions", export_daily_net, name="export_daily_net"),
+    path("positions/", positions, name="positions"),
+    path("positions/pnl/", pnl_positions, name="pnl_positions"),
+    path("metrics", metrics, name="metrics"),
     path("", welcome, name="welcome"),
 ]
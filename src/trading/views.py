@@ -1,18 +1,39 @@
 import logging
+from datetime import date
+from typing import Iterable, Optional
 
 import pandas as pd
-from django.http import HttpResponse
-from django.shortcuts import render
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, render
 from django.views import View
 
+from .models import StoredUpload, UploadJob
+from .repository.cumulative_positions import CumulativePositionRepo
+from .repository.pnl_states import PnLStateRepo
 from .repository.positions import DailyNetPositionRepo
-from .repository.tranzactions import TransactionRepo
-from .services.pnl_processor import PnLProcessor
-from .services.trading_processor import TradingProcessor
-from .tools import TextFileUploadForm, save_to_disk
+from .services import jobs, upload_store
+from .services.executor import ExecutorBusy, get_executor
+from .services.exports import (
+    CONTENT_TYPES,
+    CSV,
+    EXPORT_CHUNK_SIZE,
+    encode,
+    iter_slices,
+)
+from .services.pnl_processor import ResumeConflict
+from .services.results import get_page, load_result, touch_results
+from .services.snapshots import get_snapshot
+from .services.validation import InvalidTrades
+from .settings import UPLOAD_JOBS
+from .timing import render_metrics, stage
+from .tools import PnLFileUploadForm, TextFileUploadForm, save_to_disk
 
 log = logging.getLogger("root")
 
+# Async views render templates off the event loop, large result pages take a while to render
+_render_async = sync_to_async(render)
+
 
 def welcome(request) -> HttpResponse:
     """Renders Welcome page
@@ -25,15 +46,323 @@ def welcome(request) -> HttpResponse:
     return render(request, "welcome.html")
 
 
+def job_status(request, job_id: int) -> JsonResponse:
+    """Report status of a queued upload, and its result once processed.
+    Args:
+        request: Request context
+        job_id: Identifier of the job
+
+    Returns:
+        JSON response containing job details.
+    """
+    job = get_object_or_404(UploadJob, id=job_id)
+    return JsonResponse(
+        {
+            "id": job.id,
+            "kind": job.kind,
+            "file_name": job.file_name,
+            "status": job.status,
+            "error": job.error or None,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at,
+            "result": job.result,
+        }
+    )
+
+
+def result_page(request, key: str, name: str) -> JsonResponse:
+    """Serve one page of a result set kept on the server after an upload.
+    Query parameters `page`, `page_size`, `sort` and `order` (`asc` or `desc`) select the page.
+    Args:
+        request: Request context
+        key: Key of the upload
+        name: Name of the result set
+
+    Returns:
+        JSON response containing columns and rows of the page.
+    """
+    try:
+        df = load_result(key, name)
+    except FileNotFoundError:
+        raise Http404(f"No result set {name} for {key}")
+    return _page_response(request, df)
+
+
+def export_result(request, key: str, name: str) -> HttpResponse:
+    """Stream a whole result set kept on the server after an upload, as CSV or NDJSON.
+    Query parameter `format` (`csv` or `ndjson`, CSV by default) selects the encoding, rows are
+    encoded chunk by chunk while the response is sent.
+    Args:
+        request: Request context
+        key: Key of the upload
+        name: Name of the result set, e.g. `pnl` or `current_positions`
+
+    Returns:
+        Streaming response containing every row of the result set.
+    """
+    fmt = request.GET.get("format", CSV)
+    if fmt not in CONTENT_TYPES:
+        return JsonResponse(
+            {"error": "`format` must be `csv` or `ndjson`."}, status=400
+        )
+    try:
+        df = load_result(key, name)
+    except FileNotFoundError:
+        raise Http404(f"No result set {name} for {key}")
+
+    return _export_response(iter_slices(df), fmt, name, df.columns)
+
+
+def export_daily_net(request) -> HttpResponse:
+    """Stream stored daily net positions, as CSV or NDJSON.
+    Query parameters `format` (`csv` or `ndjson`, CSV by default), `symbol` (repeated for several
+    symbols), `start` and `end` (ISO dates, both included) select the rows. Rows are fetched from
+    the database and encoded chunk by chunk while the response is sent, ordered by symbol and date.
+    Args:
+        request: Request context
+
+    Returns:
+        Streaming response containing every matching row.
+    """
+    fmt = request.GET.get("format", CSV)
+    if fmt not in CONTENT_TYPES:
+        return JsonResponse(
+            {"error": "`format` must be `csv` or `ndjson`."}, status=400
+        )
+    try:
+        start = _query_date(request, "start")
+        end = _query_date(request, "end")
+    except ValueError:
+        return JsonResponse(
+            {"error": "`start` and `end` must be dates, e.g. 2024-01-31."}, status=400
+        )
+
+    repo = DailyNetPositionRepo()
+    chunks = repo.iter_transactions(
+        symbols=request.GET.getlist("symbol") or None,
+        start=start,
+        end=end,
+        chunk_size=EXPORT_CHUNK_SIZE,
+    )
+    return _export_response(chunks, fmt, "daily_net_positions", repo.columns.values())
+
+
+def positions(request) -> JsonResponse:
+    """Serve one page of daily and running positions computed out of stored transactions.
+    Query parameters `symbol` (repeated for several symbols), `start` and `end` (ISO dates, both
+    included) select the rows, `page`, `page_size`, `sort` and `order` select the page. Positions
+    are computed once per selection and served from the snapshot cache until transactions change.
+    Args:
+        request: Request context
+
+    Returns:
+        JSON response containing columns and rows of the page.
+    """
+    try:
+        start = _query_date(request, "start")
+        end = _query_date(request, "end")
+    except ValueError:
+        return JsonResponse(
+            {"error": "`start` and `end` must be dates, e.g. 2024-01-31."}, status=400
+        )
+    symbols = request.GET.getlist("symbol") or None
+
+    df = get_snapshot(
+        "cumulative_positions",
+        lambda: CumulativePositionRepo().fetch_cumulative_positions(
+            symbols=symbols, start=start, end=end
+        ),
+        symbols=symbols,
+        start=start,
+        end=end,
+    )
+    return _page_response(request, df)
+
+
+def pnl_positions(request) -> JsonResponse:
+    """Serve one page of the running P&L state of every processed symbol.
+    Query parameter `symbol` (repeated for several symbols) selects the rows, `page`, `page_size`,
+    `sort` and `order` select the page. States are served from the snapshot cache until they
+    change.
+    Args:
+        request: Request context
+
+    Returns:
+        JSON response containing columns and rows of the page.
+    """
+    symbols = request.GET.getlist("symbol") or None
+    df = get_snapshot(
+        "pnl_states", lambda: PnLStateRepo().fetch_states(symbols), symbols=symbols
+    )
+    return _page_response(request, df)
+
+
+def _page_response(request, df: pd.DataFrame) -> JsonResponse:
+    """Slice the page selected by query parameters out of a result set or snapshot.
+    Args:
+        request: Request context
+        df: Result set or snapshot
+
+    Returns:
+        JSON response containing columns and rows of the page.
+    """
+    try:
+        page = int(request.GET.get("page", 1))
+        page_size = int(request.GET.get("page_size", 100))
+    except ValueError:
+        return JsonResponse(
+            {"error": "`page` and `page_size` must be integers."}, status=400
+        )
+
+    return JsonResponse(
+        get_page(
+            df,
+            page=page,
+            page_size=page_size,
+            sort=request.GET.get("sort"),
+            descending=request.GET.get("order") == "desc",
+        )
+    )
+
+
+def _query_date(request, name: str) -> Optional[date]:
+    """Parse an optional ISO date query parameter.
+    Args:
+        request: Request context
+        name: Name of the parameter
+
+    Returns:
+        Date, None when the parameter is missing.
+
+    Raises:
+        ValueError: Parameter is not an ISO date.
+    """
+    value = request.GET.get(name)
+    return date.fromisoformat(value) if value else None
+
+
+def _export_response(
+    frames: Iterable[pd.DataFrame], fmt: str, name: str, columns: Iterable[str]
+) -> StreamingHttpResponse:
+    """Stream DataFrames as a downloadable CSV or NDJSON file.
+    Args:
+        frames: DataFrames to encode, one after the other
+        fmt: `csv` or `ndjson`
+        name: Name of the downloaded file, without extension
+        columns: Columns of the DataFrames, CSV header when there is no row at all
+
+    Returns:
+        Streaming response.
+    """
+    response = StreamingHttpResponse(
+        encode(frames, fmt, list(columns)), content_type=CONTENT_TYPES[fmt]
+    )
+    response["Content-Disposition"] = f'attachment; filename="{name}.{fmt}"'
+    return response
+
+
+def _stored_result(upload: StoredUpload) -> dict:
+    """Build context entries out of the stored result of an already processed file.
+    Args:
+        upload: Index entry of the file
+
+    Returns:
+        Context entries, `results` is None when result sets of the file expired.
+    """
+    if upload.result is None:
+        return {"error": "This file is already being processed."}
+
+    context = {"duplicate": upload, "summary": upload.result["summary"]}
+    if touch_results(upload.result["results"]):
+        context["results"] = upload.result["results"]
+    else:
+        context["error"] = "Detailed results of this file expired."
+    if "current_positions" in upload.result:
+        context["current_positions"] = _positions_frame(
+            upload.result["current_positions"]
+        )
+    return context
+
+
+def _positions_frame(records: list[dict]) -> pd.DataFrame:
+    """Rebuild current positions out of their stored records.
+    Args:
+        records: Current positions, as stored with the result of a file
+
+    Returns:
+        DataFrame of current positions.
+    """
+    df = pd.DataFrame.from_records(records)
+    if "Date" in df.columns:
+        df["Date"] = pd.to_datetime(df["Date"])
+    return df
+
+
+def _invalid(request, error: InvalidTrades, context: dict) -> HttpResponse:
+    """Render the trades upload page listing the invalid rows of the file.
+    Args:
+        request: Request context
+        error: Validation error of the file
+        context: Context of the upload page
+
+    Returns:
+        Http response containing formatted html.
+    """
+    report = error.report
+    log.info(f"Trades file rejected: {report}")
+    context["error"] = (
+        f"The file was not saved, {report.invalid_rows or report.rows} of {report.rows} rows "
+        "are invalid."
+    )
+    context["invalid_rows"] = report.summary()
+    return render(request, "trade_processor.html", context=context)
+
+
+def _busy(request, template: str, context: dict) -> HttpResponse:
+    """Render an upload page telling the user to retry later, with a 503 status.
+    Args:
+        request: Request context
+        template: Template of the upload page
+        context: Context of the upload page
+
+    Returns:
+        Http response containing formatted html.
+    """
+    context["error"] = (
+        "The server is busy processing other uploads, please retry shortly."
+    )
+    response = render(request, template, context=context, status=503)
+    response["Retry-After"] = "10"
+    return response
+
+
+def metrics(request) -> HttpResponse:
+    """Serve durations and row counts of processing stages in Prometheus text format.
+    Args:
+        request: Request context
+
+    Returns:
+        Http response containing metrics as text.
+    """
+    return HttpResponse(render_metrics(), content_type="text/plain; version=0.0.4")
+
+
 class TradingProcessorView(View):
     """
     View for processing trading files.
-    The context of this view contains `form`, `table_data` and `error`.
+    The context of this view contains `form`, `results`, `summary`, `error` and `job`.
     None:
         - `form`: is a custom class form class with file type validation
-        - `table_data`: are table rows to be shown after file is uploaded to let user confirm that
-        uploaded file contains required data
+        - `results`: key of the result sets kept on the server after file is uploaded, tables are
+        fetched page by page from `result_page` to let user confirm that uploaded file contains
+        required data
+        - `summary`: number of rows of every result set
         - `error`: Any errors to be shown in HTML
+        - `invalid_rows`: Reasons and first Excel rows of the invalid rows when the file is rejected
+        - `job`: Job processing the upload, when uploads are queued (`UPLOAD_JOBS` setting)
+        - `duplicate`: Index entry of the file when the same file was already processed, its
+        stored result is shown instead of processing it again
     """
 
     @staticmethod
@@ -52,8 +381,8 @@ class TradingProcessorView(View):
             "trade_processor.html",
             context={
                 "form": form,
-                "transactions": pd.DataFrame(),
-                "daily_net": pd.DataFrame(),
+                "results": None,
+                "summary": {},
                 "error": None,
             },
         )
@@ -74,8 +403,8 @@ class TradingProcessorView(View):
         form = TextFileUploadForm(request.POST, request.FILES)
         context = {
             "form": form,
-            "transactions": pd.DataFrame(),
-            "daily_net": pd.DataFrame(),
+            "results": None,
+            "summary": {},
             "error": None,
         }
 
@@ -86,33 +415,46 @@ class TradingProcessorView(View):
             return render(request, "trade_processor.html", context=context)
         uploaded_file = form.cleaned_data["file"]
 
-        # persist file on disk
-        save_to_disk(uploaded_file)
-
-        # persist transaction in database
-        transactions_repo = TransactionRepo()
-        positions_repo = DailyNetPositionRepo()
-        tp = TradingProcessor.from_excel(uploaded_file)
+        # persist file on disk, a file already processed is never parsed nor saved again
+        with stage("save_upload"):
+            stored = save_to_disk(uploaded_file)
+        upload, created = upload_store.claim(UploadJob.TRADES, stored)
+        if not created:
+            context.update(_stored_result(upload))
+            return render(request, "trade_processor.html", context=context)
 
-        tp.save(transactions_repo)
-        tp.save_daily_net(positions_repo)
+        if UPLOAD_JOBS:
+            context["job"] = jobs.enqueue(upload)
+            return render(request, "trade_processor.html", context=context)
 
-        # TODO: Implement Pydantic or other validation method to check data consistency
-        context["transactions"] = tp.df
-        context["daily_net"] = tp.calc_daily_net()
+        # persist transaction in database, streaming the file chunk by chunk,
+        # a file holding invalid rows is rejected as a whole
+        try:
+            result = upload_store.process(upload, {})
+        except InvalidTrades as e:
+            return _invalid(request, e, context)
+        context["results"] = result["results"]
+        context["summary"] = result["summary"]
 
-        return render(request, "trade_processor.html", context=context)
+        with stage("render"):
+            return render(request, "trade_processor.html", context=context)
 
 
 class PnLProcessorView(View):
     """
     View for processing P&L files.
-    The context of this view contains `form`, `table_data` and `error`.
+    The context of this view contains `form`, `results`, `summary`, `current_positions`,
+    `error` and `job`.
     None:
         - `form`: is a custom class form class with file type validation
-        - `table_data`: are table rows to be shown after file is uploaded to let user confirm that
-        uploaded file contains required data
+        - `results`: key of the result sets kept on the server after file is uploaded, tables are
+        fetched page by page from `result_page`
+        - `summary`: number of rows of every result set
+        - `current_positions`: one row per symbol, small enough to be rendered with the page
         - `error`: Any errors to be shown in HTML
+        - `job`: Job processing the upload, when uploads are queued (`UPLOAD_JOBS` setting)
+        A file already processed is processed again, its result depends on stored states and
+        prices, see `upload_store.claim`. Only the upload of a file being processed is refused.
     """
 
     @staticmethod
@@ -125,11 +467,12 @@ class PnLProcessorView(View):
         Returns:
             HTTP response containing HTML file.
         """
-        form = TextFileUploadForm()
+        form = PnLFileUploadForm()
 
         context = {
             "form": form,
-            "pnl": pd.DataFrame(),
+            "results": None,
+            "summary": {},
             "current_positions": pd.DataFrame(),
             "error": None,
         }
@@ -137,10 +480,20 @@ class PnLProcessorView(View):
 
     @staticmethod
     def post(request):
-        form = TextFileUploadForm(request.POST, request.FILES)
+        """Validate and process P&L file.
+        When the user asks for incremental processing, only trades after the last processed date
+        of each symbol are computed, on top of the persisted running state.
+        Args:
+            request: Request context
+
+        Returns:
+            HTTP response containing HTML file.
+        """
+        form = PnLFileUploadForm(request.POST, request.FILES)
         context = {
             "form": form,
-            "pnl": pd.DataFrame(),
+            "results": None,
+            "summary": {},
             "current_positions": pd.DataFrame(),
             "error": None,
         }
@@ -149,10 +502,185 @@ class PnLProcessorView(View):
             log.info(context["error"])
             return render(request, "pnl.html", context=context)
         uploaded_file = form.cleaned_data["file"]
+        options = {"incremental": form.cleaned_data["incremental"]}
 
-        pnl_processor = PnLProcessor.from_excel(uploaded_file)
-        pnl_processor.run()
-        context["pnl"] = pnl_processor.data
-        context["current_positions"] = pnl_processor.get_current_positions()
+        with stage("save_upload"):
+            stored = save_to_disk(uploaded_file)
+        upload, created = upload_store.claim(UploadJob.PNL, stored, options)
+        if not created:
+            context.update(_stored_result(upload))
+            return render(request, "pnl.html", context=context)
 
-        return render(request, "pnl.html", context=context)
+        if UPLOAD_JOBS:
+            context["job"] = jobs.enqueue(upload, options)
+            return render(request, "pnl.html", context=context)
+
+        try:
+            result = upload_store.process(upload, options)
+        except ResumeConflict as e:
+            context["error"] = str(e)
+            log.info(context["error"])
+            return render(request, "pnl.html", context=context)
+        if not result["summary"]["pnl"]:
+            context["error"] = "No new trades since the last processed date."
+            return render(request, "pnl.html", context=context)
+
+        context["results"] = result["results"]
+        context["summary"] = result["summary"]
+        context["current_positions"] = _positions_frame(result["current_positions"])
+
+        with stage("render"):
+            return render(request, "pnl.html", context=context)
+
+
+class AsyncTradingProcessorView(TradingProcessorView):
+    """
+    Async counterpart of `TradingProcessorView`, served when `ASYNC_VIEWS` is enabled.
+    Blocking work runs on the shared upload executor, the event loop keeps serving other
+    requests meanwhile. Uploads beyond the executor capacity are answered with 503.
+    """
+
+    @staticmethod
+    async def get(request) -> HttpResponse:
+        """Render the HTML template for Trading processor.
+        Args:
+            request: Request context
+
+        Returns:
+            HTTP response containing HTML file.
+        """
+        return await sync_to_async(TradingProcessorView.get)(request)
+
+    @staticmethod
+    async def post(request):
+        """Validate and process file, see `TradingProcessorView.post`.
+        Args:
+            request: Request context
+
+        Returns:
+            HTTP response containing HTML file.
+        """
+        form = TextFileUploadForm(request.POST, request.FILES)
+        context = {
+            "form": form,
+            "results": None,
+            "summary": {},
+            "error": None,
+        }
+        if not form.is_valid() or form.cleaned_data["file"] is None:
+            context["error"] = "Invalid file type. Please use an `xlsx` file."
+            log.info(context["error"])
+            return await _render_async(request, "trade_processor.html", context=context)
+        uploaded_file = form.cleaned_data["file"]
+
+        executor = get_executor()
+        try:
+            with executor.admit():
+                with stage("save_upload"):
+                    stored = await executor.run(save_to_disk, uploaded_file)
+                upload, created = await sync_to_async(upload_store.claim)(
+                    UploadJob.TRADES, stored
+                )
+                if not created:
+                    context.update(await sync_to_async(_stored_result)(upload))
+                    return await _render_async(
+                        request, "trade_processor.html", context=context
+                    )
+
+                if UPLOAD_JOBS:
+                    context["job"] = await sync_to_async(jobs.enqueue)(upload)
+                    return await _render_async(
+                        request, "trade_processor.html", context=context
+                    )
+
+                result = await upload_store.process_async(upload, {}, executor)
+        except InvalidTrades as e:
+            return await sync_to_async(_invalid)(request, e, context)
+        except ExecutorBusy:
+            log.warning("Trades upload refused, upload executor is full")
+            return await sync_to_async(_busy)(request, "trade_processor.html", context)
+
+        context["results"] = result["results"]
+        context["summary"] = result["summary"]
+
+        with stage("render"):
+            return await _render_async(request, "trade_processor.html", context=context)
+
+
+class AsyncPnLProcessorView(PnLProcessorView):
+    """
+    Async counterpart of `PnLProcessorView`, served when `ASYNC_VIEWS` is enabled.
+    Blocking work runs on the shared upload executor, the event loop keeps serving other
+    requests meanwhile. Uploads beyond the executor capacity are answered with 503.
+    """
+
+    @staticmethod
+    async def get(request) -> HttpResponse:
+        """Render the HTML template for P&L processor.
+        Args:
+            request: Request context
+
+        Returns:
+            HTTP response containing HTML file.
+        """
+        return await sync_to_async(PnLProcessorView.get)(request)
+
+    @staticmethod
+    async def post(request):
+        """Validate and process P&L file, see `PnLProcessorView.post`.
+        Args:
+            request: Request context
+
+        Returns:
+            HTTP response containing HTML file.
+        """
+        form = PnLFileUploadForm(request.POST, request.FILES)
+        context = {
+            "form": form,
+            "results": None,
+            "summary": {},
+            "current_positions": pd.DataFrame(),
+            "error": None,
+        }
+        if not form.is_valid() or form.cleaned_data["file"] is None:
+            context["error"] = "Invalid file type. Please use an `xlsx` file."
+            log.info(context["error"])
+            return await _render_async(request, "pnl.html", context=context)
+        uploaded_file = form.cleaned_data["file"]
+        options = {"incremental": form.cleaned_data["incremental"]}
+
+        executor = get_executor()
+        try:
+            with executor.admit():
+                with stage("save_upload"):
+                    stored = await executor.run(save_to_disk, uploaded_file)
+                upload, created = await sync_to_async(upload_store.claim)(
+                    UploadJob.PNL, stored, options
+                )
+                if not created:
+                    context.update(await sync_to_async(_stored_result)(upload))
+                    return await _render_async(request, "pnl.html", context=context)
+
+                if UPLOAD_JOBS:
+                    context["job"] = await sync_to_async(jobs.enqueue)(upload, options)
+                    return await _render_async(request, "pnl.html", context=context)
+
+                result = await upload_store.process_async(upload, options, executor)
+        except ResumeConflict as e:
+            context["error"] = str(e)
+            log.info(context["error"])
+            return await _render_async(request, "pnl.html", context=context)
+        except ExecutorBusy:
+            log.warning("P&L upload refused, upload executor is full")
+            return await sync_to_async(_busy)(request, "pnl.html", context)
+
+        if not result["summary"]["pnl"]:
+            context["error"] = "No new trades since the last processed date."
+            return await _render_async(request, "pnl.html", context=context)
+
+        context["results"] = result["results"]
+        context["summary"] = result["summary"]
+        context["current_positions"] = _positions_frame(result["current_positions"])
+
+        with stage("render"):
+            return await _render_async(request, "pnl.html", context=context)